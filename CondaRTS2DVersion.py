@@ -6,9 +6,9 @@ from dataclasses import InitVar, dataclass, field as dataclass_field
 from enum import Enum
 from typing import TYPE_CHECKING, Any, ClassVar, Dict, Type, Set
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor
 import threading
 from collections import deque
+from functools import lru_cache
 
 import pygame as pg
 from pygame.math import Vector2
@@ -21,8 +21,9 @@ from pygame.math import Vector2
 # CONSOLE_HEIGHT reserves space at the bottom for a console (though not fully implemented).
 # MAP_WIDTH and MAP_HEIGHT define the playable world size.
 # TILE_SIZE is used for grid snapping and procedural map generation.
-# MINI_MAP_WIDTH and MINI_MAP_HEIGHT size the minimap in the corner.
+# MINI_MAP_WIDTH and MINI_MAP_HEIGHT size the minimap; MINI_MAP_RECT is where it sits in the bottom-right corner.
 # PAN_EDGE and PAN_SPEED control edge-scrolling camera panning.
+# VSYNC syncs flips to the display refresh; off by default so clock.tick alone paces frames.
 
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
@@ -32,8 +33,10 @@ MAP_HEIGHT = 80000
 TILE_SIZE = 40
 MINI_MAP_WIDTH = 200
 MINI_MAP_HEIGHT = 150
+MINI_MAP_RECT = pg.Rect(SCREEN_WIDTH - MINI_MAP_WIDTH, SCREEN_HEIGHT - MINI_MAP_HEIGHT, MINI_MAP_WIDTH, MINI_MAP_HEIGHT)
 PAN_EDGE = 30
 PAN_SPEED = 10
+VSYNC = False
 
 # =============================================================================
 # Group: Team Colors & Mapping
@@ -82,6 +85,24 @@ team_to_name = {
     Team.GREY: "Grey",
 }
 
+name_to_team = {name: team for team, name in team_to_name.items()}
+
+# One bit per team so alliance membership is a single AND in hot loops
+team_to_bit = {team: 1 << team.value for team in Team}
+
+def team_mask(teams) -> int:
+    """
+    Combines teams into a bitmask of their team_to_bit values.
+    
+    :param teams: Iterable of Team enums.
+    :return: Integer mask with one bit set per team.
+    """
+    # Combines teams into a bitmask of their team_to_bit values.
+    mask = 0
+    for team in teams:
+        mask |= team_to_bit[team]
+    return mask
+
 # =============================================================================
 # Group: Game States
 # =============================================================================
@@ -330,6 +351,13 @@ PROJECTILE_LIFETIME = 5.0
 PARTICLES_PER_EXPLOSION = 20
 PLASMA_BURN_PARTICLES = 10
 PLASMA_BURN_DURATION = 2.0
+AI_TICK_FRAMES = 12  # AI decisions run at 5 Hz (60 FPS / 12); AIs are staggered so each ticks on its own frame
+FOG_TICK_FRAMES = 2  # Fog of war visibility refreshes at 30 Hz
+SIM_STEP_MS = 1000 / 60  # Fixed simulation step; all per-frame speeds and timers assume 60 steps per second
+MAX_SIM_STEPS = 4  # Catch-up steps allowed per rendered frame before the game slows down instead
+SIM_STEP_SLACK_MS = 1  # Frames are paced in whole milliseconds (16 or 17 ms), so a step is taken up to this early
+MINI_MAP_TICK_FRAMES = 6  # Minimap contents re-render at 10 Hz; the camera outline follows every frame
+DRAW_CULL_MARGIN = 64  # World pixels beyond the camera view still fetched for drawing (covers sprite extents)
 
 # =============================================================================
 # Group: Drawing Recipes
@@ -1018,7 +1046,7 @@ def is_valid_building_position(
     :return: True if placement is valid.
     """
     # Validates if a building can be placed at position: checks bounds, overlaps, proximity to friendly buildings.
-    width, height = UNIT_CLASSES[new_building_cls.__name__]["size"]
+    width, height = new_building_cls.size
     half_w_n, half_h_n = width / 2, height / 2
     temp_rect = pg.Rect(position[0] - half_w_n, position[1] - half_h_n, width, height)
     if not (0 <= temp_rect.left and temp_rect.right <= map_width and
@@ -1031,7 +1059,7 @@ def is_valid_building_position(
     for building in buildings:
         if building.team == team and building.health > 0:
             # Dynamic min_dist based on sizes + margin
-            e_size = UNIT_CLASSES[building.unit_type]["size"]
+            e_size = building.size
             half_w_e, half_h_e = e_size[0] / 2, e_size[1] / 2
             min_dist = max(half_w_n + half_w_e, half_h_n + half_h_e) + margin
             dist = math.hypot(proposed_center[0] - building.position.x, proposed_center[1] - building.position.y)
@@ -1085,15 +1113,13 @@ def calculate_formation_positions(
     # Computes a grid formation around a center point for group movement.
     if num_units == 0:
         return []
-    positions = []
     spacing = 30
     cols = max(1, int(math.sqrt(num_units)))
-    for i in range(num_units):
-        row, col = i // cols, i % cols
-        x = center[0] + (col - cols / 2) * spacing
-        y = center[1] + (row - num_units / cols / 2) * spacing
-        positions.append((x, y))
-    return positions
+    rows = -(-num_units // cols)
+    # Every slot shares its row's y and its column's x, so compute each once and pair them up
+    xs = [center[0] + (col - cols / 2) * spacing for col in range(cols)]
+    ys = [center[1] + (row - num_units / cols / 2) * spacing for row in range(rows)]
+    return [(x, y) for y in ys for x in xs][:num_units]
 
 def get_starting_positions(map_width: int, map_height: int, num_players: int):
     """
@@ -1148,6 +1174,7 @@ class SpatialHash:
         # Initializes the hash with a grid cell size for bucketing objects.
         self.cell_size = cell_size
         self.grid: Dict[tuple[int, int], list] = {}
+        self.cells: Dict[Any, tuple[int, int]] = {}  # Object -> current cell, maintained by sync()
 
     def get_key(self, pos: Vector2) -> tuple[int, int]:
         """
@@ -1171,6 +1198,51 @@ class SpatialHash:
             self.grid[key] = []
         self.grid[key].append(obj)
 
+    def sync(self, objs: list):
+        """
+        Incrementally brings the grid in line with objs instead of rebuilding it.
+        
+        Objects are re-bucketed only when their cell changes; objects missing from objs are dropped.
+        
+        :param objs: Every object that should be indexed (no duplicates).
+        """
+        # Incrementally brings the grid in line with objs instead of rebuilding it.
+        cell_size = self.cell_size
+        grid = self.grid
+        cells = self.cells
+        for obj in objs:
+            pos = obj.position
+            key = (int(pos.x // cell_size), int(pos.y // cell_size))
+            old_key = cells.get(obj)
+            if old_key == key:
+                continue
+            if old_key is not None:
+                self._remove_from_cell(obj, old_key)
+            bucket = grid.get(key)
+            if bucket is None:
+                grid[key] = [obj]
+            else:
+                bucket.append(obj)
+            cells[obj] = key
+        # Every object in objs now has an entry, so any surplus entries belong to removed objects
+        if len(cells) > len(objs):
+            present = set(objs)
+            for obj in [o for o in cells if o not in present]:
+                self._remove_from_cell(obj, cells.pop(obj))
+
+    def _remove_from_cell(self, obj, key: tuple[int, int]):
+        """
+        Removes obj from the bucket at key, dropping the bucket once empty.
+        
+        :param obj: Indexed object.
+        :param key: Cell key the object is stored under.
+        """
+        # Removes obj from the bucket at key, dropping the bucket once empty.
+        bucket = self.grid[key]
+        bucket.remove(obj)
+        if not bucket:
+            del self.grid[key]
+
     def query(self, pos: Vector2, radius: float) -> list:
         """
         Returns all objects within radius of pos, checking neighboring cells.
@@ -1180,19 +1252,42 @@ class SpatialHash:
         :return: List of nearby objects.
         """
         # Returns all objects within radius of pos, checking neighboring cells.
-        cx = int(pos.x // self.cell_size)
-        cy = int(pos.y // self.cell_size)
-        keys = set()
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                keys.add((cx + dx, cy + dy))
-        nearby = []
-        for k in keys:
-            if k in self.grid:
-                for o in self.grid[k]:
-                    if o.distance_to(pos) <= radius:
-                        nearby.append(o)
-        return nearby
+        return [o for o in self.neighborhood(self.get_key(pos)) if o.distance_to(pos) <= radius]
+
+    def neighborhood(self, key: tuple[int, int]) -> list:
+        """
+        Returns every object in the 3x3 block of cells centered on key, without distance filtering.
+        
+        :param key: Cell key (cell_x, cell_y).
+        :return: List of objects.
+        """
+        # Returns every object in the 3x3 block of cells centered on key, without distance filtering.
+        cx, cy = key
+        grid = self.grid
+        found = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                bucket = grid.get((cx + dx, cy + dy))
+                if bucket:
+                    found.extend(bucket)
+        return found
+
+    def query_rect(self, rect: pg.Rect) -> list:
+        """
+        Returns all objects bucketed in cells overlapping rect.
+        
+        :param rect: World-space rect.
+        :return: List of objects; a superset of those positioned inside rect.
+        """
+        # Returns all objects bucketed in cells overlapping rect.
+        grid = self.grid
+        found = []
+        for cx in range(rect.left // self.cell_size, rect.right // self.cell_size + 1):
+            for cy in range(rect.top // self.cell_size, rect.bottom // self.cell_size + 1):
+                bucket = grid.get((cx, cy))
+                if bucket:
+                    found.extend(bucket)
+        return found
 
 # =============================================================================
 # Group: Camera System
@@ -1362,7 +1457,7 @@ class FogOfWar:
     """
     Manages explored/visible tiles on a grid, revealing areas based on unit sight ranges.
     
-    Uses 2D boolean grids for explored and currently visible tiles.
+    Uses 2D boolean grids for explored and currently visible tiles, mirrored into a one-pixel-per-tile overlay.
     """
     def __init__(self, map_width: int, map_height: int, tile_size: int = TILE_SIZE, spectator: bool = False):
         """
@@ -1382,6 +1477,11 @@ class FogOfWar:
         if spectator:
             self.explored = [[True] * num_tiles_y for _ in range(num_tiles_x)]
             self.visible = [[True] * num_tiles_y for _ in range(num_tiles_x)]
+        # Fog alpha per tile (255 unexplored, 100 explored, 0 visible), scaled up in a single blit by draw()
+        self.overlay = pg.Surface((num_tiles_x, num_tiles_y), pg.SRCALPHA)
+        self.overlay.fill((0, 0, 0, 0) if spectator else (0, 0, 0, 255))
+        self.visible_spans: list[tuple[int, int, int]] = []  # (tx, first_ty, count) column runs revealed since the last reset
+        self.revision = 0  # Bumped whenever the visible area actually changes
     
     def reveal(self, center: tuple, radius: int):
         """
@@ -1391,16 +1491,28 @@ class FogOfWar:
         :param radius: Reveal radius in pixels.
         """
         # Reveals tiles within radius of center as both explored and visible.
+        # Each column of the circle is one contiguous run of tiles, written with a slice assignment.
         cx, cy = center
-        tile_x, tile_y = int(cx // self.tile_size), int(cy // self.tile_size)
-        radius_tiles = radius // self.tile_size
-        for ty in range(max(0, tile_y - radius_tiles), min(len(self.explored[0]), tile_y + radius_tiles + 1)):
-            for tx in range(max(0, tile_x - radius_tiles), min(len(self.explored), tile_x + radius_tiles + 1)):
-                tile_center_x = tx * self.tile_size + self.tile_size // 2
-                tile_center_y = ty * self.tile_size + self.tile_size // 2
-                if math.sqrt((cx - tile_center_x)**2 + (cy - tile_center_y)**2) <= radius:
-                    self.explored[tx][ty] = True
-                    self.visible[tx][ty] = True
+        tile_size = self.tile_size
+        half_tile = tile_size // 2
+        tile_x, tile_y = int(cx // tile_size), int(cy // tile_size)
+        radius_tiles = radius // tile_size
+        min_ty = max(0, tile_y - radius_tiles)
+        max_ty = min(len(self.explored[0]), tile_y + radius_tiles + 1) - 1
+        for tx in range(max(0, tile_x - radius_tiles), min(len(self.explored), tile_x + radius_tiles + 1)):
+            dx = cx - (tx * tile_size + half_tile)
+            reach_sq = radius * radius - dx * dx
+            if reach_sq < 0:
+                continue
+            reach = math.sqrt(reach_sq)
+            first_ty = max(min_ty, math.ceil((cy - reach - half_tile) / tile_size))
+            last_ty = min(max_ty, math.floor((cy + reach - half_tile) / tile_size))
+            if first_ty > last_ty:
+                continue
+            count = last_ty - first_ty + 1
+            self.explored[tx][first_ty:last_ty + 1] = [True] * count
+            self.visible[tx][first_ty:last_ty + 1] = [True] * count
+            self.visible_spans.append((tx, first_ty, count))
     
     def update_visibility(self, ally_units, ally_buildings, global_buildings):
         """
@@ -1416,11 +1528,21 @@ class FogOfWar:
         num_tiles_x = len(self.visible)
         num_tiles_y = len(self.visible[0])
         self.visible = [[False] * num_tiles_y for _ in range(num_tiles_x)]
+        previous_spans = self.visible_spans
+        self.visible_spans = []
         for unit in ally_units:
             self.reveal(unit.position, unit.sight_range)
         for building in ally_buildings:
             if building.health > 0:
                 self.reveal(building.position, building.sight_range)
+        if self.visible_spans != previous_spans:
+            self.revision += 1
+        # Everything seen last update has been explored; re-clear whatever is visible now
+        overlay = self.overlay
+        for tx, first_ty, count in previous_spans:
+            overlay.fill((0, 0, 0, 100), (tx, first_ty, 1, count))
+        for tx, first_ty, count in self.visible_spans:
+            overlay.fill((0, 0, 0, 0), (tx, first_ty, 1, count))
         for building in global_buildings:
             if building.health > 0:
                 tx, ty = int(building.position[0] // self.tile_size), int(building.position[1] // self.tile_size)
@@ -1465,25 +1587,15 @@ class FogOfWar:
         start_ty = max(0, int(camera.rect.y // self.tile_size))
         end_tx = min(len(self.visible), start_tx + int(camera.rect.width // self.tile_size) + 2)
         end_ty = min(len(self.visible[0]), start_ty + int(camera.rect.height // self.tile_size) + 2)
+        if start_tx >= end_tx or start_ty >= end_ty:
+            return
         zoom = camera.zoom
         tile_sw = self.tile_size * zoom
-        tile_sh = self.tile_size * zoom
-        fog_overlay = pg.Surface((int(camera.width), int(camera.height)), pg.SRCALPHA)
-        fog_overlay.fill((0, 0, 0, 0))
-        for tx in range(start_tx, end_tx):
-            wx = tx * self.tile_size
-            sx = (wx - camera.rect.x) * zoom
-            if sx < -tile_sw or sx > camera.width:
-                continue
-            for ty in range(start_ty, end_ty):
-                wy = ty * self.tile_size
-                sy = (wy - camera.rect.y) * zoom
-                if sy < -tile_sh or sy > camera.height:
-                    continue
-                if not self.visible[tx][ty]:
-                    alpha = 255 if not self.explored[tx][ty] else 100
-                    pg.draw.rect(fog_overlay, (0, 0, 0, alpha), (sx, sy, tile_sw, tile_sh))
-        surface.blit(fog_overlay, (0, 0))
+        area = pg.Rect(start_tx, start_ty, end_tx - start_tx, end_ty - start_ty)
+        fog_overlay = pg.transform.scale(self.overlay.subsurface(area), (int(area.width * tile_sw), int(area.height * tile_sw)))
+        sx = (start_tx * self.tile_size - camera.rect.x) * zoom
+        sy = (start_ty * self.tile_size - camera.rect.y) * zoom
+        surface.blit(fog_overlay, (sx, sy))
 
 # =============================================================================
 # Group: Particle Effects
@@ -1631,6 +1743,7 @@ class Projectile(pg.sprite.Sprite):
         self.direction = direction.normalize() if direction.length() > 0 else Vector2(1, 0)
         self.damage = damage
         self.team = team
+        self.team_bit = team_to_bit[team]
         self.speed = weapon["projectile_speed"]
         self.lifetime = PROJECTILE_LIFETIME * 30
         self.age = 0
@@ -1731,6 +1844,7 @@ class GameObject(pg.sprite.Sprite, ABC):
         super().__init__()
         self.position = Vector2(position)
         self.team = team
+        self.team_bit = team_to_bit[team]
         self.health = 100
         self.max_health = 100
         self.under_attack = False
@@ -2325,7 +2439,7 @@ class Headquarters(Unit):
                 building.parent_hq = self
             all_buildings.add(building)
             self.stats['buildings_constructed'] += 1
-            self.credits -= UNIT_CLASSES[unit_type]["cost"]
+            self.credits -= unit_cls.cost
             self.pending_building = None
 
 class Barracks(Unit):
@@ -2395,6 +2509,11 @@ class Turret(Unit):
     def __init__(self, position: tuple, team: Team, hq=None):
         super().__init__(position, team, "Turret", hq=hq)
 
+# Mirror each class's cost and footprint onto the class, so per-frame code reads cls.cost / cls.size
+for unit_cls in Unit.__subclasses__():
+    unit_cls.cost = UNIT_CLASSES[unit_cls.__name__]["cost"]
+    unit_cls.size = UNIT_CLASSES[unit_cls.__name__]["size"]
+
 # =============================================================================
 # Group: Console & Logging
 # =============================================================================
@@ -2444,7 +2563,7 @@ class AI:
     
     Supports personalities for varied behavior.
     """
-    def __init__(self, hq, console, build_dir=math.pi, allies: Set[Team] = frozenset()):
+    def __init__(self, hq, console, build_dir=math.pi, allies: Set[Team] = frozenset(), rng: random.Random = None):
         """
         Initializes AI with personality traits, timers, biases for varied behavior.
         
@@ -2452,11 +2571,13 @@ class AI:
         :param console: Console for logging.
         :param build_dir: Preferred build direction angle.
         :param allies: Set of allied teams.
+        :param rng: Random generator owned by this AI (default: a fresh unseeded one).
         """
         # Initializes AI with personality traits, timers, biases for varied behavior.
         self.hq = hq
         self.console = console
         self.allies = allies
+        self.rng = rng if rng is not None else random.Random()
         self.action_timer = 0
         self.build_attempts = {}
         self.economy_level = 0
@@ -2470,10 +2591,10 @@ class AI:
         self.barracks_index = 0
         self.warfactory_index = 0
         self.hangar_index = 0
-        self.personality = random.choice(['aggressive', 'defensive', 'balanced', 'rusher'])  # Random trait
-        self.timer_offset = random.randint(0, 180)  # Stagger starts by up to 3 seconds (at 60 FPS)
-        self.interval_multiplier = random.uniform(0.7, 1.3)  # Vary speeds: 70-130% of base intervals
-        self.build_jitter = random.uniform(0.1, 0.5)  # Extra randomness in build angles (lower = more biased)
+        self.personality = self.rng.choice(['aggressive', 'defensive', 'balanced', 'rusher'])  # Random trait
+        self.timer_offset = self.rng.randint(0, 180)  # Stagger starts by up to 3 seconds (at 60 FPS)
+        self.interval_multiplier = self.rng.uniform(0.7, 1.3)  # Vary speeds: 70-130% of base intervals
+        self.build_jitter = self.rng.uniform(0.1, 0.5)  # Extra randomness in build angles (lower = more biased)
         self.aggression_bias = 1.2 if self.personality in ['aggressive', 'rusher'] else 0.8 if self.personality == 'defensive' else 1.0
         self.economy_bias = 0.8 if self.personality in ['aggressive', 'rusher'] else 1.2 if self.personality == 'defensive' else 1.0
         
@@ -2629,7 +2750,7 @@ class AI:
         map_area = map_width * map_height
         scale = math.sqrt(map_area / default_area)
         hq_pos = self.hq.position
-        half_w, half_h = UNIT_CLASSES[building_cls.__name__]["size"][0] / 2, UNIT_CLASSES[building_cls.__name__]["size"][1] / 2
+        half_w, half_h = building_cls.size[0] / 2, building_cls.size[1] / 2
         max_attempts = 2000
         attempts = 0
 
@@ -2655,9 +2776,9 @@ class AI:
         angle_jitter = math.pi * self.build_jitter * (1.5 if self.personality == 'rusher' else 1.0)  # Rushers spread out more
         for ring_dist in range(int(dist_min), int(dist_max + 100), int(ring_step)):
             for _ in range(num_samples_per_ring):
-                angle_offset = random.uniform(-angle_jitter, angle_jitter) + random.uniform(-0.2, 0.2)
+                angle_offset = self.rng.uniform(-angle_jitter, angle_jitter) + self.rng.uniform(-0.2, 0.2)
                 angle = bias_angle + angle_offset
-                dist = ring_dist + random.uniform(-ring_step / 2, ring_step / 2)
+                dist = ring_dist + self.rng.uniform(-ring_step / 2, ring_step / 2)
                 center_x = hq_pos.x + dist * math.cos(angle)
                 center_y = hq_pos.y + dist * math.sin(angle)
                 center_x = max(half_w, min(map_width - half_w, center_x))
@@ -2695,22 +2816,22 @@ class AI:
                 self.barracks_index += 1
                 if len(barracks.production_queue) < 5:
                     if self.threat_level > 0.5:
-                        unit_type = random.choices(list(self.production_priorities.keys()), weights=[0.7, 0.2, 0.1, 0, 0, 0])[0]
+                        unit_type = self.rng.choices(list(self.production_priorities.keys()), weights=[0.7, 0.2, 0.1, 0, 0, 0])[0]
                     else:
-                        unit_type = random.choices(list(self.production_priorities.keys()), weights=list(self.production_priorities.values()))[0]
+                        unit_type = self.rng.choices(list(self.production_priorities.keys()), weights=list(self.production_priorities.values()))[0]
                     
                     cost = UNIT_CLASSES[unit_type]["cost"]
                     if self.hq.credits >= cost:
                         barracks.production_queue.append({'unit_type': unit_type, 'repeat': False})
                         self.hq.credits -= cost
-                        if random.random() < 0.4 and unit_type == "Infantry" and num_units < 5:
+                        if self.rng.random() < 0.4 and unit_type == "Infantry" and num_units < 5:
                             barracks.production_queue[-1]['repeat'] = True
             
             if war_factory_list:
                 war_factory = war_factory_list[self.warfactory_index % len(war_factory_list)]
                 self.warfactory_index += 1
                 if len(war_factory.production_queue) < 3 and self.economy_level > 1:
-                    heavy_unit = random.choice(["Tank", "MachineGunVehicle", "RocketArtillery"])
+                    heavy_unit = self.rng.choice(["Tank", "MachineGunVehicle", "RocketArtillery"])
                     cost = UNIT_CLASSES[heavy_unit]["cost"]
                     if self.hq.credits >= cost and num_units < target_units * 0.8:
                         war_factory.production_queue.append({'unit_type': heavy_unit, 'repeat': False})
@@ -2720,7 +2841,7 @@ class AI:
                 hangar = hangar_list[self.hangar_index % len(hangar_list)]
                 self.hangar_index += 1
                 if len(hangar.production_queue) < 2 and self.economy_level >= 2:
-                    if random.random() < 0.2:
+                    if self.rng.random() < 0.2:
                         hangar.production_queue.append({'unit_type': "AttackHelicopter", 'repeat': False})
                         self.hq.credits -= UNIT_CLASSES["AttackHelicopter"]["cost"]
     
@@ -2738,7 +2859,7 @@ class AI:
             if pos:
                 self.hq.place_building(pos, Turret, all_buildings)
     
-    def strategize_attacks(self, friendly_units, enemy_hq, enemy_buildings=None, enemy_units=None):
+    def strategize_attacks(self, friendly_units, enemy_hq, enemy_buildings=None, enemy_units=None, frames=1):
         """
         Periodic scouting and attack waves; aggressive push if superior.
         
@@ -2746,27 +2867,28 @@ class AI:
         :param enemy_hq: Enemy HQ.
         :param enemy_buildings: Enemy buildings.
         :param enemy_units: Enemy units.
+        :param frames: Frames elapsed since the previous call.
         """
         # Periodic scouting and attack waves; aggressive push if superior.
         if not enemy_hq and not enemy_buildings and not enemy_units:
             return
         
-        self.scout_timer += 1
+        self.scout_timer += frames
         scout_interval = int(60 * self.interval_multiplier)  # Varied: 42-78 frames
         if self.scout_timer > scout_interval and len(friendly_units) > 1:
             scout_target = enemy_hq.position if enemy_hq else ((self._get_nearest_enemy_building(enemy_buildings, friendly_units[0].position if friendly_units else (0, 0)).position if enemy_buildings else (0, 0)))
             idle_units = [u for u in friendly_units if u.health > 0 and u.move_target is None][:3]
             for scout in idle_units:
-                scout.move_target = (scout_target[0] + random.uniform(-200, 200), scout_target[1] + random.uniform(-200, 200))
-            self.scout_timer = random.randint(0, scout_interval // 2)  # Jitter reset
+                scout.move_target = (scout_target[0] + self.rng.uniform(-200, 200), scout_target[1] + self.rng.uniform(-200, 200))
+            self.scout_timer = self.rng.randint(0, scout_interval // 2)  # Jitter reset
         
-        self.attack_timer += 1
+        self.attack_timer += frames
         attack_interval = int(30 * self.interval_multiplier)  # Varied: 21-39 frames
         attack_fraction = (0.3 if self.threat_level > 0.5 else 0.2) * self.aggression_bias  # Personality tweak
         if self.attack_timer > attack_interval:
             idle_units = [u for u in friendly_units if u.health > 0 and u.move_target is None]
             if len(idle_units) > 0:
-                num_to_send = max(1, int(len(idle_units) * attack_fraction * random.uniform(0.8, 1.2)))  # Extra randomness
+                num_to_send = max(1, int(len(idle_units) * attack_fraction * self.rng.uniform(0.8, 1.2)))  # Extra randomness
                 for unit in idle_units[:num_to_send]:
                     primary_target = self._get_nearest_enemy_target(enemy_buildings, enemy_units, unit.position)
                     if primary_target:
@@ -2786,7 +2908,7 @@ class AI:
                                 unit.move_target = enemy_hq.position
                         else:
                             unit.move_target = None
-            self.attack_timer = random.randint(0, attack_interval // 2)
+            self.attack_timer = self.rng.randint(0, attack_interval // 2)
         
         # Aggressive push: Scale by personality
         push_threshold = 0.5 * self.aggression_bias
@@ -2815,7 +2937,7 @@ class AI:
                         else:
                             unit.move_target = None
     
-    def update(self, friendly_units, friendly_buildings, enemy_units, enemy_buildings, all_buildings, map_width=MAP_WIDTH, map_height=MAP_HEIGHT):
+    def update(self, friendly_units, friendly_buildings, enemy_units, enemy_buildings, all_buildings, map_width=MAP_WIDTH, map_height=MAP_HEIGHT, frames=1):
         """
         Main AI loop: assesses, produces, builds, defends, attacks with timed, jittered intervals.
         
@@ -2826,23 +2948,26 @@ class AI:
         :param all_buildings: Global buildings.
         :param map_width: Map width.
         :param map_height: Map height.
+        :param frames: Frames elapsed since the previous call (the AI is ticked at a fixed rate, not every frame).
         """
         # Main AI loop: assesses, produces, builds, defends, attacks with timed, jittered intervals.
         self.assess_situation(friendly_units, friendly_buildings, enemy_units, enemy_buildings)
-        self.action_timer += 1
-        
-        # Apply offset and multiplier for desync
-        effective_timer = (self.action_timer + self.timer_offset) * self.interval_multiplier
-        
-        # Production: Base 60, now varied (e.g., 42-78 frames)
-        if int(effective_timer) % int(60 * self.interval_multiplier) == 0:
+        # Apply offset for desync; the multiplier varies the intervals below
+        prev_timer = self.action_timer + self.timer_offset
+        self.action_timer += frames
+        effective_timer = self.action_timer + self.timer_offset
+        
+        # Production: Base 60, now varied (e.g., 42-78 frames); fires each time the timer crosses an interval boundary
+        production_interval = int(60 * self.interval_multiplier)
+        if effective_timer // production_interval > prev_timer // production_interval:
             barracks_list = [b for b in friendly_buildings if b.unit_type == "Barracks" and b.health > 0]
             war_factory_list = [b for b in friendly_buildings if b.unit_type == "WarFactory" and b.health > 0]
             hangar_list = [b for b in friendly_buildings if b.unit_type == "Hangar" and b.health > 0]
             self.queue_unit_production(barracks_list, war_factory_list, hangar_list, friendly_units)
         
         # Building: Base 180, now varied (e.g., 126-234 frames)
-        if int(effective_timer) % int(180 * self.interval_multiplier) == 0 and self.hq.credits >= 300:
+        build_interval = int(180 * self.interval_multiplier)
+        if effective_timer // build_interval > prev_timer // build_interval and self.hq.credits >= 300:
             # Tweak building choice with personality
             if self.personality == 'rusher' and self.resource_count == 0:
                 cls = Barracks  # Rush military over economy
@@ -2862,7 +2987,7 @@ class AI:
                     if not built_ref:
                         cls = Refinery
                     else:
-                        cls = random.choice([ShaleFracker, BlackMarket])
+                        cls = self.rng.choice([ShaleFracker, BlackMarket])
                 elif self.power_shortage and self.economy_level > 0 and self.hq.credits >= UNIT_CLASSES["PowerPlant"]["cost"]:
                     cls = PowerPlant
                 elif self.military_prod_count < max(1, self.resource_count // 2 + 1):
@@ -2876,38 +3001,38 @@ class AI:
                     elif self.resource_count >= 3 and not built_hangar:
                         cls = Hangar
                     else:
-                        cls = random.choice([Barracks, WarFactory, Hangar])
+                        cls = self.rng.choice([Barracks, WarFactory, Hangar])
                 else:
-                    rand = random.random()
+                    rand = self.rng.random()
                     if rand < 0.4:
-                        cls = random.choice([Barracks, WarFactory, Hangar])
+                        cls = self.rng.choice([Barracks, WarFactory, Hangar])
                     elif rand < 0.7:
-                        cls = random.choice([OilDerrick, Refinery, ShaleFracker, BlackMarket])
+                        cls = self.rng.choice([OilDerrick, Refinery, ShaleFracker, BlackMarket])
                     else:
                         all_possible = [PowerPlant, Turret] + [OilDerrick, Refinery, ShaleFracker, BlackMarket]
-                        cls = random.choice(all_possible)
+                        cls = self.rng.choice(all_possible)
             
-            cost = UNIT_CLASSES[cls.__name__]["cost"]
+            cost = cls.cost
             if self.hq.credits >= cost:
                 pos = self.find_build_position(cls, all_buildings, map_width, map_height, prefer_near_hq=True)
                 if pos:
                     self.hq.place_building(pos, cls, all_buildings)
         
-        self.defense_timer += 1
+        self.defense_timer += frames
         defense_interval = int(240 * self.interval_multiplier)
         threat_threshold = 0.3 * self.aggression_bias  # Aggressive AIs build turrets sooner
         if self.defense_timer > defense_interval and self.threat_level > threat_threshold and self.turret_count < min(5, self.total_buildings // 3) and self.hq.credits >= UNIT_CLASSES["Turret"]["cost"]:
             pos = self.find_build_position(Turret, all_buildings, map_width, map_height, prefer_near_hq=True)
             if pos:
                 self.hq.place_building(pos, Turret, all_buildings)
-            self.defense_timer = random.randint(0, defense_interval // 2)  # Reset with jitter
+            self.defense_timer = self.rng.randint(0, defense_interval // 2)  # Reset with jitter
         
         enemy_hq = min(
             (b for b in enemy_buildings if b.unit_type == "Headquarters" and b.health > 0),
             key=lambda b: self.hq.distance_to(b.position),
             default=None
         )
-        self.strategize_attacks(friendly_units, enemy_hq, enemy_buildings, enemy_units)
+        self.strategize_attacks(friendly_units, enemy_hq, enemy_buildings, enemy_units, frames)
 
 # =============================================================================
 # Group: Production UI Constants
@@ -3163,85 +3288,181 @@ class ProductionInterface:
 # =============================================================================
 # Functions for minimap rendering, collision resolution, attack handling, projectile updates, cleanup.
 
-def draw_mini_map(screen: pg.Surface, camera: Camera, fog_of_war: FogOfWar, map_width: int, map_height: int, map_color: tuple, buildings, all_units, player_allies: Set[Team]):
+def build_terrain_tiles(map_width: int, map_height: int, map_color: tuple) -> list:
     """
-    Renders scaled top-down map with terrain variation, entities, camera view outline.
+    Computes every tile's deterministic color variation and crater once per map.
     
-    :param screen: Main screen.
-    :param camera: Camera.
-    :param fog_of_war: FogOfWar instance.
     :param map_width: Map width.
     :param map_height: Map height.
     :param map_color: Base map color tuple.
+    :return: List of (tx, ty, color, crater_color, grey_color, grey_crater_color), column by column;
+             the crater colors are None for tiles without a crater.
+    """
+    # Computes every tile's deterministic color variation and crater once per map.
+    # Grey variants are what the minimap shows for explored tiles outside current vision.
+    base_r, base_g, base_b = map_color
+    tiles = []
+    for tx in range(map_width // TILE_SIZE):
+        for ty in range(map_height // TILE_SIZE):
+            var_r = ((tx * 17 + ty * 31) % 41) - 20
+            var_g = ((tx * 23 + ty * 37) % 41) - 20
+            var_b = ((tx * 29 + ty * 41) % 41) - 20
+            tile_r = max(0, min(255, base_r + var_r))
+            tile_g = max(0, min(255, base_g + var_g))
+            tile_b = max(0, min(255, base_b + var_b))
+            avg = (tile_r + tile_g + tile_b) // 3
+            crater_color = grey_crater_color = None
+            if (tx * 123 + ty * 456) % 100 < 5:
+                crater_color = (max(0, tile_r - 40), max(0, tile_g - 40), max(0, tile_b - 40))
+                grey_crater_color = (max(0, avg - 40),) * 3
+            tiles.append((tx, ty, (tile_r, tile_g, tile_b), crater_color, (avg, avg, avg), grey_crater_color))
+    return tiles
+
+def create_terrain_surface(map_width: int, map_height: int, terrain_tiles: list) -> pg.Surface:
+    """
+    Renders the whole ground layer (tile color variation and craters) once at world scale.
+    
+    :param map_width: Map width.
+    :param map_height: Map height.
+    :param terrain_tiles: Tile table from build_terrain_tiles.
+    :return: Opaque Surface the size of the map.
+    """
+    # Renders the whole ground layer (tile color variation and craters) once at world scale.
+    # Terrain is static, so the game loop only has to blit (and scale) the visible part of it.
+    terrain = pg.Surface((map_width, map_height))
+    terrain.fill((0, 0, 0))
+    for tx, ty, color, crater_color, _, _ in terrain_tiles:
+        sx = tx * TILE_SIZE
+        sy = ty * TILE_SIZE
+        pg.draw.rect(terrain, color, (sx, sy, TILE_SIZE, TILE_SIZE))
+        if crater_color:
+            pg.draw.circle(terrain, crater_color, (sx + TILE_SIZE // 2, sy + TILE_SIZE // 2), TILE_SIZE // 4)
+    return to_display_format(terrain, alpha=False)
+
+@lru_cache(maxsize=4096)
+def solid_tile(color: tuple, size: tuple) -> pg.Surface:
+    """
+    Returns a shared opaque surface filled with color, for batching tile draws through Surface.blits.
+    
+    :param color: RGB tuple.
+    :param size: Tuple (width, height).
+    :return: Filled Surface; callers must not draw onto it.
+    """
+    tile = pg.Surface(size)
+    tile.fill(color)
+    return tile
+
+def scene_state(g: Dict[str, Any], mouse_pos: tuple, on_screen_units: list, on_screen_buildings: list):
+    """
+    Captures everything the in-game frame draws, so run_game can skip redrawing an unchanged scene.
+    
+    :param g: Game data dict.
+    :param mouse_pos: Current mouse position (hover bars, placement ghost).
+    :param on_screen_units: Units fetched for drawing this frame; nothing outside them reaches the screen.
+    :param on_screen_buildings: Buildings fetched for drawing this frame.
+    :return: Hashable snapshot, or None while projectiles or particles are animating.
+    """
+    # Captures everything the in-game frame draws, so run_game can skip redrawing an unchanged scene.
+    if g["projectiles"] or g["particles"]:
+        return None
+    # Plasma burns fade every step and are drawn with their entity rather than from g["particles"]
+    if any(e.plasma_burn_particles for e in on_screen_units) or any(b.plasma_burn_particles for b in on_screen_buildings):
+        return None
+    camera = g["camera"]
+    interface = g["interface"]
+    return (
+        tuple(camera.rect), camera.zoom, mouse_pos, g["fog_of_war"].revision,
+        g["select_rect"] and tuple(g["select_rect"]),
+        # The sidebar shows the producer's queue and the power balance wherever on the map they come from
+        interface and (
+            interface.placing_cls, interface.producer, interface.hq.credits, interface.hq.power_output, interface.hq.power_usage,
+            getattr(interface.producer, 'production_timer', None), len(getattr(interface.producer, 'production_queue', ())),
+        ),
+        tuple((u, u.position.x, u.position.y, u.health, u.selected, u.under_attack, u.body_angle, u.turret_angle) for u in on_screen_units),
+        tuple(
+            (b, b.health, b.selected, b.is_seen, b.under_attack, b.turret_angle, getattr(b, 'production_timer', None), len(getattr(b, 'production_queue', ())), getattr(b, 'gate_open', False))
+            for b in on_screen_buildings
+        ),
+    )
+
+def render_mini_map(mini_map: pg.Surface, fog_of_war: FogOfWar, map_width: int, map_height: int, terrain_tiles: list, buildings, all_units, player_allies_mask: int):
+    """
+    Renders scaled top-down map with terrain variation and entities into a reusable minimap surface.
+    
+    :param mini_map: MINI_MAP_WIDTH x MINI_MAP_HEIGHT surface, overwritten in place.
+    :param fog_of_war: FogOfWar instance.
+    :param map_width: Map width.
+    :param map_height: Map height.
+    :param terrain_tiles: Tile table from build_terrain_tiles.
     :param buildings: Building group.
     :param all_units: Unit group.
-    :param player_allies: Allied teams for visibility.
-    :return: Minimap Rect.
+    :param player_allies_mask: team_mask of the allied teams for visibility.
     """
-    # Renders scaled top-down map with terrain variation, entities, camera view outline.
-    mini_map_rect = pg.Rect(SCREEN_WIDTH - MINI_MAP_WIDTH, SCREEN_HEIGHT - MINI_MAP_HEIGHT, MINI_MAP_WIDTH, MINI_MAP_HEIGHT)
-    mini_map = pg.Surface((MINI_MAP_WIDTH, MINI_MAP_HEIGHT))
+    # Renders scaled top-down map with terrain variation and entities into a reusable minimap surface.
     mini_map.fill((0, 0, 0))
     
-    num_tx = map_width // TILE_SIZE
-    num_ty = map_height // TILE_SIZE
     scale_x = MINI_MAP_WIDTH / map_width
     scale_y = MINI_MAP_HEIGHT / map_height
     tile_mw = TILE_SIZE * scale_x
     tile_mh = TILE_SIZE * scale_y
-    base_r, base_g, base_b = map_color
+    tile_size = (int(tile_mw), int(tile_mh))  # Same truncation pg.draw.rect applied to the float rect
+    crater_radius = int(tile_mw / 4)
     
-    for tx in range(num_tx):
+    # Collect tiles into one blits batch; craters sit inside their own tile, so they can go on afterwards
+    tile_blits = []
+    craters = []
+    for tx, ty, color, crater_color, grey_color, grey_crater_color in terrain_tiles:
+        tile_center = ((tx + 0.5) * TILE_SIZE, (ty + 0.5) * TILE_SIZE)
+        if not fog_of_war.is_explored(tile_center):
+            continue
+        if not fog_of_war.is_visible(tile_center):
+            color, crater_color = grey_color, grey_crater_color
         mx = tx * TILE_SIZE * scale_x
-        tile_center_x = (tx + 0.5) * TILE_SIZE
-        for ty in range(num_ty):
-            tile_center_y = (ty + 0.5) * TILE_SIZE
-            if not fog_of_war.is_explored((tile_center_x, tile_center_y)):
-                continue
-            my = ty * TILE_SIZE * scale_y
-            var_r = ((tx * 17 + ty * 31) % 41) - 20
-            var_g = ((tx * 23 + ty * 37) % 41) - 20
-            var_b = ((tx * 29 + ty * 41) % 41) - 20
-            tile_r = max(0, min(255, base_r + var_r))
-            tile_g = max(0, min(255, base_g + var_g))
-            tile_b = max(0, min(255, base_b + var_b))
-            if not fog_of_war.is_visible((tile_center_x, tile_center_y)):
-                avg = (tile_r + tile_g + tile_b) // 3
-                tile_r = tile_g = tile_b = avg
-            pg.draw.rect(mini_map, (tile_r, tile_g, tile_b), (mx, my, tile_mw, tile_mh))
-            crater_seed = (tx * 123 + ty * 456) % 100
-            if crater_seed < 5:
-                cx = mx + tile_mw / 2
-                cy = my + tile_mh / 2
-                cr = tile_mw / 4
-                dark_r = max(0, tile_r - 40)
-                dark_g = max(0, tile_g - 40)
-                dark_b = max(0, tile_b - 40)
-                pg.draw.circle(mini_map, (dark_r, dark_g, dark_b), (int(cx), int(cy)), int(cr))
+        my = ty * TILE_SIZE * scale_y
+        tile_blits.append((solid_tile(color, tile_size), (int(mx), int(my))))
+        if crater_color and crater_radius > 0:
+            craters.append((crater_color, (int(mx + tile_mw / 2), int(my + tile_mh / 2))))
+    mini_map.blits(tile_blits, doreturn=False)
+    for crater_color, center in craters:
+        pg.draw.circle(mini_map, crater_color, center, crater_radius)
     
     for building in buildings:
-        if building.health > 0 and (building.team in player_allies or building.is_seen) and fog_of_war.is_explored(building.position):
+        if building.health > 0 and (building.team_bit & player_allies_mask or building.is_seen) and fog_of_war.is_explored(building.position):
             color = team_to_color[building.team]
             x = int(building.position.x * scale_x)
             y = int(building.position.y * scale_y)
             pg.draw.rect(mini_map, color, (x - 2, y - 2, 5, 5))
     
     for unit in all_units:
-        if unit.health > 0 and (unit.team in player_allies or fog_of_war.is_visible(unit.position)):
+        if unit.health > 0 and (unit.team_bit & player_allies_mask or fog_of_war.is_visible(unit.position)):
             color = team_to_color[unit.team]
             x = int(unit.position.x * scale_x)
             y = int(unit.position.y * scale_y)
             pg.draw.circle(mini_map, color, (x, y), 2)
+
+def draw_mini_map(screen: pg.Surface, camera: Camera, mini_map: pg.Surface, map_width: int, map_height: int):
+    """
+    Blits the last rendered minimap to the corner and outlines the camera view on it.
     
+    :param screen: Main screen.
+    :param camera: Camera.
+    :param mini_map: Surface filled by render_mini_map.
+    :param map_width: Map width.
+    :param map_height: Map height.
+    :return: Minimap Rect.
+    """
+    # Blits the last rendered minimap to the corner and outlines the camera view on it.
+    mini_map_rect = MINI_MAP_RECT
+    screen.blit(mini_map, mini_map_rect)
+    scale_x = MINI_MAP_WIDTH / map_width
+    scale_y = MINI_MAP_HEIGHT / map_height
     cam_rect = pg.Rect(
         camera.rect.x * scale_x,
         camera.rect.y * scale_y,
         camera.rect.width * scale_x,
         camera.rect.height * scale_y
     )
-    pg.draw.rect(mini_map, (255, 255, 255), cam_rect, 1)
-    
-    screen.blit(mini_map, (SCREEN_WIDTH - MINI_MAP_WIDTH, SCREEN_HEIGHT - MINI_MAP_HEIGHT))
+    pg.draw.rect(screen.subsurface(mini_map_rect), (255, 255, 255), cam_rect, 1)
     return mini_map_rect
 
 def handle_unit_collisions(all_units: list, unit_hash: SpatialHash):
@@ -3252,14 +3473,23 @@ def handle_unit_collisions(all_units: list, unit_hash: SpatialHash):
     :param unit_hash: SpatialHash for nearby queries.
     """
     # Resolves overlaps between ground units using simple repulsion.
-    for i, unit in enumerate(all_units):
+    # Units sharing a cell share one candidate list; rect overlap is found by collidelistall in C.
+    neighborhoods = {}
+    for unit in all_units:
         if unit.health <= 0 or unit.air:
             continue
-        nearby = unit_hash.query(unit.position, max(unit.rect.width, unit.rect.height))
-        for other in nearby:
-            if other is unit or other.health <= 0 or other.air or id(other) <= id(unit):
+        key = unit_hash.get_key(unit.position)
+        neighborhood = neighborhoods.get(key)
+        if neighborhood is None:
+            candidates = [o for o in unit_hash.neighborhood(key) if o.health > 0 and not o.air]
+            neighborhood = neighborhoods[key] = (candidates, [o.rect for o in candidates])
+        candidates, rects = neighborhood
+        reach = max(unit.rect.width, unit.rect.height)
+        for idx in unit.rect.collidelistall(rects):
+            other = candidates[idx]
+            if other is unit or id(other) <= id(unit):
                 continue
-            if unit.rect.colliderect(other.rect):
+            if unit.distance_to(other.position) <= reach:
                 dx = other.position.x - unit.position.x
                 dy = other.position.y - unit.position.y
                 dist = math.hypot(dx, dy)
@@ -3285,10 +3515,20 @@ def handle_unit_building_collisions(all_units: list, all_buildings: list, buildi
     :param building_hash: SpatialHash for buildings.
     """
     # Pushes units away from building overlaps.
-    for unit in [u for u in all_units if u.health > 0 and not u.air]:
-        nearby_builds = building_hash.query(unit.position, max(unit.rect.width, unit.rect.height) + 50)
-        for building in [b for b in nearby_builds if b.health > 0]:
-            if unit.rect.colliderect(building.rect):
+    neighborhoods = {}
+    for unit in all_units:
+        if unit.health <= 0 or unit.air:
+            continue
+        key = building_hash.get_key(unit.position)
+        neighborhood = neighborhoods.get(key)
+        if neighborhood is None:
+            candidates = [b for b in building_hash.neighborhood(key) if b.health > 0]
+            neighborhood = neighborhoods[key] = (candidates, [b.rect for b in candidates])
+        candidates, rects = neighborhood
+        reach = max(unit.rect.width, unit.rect.height) + 50
+        for idx in unit.rect.collidelistall(rects):
+            building = candidates[idx]
+            if building.distance_to(unit.position) <= reach:
                 dx = building.position.x - unit.position.x
                 dy = building.position.y - unit.position.y
                 dist = math.hypot(dx, dy)
@@ -3302,30 +3542,20 @@ def handle_unit_building_collisions(all_units: list, all_buildings: list, buildi
                         unit.position.x -= direction_x * overlap
                         unit.position.y -= direction_y * overlap
 
-def handle_attacks(team: Team, all_units: list, all_buildings: list, projectiles, particles, unit_hash: SpatialHash, building_hash: SpatialHash, alliances: Dict[Team, Set[Team]]):
+def handle_attacks(team: Team, armed_entities: list, projectiles, particles, unit_hash: SpatialHash, building_hash: SpatialHash, alliance_masks: Dict[Team, int]):
     """
     For a team, finds targets in sight range and shoots if in attack range; handles chasing.
     
     :param team: Attacking team.
-    :param all_units: All units.
-    :param all_buildings: All buildings.
+    :param armed_entities: The team's living armed units, then its living armed buildings.
     :param projectiles: Projectile group.
     :param particles: Particle group.
     :param unit_hash: Unit spatial hash.
     :param building_hash: Building spatial hash.
-    :param alliances: Team alliances dict.
+    :param alliance_masks: Team -> team_mask of its alliance.
     """
     # For a team, finds targets in sight range and shoots if in attack range; handles chasing.
-    unit_allies = alliances[team]
-    armed_entities = []
-    # Mobile units
-    for u in all_units:
-        if u.team == team and hasattr(u, 'weapons') and u.weapons and u.health > 0:
-            armed_entities.append(u)
-    # Buildings
-    for b in all_buildings:
-        if b.team == team and hasattr(b, 'weapons') and b.weapons and b.health > 0:
-            armed_entities.append(b)
+    allies_mask = alliance_masks[team]
     for entity in armed_entities:
         if entity.last_shot_time != 0:
             continue
@@ -3337,7 +3567,7 @@ def handle_attacks(team: Team, all_units: list, all_buildings: list, projectiles
         min_overall_dist = float("inf")
         candidates = unit_hash.query(entity.position, entity.sight_range) + building_hash.query(entity.position, entity.sight_range)
         for obj in candidates:
-            if hasattr(obj, 'team') and obj.team not in unit_allies and hasattr(obj, 'health') and obj.health > 0:
+            if hasattr(obj, 'team') and not obj.team_bit & allies_mask and hasattr(obj, 'health') and obj.health > 0:
                 if obj.is_building:
                     closest_pt = entity._closest_point_on_rect(obj.rect, entity.position)
                     dist = Vector2(closest_pt).distance_to(entity.position)
@@ -3384,24 +3614,30 @@ def handle_attacks(team: Team, all_units: list, all_buildings: list, projectiles
                     else:
                         entity.move_target = closest_target.position
 
-def handle_projectiles(projectiles, all_units, all_buildings, particles, g):
+def handle_projectiles(projectiles, all_units, all_buildings, particles, g, unit_hash: SpatialHash, building_hash: SpatialHash):
     """
     Updates projectiles, checks hits on enemies, applies damage/explosions.
     
+    Hit candidates come from the spatial hashes around each projectile rather than a scan of every entity.
+    
     :param projectiles: Projectile group.
     :param all_units: All units.
     :param all_buildings: All buildings.
     :param particles: Particle group.
     :param g: Game data dict.
+    :param unit_hash: Unit spatial hash, synced this frame.
+    :param building_hash: Building spatial hash, synced this frame.
     """
     # Updates projectiles, checks hits on enemies, applies damage/explosions.
     for projectile in list(projectiles):
-        proj_allies = g["alliances"][projectile.team]
-        enemy_units = [u for u in all_units if u.team not in proj_allies and u.health > 0]
-        enemy_buildings = [b for b in all_buildings if b.team not in proj_allies and b.health > 0]
+        allies_mask = g["alliance_masks"][projectile.team]
+        # Anything a projectile can touch sits well inside one cell of it
+        nearby = unit_hash.query(projectile.position, unit_hash.cell_size) + building_hash.query(projectile.position, building_hash.cell_size)
         
         hit = False
-        for e in enemy_units + enemy_buildings:
+        for e in nearby:
+            if e.team_bit & allies_mask or e.health <= 0:
+                continue
             if check_collision(e, projectile):
                 if e.take_damage(projectile.damage, particles):
                     create_explosion(e.position, particles, e.team)
@@ -3473,10 +3709,39 @@ def cleanup_dead_entities(g):
 # =============================================================================
 # UI classes for main menu, skirmish setup, victory/defeat screens.
 
+def to_display_format(surface: pg.Surface, alpha: bool = True) -> pg.Surface:
+    """
+    Converts a cached surface to the display's pixel format so later blits skip per-pixel conversion.
+    
+    :param surface: Surface to convert.
+    :param alpha: Keep per-pixel alpha (convert_alpha) instead of converting to an opaque surface.
+    :return: Converted surface, or the original one if no display mode has been set yet.
+    """
+    if pg.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
+# Fill color keyed out around a button's rounded corners; never used as a button or text color
+BUTTON_FACE_KEY = (255, 0, 255)
+
+@lru_cache(maxsize=512)
+def render_text(font: pg.font.Font, text: str, rgb: tuple) -> pg.Surface:
+    """
+    Renders antialiased text once per (font, text, color) and reuses the surface on later calls.
+    
+    :param font: Font to render with.
+    :param text: Text to render.
+    :param rgb: Text color as an (r, g, b) tuple (pg.Color is unhashable).
+    :return: Text surface in display format; callers must not draw onto it.
+    """
+    return to_display_format(font.render(text, True, rgb))
+
 class MenuButton:
     """
     Simple clickable button with hover effect.
     """
+    __slots__ = ('rect', 'text', 'color', 'hover_color', 'current_color', 'faces')  # Many instances per menu; no per-button __dict__
+    
     def __init__(self, x, y, width, height, text, color, hover_color):
         """
         :param x: X position.
@@ -3493,14 +3758,46 @@ class MenuButton:
         self.color = color
         self.hover_color = hover_color
         self.current_color = color
+        self.faces = None  # (font, normal surface, hover surface), rendered on first draw
     
     def update(self, mouse_pos):
         """
         Updates button color based on hover.
         
         :param mouse_pos: Mouse position.
+        :return: True if the hover color changed.
+        """
+        new_color = self.hover_color if self.rect.collidepoint(mouse_pos) else self.color
+        changed = new_color is not self.current_color
+        self.current_color = new_color
+        return changed
+    
+    def _render_face(self, color, font):
+        """
+        Renders the rounded button body and its label into one surface.
+        
+        :param color: Body color.
+        :param font: Font for text.
+        :return: Opaque surface the size of the button, colorkeyed outside the rounded corners.
+        """
+        face = pg.Surface(self.rect.size)
+        face.fill(BUTTON_FACE_KEY)
+        face.set_colorkey(BUTTON_FACE_KEY)
+        pg.draw.rect(face, color, face.get_rect(), border_radius=10)
+        text_surf = render_text(font, self.text, (255, 255, 255))
+        face.blit(text_surf, text_surf.get_rect(center=face.get_rect().center))
+        return to_display_format(face, alpha=False)
+    
+    def face(self, font):
+        """
+        Returns the pre-rendered surface for the current hover state.
+        
+        :param font: Font for text.
+        :return: Button surface to blit at self.rect.
         """
-        self.current_color = self.hover_color if self.rect.collidepoint(mouse_pos) else self.color
+        if self.faces is None or self.faces[0] is not font:
+            self.faces = (font, self._render_face(self.color, font), self._render_face(self.hover_color, font))
+        return self.faces[2] if self.current_color is self.hover_color else self.faces[1]
     
     def draw(self, surface, font):
         """
@@ -3509,10 +3806,7 @@ class MenuButton:
         :param surface: Surface to draw on.
         :param font: Font for text.
         """
-        pg.draw.rect(surface, self.current_color, self.rect, border_radius=10)
-        text_surf = font.render(self.text, True, pg.Color("white"))
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        surface.blit(text_surf, text_rect)
+        surface.blit(self.face(font), self.rect)
     
     def is_clicked(self, mouse_pos):
         """
@@ -3523,6 +3817,20 @@ class MenuButton:
         """
         return self.rect.collidepoint(mouse_pos)
 
+def redraw_buttons(surface, background, buttons, font):
+    """
+    Repaints buttons over their slices of a full-screen background in a single blits call.
+    
+    :param surface: Surface to draw on.
+    :param background: Full-screen surface the buttons sit on.
+    :param buttons: MenuButtons to repaint.
+    :param font: Font for text.
+    :return: The button rects, for pg.display.update.
+    """
+    rects = [btn.rect for btn in buttons]
+    surface.blits([(background, rect, rect) for rect in rects] + [(btn.face(font), btn.rect) for btn in buttons], doreturn=False)
+    return rects
+
 class MainMenu:
     """
     Main menu with Single Player and Quit buttons.
@@ -3537,6 +3845,14 @@ class MainMenu:
         self.font_medium = font_medium
         self.skirmish_btn = MenuButton(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 - 60, 200, 60, "Single Player", pg.Color(50, 150, 50), pg.Color(100, 200, 100))
         self.quit_btn = MenuButton(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 40, 200, 60, "Quit", pg.Color(150, 50, 50), pg.Color(200, 100, 100))
+        # Opaque full-screen background with the title baked in; draw() blits it instead of filling
+        self.background = pg.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.background.fill(pg.Color(40, 40, 40))
+        title = render_text(self.font_large, "RTS GAME", (0, 255, 200))
+        self.background.blit(title, title.get_rect(center=(SCREEN_WIDTH // 2, 100)))
+        self.background = to_display_format(self.background, alpha=False)
+        self.dirty = True  # Full redraw needed; cleared by GameManager after drawing
+        self.hover_changed = []  # Buttons whose hover color changed since the last draw
     
     def handle_event(self, event):
         """
@@ -3558,26 +3874,39 @@ class MainMenu:
         
         :param mouse_pos: Mouse position.
         """
-        self.skirmish_btn.update(mouse_pos)
-        self.quit_btn.update(mouse_pos)
+        if self.skirmish_btn.update(mouse_pos):
+            self.hover_changed.append(self.skirmish_btn)
+        if self.quit_btn.update(mouse_pos):
+            self.hover_changed.append(self.quit_btn)
     
     def draw(self, surface):
         """
-        Draws menu.
+        Draws menu, or only the buttons whose hover changed when no full redraw is pending.
         
         :param surface: Surface to draw on.
-        """
-        surface.fill(pg.Color(40, 40, 40))
-        title = self.font_large.render("RTS GAME", True, pg.Color(0, 255, 200))
-        title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 100))
-        surface.blit(title, title_rect)
-        self.skirmish_btn.draw(surface, self.font_medium)
-        self.quit_btn.draw(surface, self.font_medium)
+        :return: Screen rects that changed, for pg.display.update.
+        """
+        if not self.dirty:
+            rects = redraw_buttons(surface, self.background, self.hover_changed, self.font_medium)
+            self.hover_changed = []
+            return rects
+        surface.blits([
+            (self.background, (0, 0)),
+            (self.skirmish_btn.face(self.font_medium), self.skirmish_btn.rect),
+            (self.quit_btn.face(self.font_medium), self.quit_btn.rect),
+        ], doreturn=False)
+        self.hover_changed = []
+        return [surface.get_rect()]
 
 class SkirmishSetup:
     """
     Setup menu for mode, size, map selection.
     """
+    # (label, value, x offset from screen centre) for each game mode button
+    MODES = (("1v1", "1v1", -300), ("2v2", "2v2", -200), ("3v3", "3v3", -100), ("4v4", "4v4", 0), ("4FFA", "4ffa", 100))
+    # (label, value, x) for each map size button
+    SIZES = (("Tiny", "tiny", 200), ("Small", "small", 350), ("Medium", "medium", 500), ("Large", "large", 650), ("Huge", "huge", 800))
+    
     def __init__(self, font_large, font_medium):
         """
         :param font_large: Large font.
@@ -3589,69 +3918,99 @@ class SkirmishSetup:
         self.game_mode = None
         self.size_choice = None
         self.map_choice = None
+        self.dirty = True  # Full redraw needed; cleared by GameManager after drawing
+        self.hover_changed = []  # Buttons whose hover color changed since the last draw
+        
+        self.mode_names = [value for _, value, _ in self.MODES]
+        self.mode_buttons = [MenuButton(SCREEN_WIDTH // 2 + dx, 150, 80, 50, label, pg.Color(50, 100, 150), pg.Color(100, 150, 200)) for label, _, dx in self.MODES]
+        self.mode_rects = [btn.rect for btn in self.mode_buttons]
         
-        self.mode_1v1 = MenuButton(SCREEN_WIDTH // 2 - 300, 150, 80, 50, "1v1", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.mode_2v2 = MenuButton(SCREEN_WIDTH // 2 - 200, 150, 80, 50, "2v2", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.mode_3v3 = MenuButton(SCREEN_WIDTH // 2 - 100, 150, 80, 50, "3v3", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.mode_4v4 = MenuButton(SCREEN_WIDTH // 2, 150, 80, 50, "4v4", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.mode_4ffa = MenuButton(SCREEN_WIDTH // 2 + 100, 150, 80, 50, "4FFA", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        
-        self.size_tiny = MenuButton(200, 220, 120, 50, "Tiny", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.size_small = MenuButton(350, 220, 120, 50, "Small", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.size_medium = MenuButton(500, 220, 120, 50, "Medium", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.size_large = MenuButton(650, 220, 120, 50, "Large", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.size_huge = MenuButton(800, 220, 120, 50, "Huge", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        
-        self.map_buttons = {}
-        map_list = list(MAPS.keys())
-        for i, map_name in enumerate(map_list):
+        self.size_names = [value for _, value, _ in self.SIZES]
+        self.size_buttons = [MenuButton(x, 220, 120, 50, label, pg.Color(50, 100, 150), pg.Color(100, 150, 200)) for label, _, x in self.SIZES]
+        self.size_rects = [btn.rect for btn in self.size_buttons]
+        
+        # Parallel lists: index i of each refers to the same map
+        self.map_names = list(MAPS.keys())
+        self.map_buttons = []
+        for i, map_name in enumerate(self.map_names):
             x = 100 + (i % 2) * 300
             y = 350 + (i // 2) * 80
-            self.map_buttons[map_name] = MenuButton(x, y, 200, 60, map_name, pg.Color(100, 100, 100), pg.Color(150, 150, 150))
+            self.map_buttons.append(MenuButton(x, y, 200, 60, map_name, pg.Color(100, 100, 100), pg.Color(150, 150, 150)))
+        self.map_rects = [btn.rect for btn in self.map_buttons]
         
         self.start_btn = MenuButton(SCREEN_WIDTH // 2 - 80, SCREEN_HEIGHT - 100, 160, 50, "Start Game", pg.Color(50, 150, 50), pg.Color(100, 200, 100))
         self.spectate_btn = MenuButton(SCREEN_WIDTH // 2 + 100, SCREEN_HEIGHT - 100, 160, 50, "Spectate", pg.Color(100, 50, 150), pg.Color(150, 100, 200))
         self.back_btn = MenuButton(20, SCREEN_HEIGHT - 70, 120, 50, "Back", pg.Color(150, 100, 50), pg.Color(200, 150, 100))
+        
+        # Every button in draw order, with rects alongside for a single collidelist hover test per frame
+        self.buttons = [*self.mode_buttons, *self.size_buttons, *self.map_buttons, self.start_btn, self.spectate_btn, self.back_btn]
+        self.button_rects = [btn.rect for btn in self.buttons]
+        self.hover_idx = -1
+
+        # Headings never change, so bake them into an opaque background that draw() blits instead of filling.
+        self.background = pg.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.background.fill(pg.Color(40, 40, 40))
+        title = render_text(self.font_large, "Skirmish Setup", (0, 255, 200))
+        label_blits = [(title, title.get_rect(center=(SCREEN_WIDTH // 2, 40)))]
+        for label, pos in (("Select Game Mode:", (50, 120)), ("Select Size:", (50, 190)), ("Select Map:", (50, 320))):
+            label_blits.append((render_text(self.font_medium, label, (200, 200, 200)), pos))
+        self.background.blits(label_blits, doreturn=False)
+        self.background = to_display_format(self.background, alpha=False)
+        self.readout_blits = []
+    
+    def reset(self):
+        """
+        Clears the selections and hover for a fresh visit, keeping the buttons and pre-rendered background.
+        """
+        self.game_mode = None
+        self.size_choice = None
+        self.map_choice = None
+        self.readout_blits = []
+        for btn in self.buttons:
+            btn.current_color = btn.color
+        self.hover_idx = -1
+        self.hover_changed = []
+        self.dirty = True
+    
+    def _update_readouts(self):
+        """
+        Formats and renders the "Selected: ..." readouts for the current choices.
+        """
+        self.readout_blits = []
+        for choice, y in ((self.game_mode, 160), (self.size_choice, 230), (self.map_choice, 390)):
+            if choice:
+                self.readout_blits.append((render_text(self.font_medium, f"Selected: {choice}", (100, 255, 100)), (SCREEN_WIDTH - 250, y)))
     
     def handle_event(self, event):
         """
         Handles setup events.
         
         :param event: Pygame event.
-        :return: Transition tuple or None.
+        :return: "start_game", "spectate" or "menu"; the chosen settings stay on this object. None otherwise.
         """
         if event.type == pg.MOUSEBUTTONDOWN:
-            if self.mode_1v1.is_clicked(event.pos):
-                self.game_mode = "1v1"
-            elif self.mode_2v2.is_clicked(event.pos):
-                self.game_mode = "2v2"
-            elif self.mode_3v3.is_clicked(event.pos):
-                self.game_mode = "3v3"
-            elif self.mode_4v4.is_clicked(event.pos):
-                self.game_mode = "4v4"
-            elif self.mode_4ffa.is_clicked(event.pos):
-                self.game_mode = "4ffa"
+            self.dirty = True
+            click_rect = pg.Rect(event.pos, (1, 1))
+            mode_idx = click_rect.collidelist(self.mode_rects)
+            if mode_idx >= 0:
+                self.game_mode = self.mode_names[mode_idx]
             
-            if self.size_tiny.is_clicked(event.pos):
-                self.size_choice = "tiny"
-            elif self.size_small.is_clicked(event.pos):
-                self.size_choice = "small"
-            elif self.size_medium.is_clicked(event.pos):
-                self.size_choice = "medium"
-            elif self.size_large.is_clicked(event.pos):
-                self.size_choice = "large"
-            elif self.size_huge.is_clicked(event.pos):
-                self.size_choice = "huge"
+            size_idx = click_rect.collidelist(self.size_rects)
+            if size_idx >= 0:
+                self.size_choice = self.size_names[size_idx]
             
-            for map_name, btn in self.map_buttons.items():
-                if btn.is_clicked(event.pos):
-                    self.map_choice = map_name
+            map_idx = click_rect.collidelist(self.map_rects)
+            if map_idx >= 0:
+                self.map_choice = self.map_names[map_idx]
+            
+            if mode_idx >= 0 or size_idx >= 0 or map_idx >= 0:
+                self._update_readouts()
             
             if self.start_btn.is_clicked(event.pos) and self.game_mode and self.size_choice and self.map_choice:
-                return ("start_game", self.game_mode, self.size_choice, self.map_choice, False)
+                return "start_game"
             
             if self.spectate_btn.is_clicked(event.pos) and self.game_mode and self.size_choice and self.map_choice:
-                return ("start_game", self.game_mode, self.size_choice, self.map_choice, True)
+                return "spectate"
             
             if self.back_btn.is_clicked(event.pos):
                 return "menu"
@@ -3664,70 +4023,35 @@ class SkirmishSetup:
         
         :param mouse_pos: Mouse position.
         """
-        self.mode_1v1.update(mouse_pos)
-        self.mode_2v2.update(mouse_pos)
-        self.mode_3v3.update(mouse_pos)
-        self.mode_4v4.update(mouse_pos)
-        self.mode_4ffa.update(mouse_pos)
-        self.size_tiny.update(mouse_pos)
-        self.size_small.update(mouse_pos)
-        self.size_medium.update(mouse_pos)
-        self.size_large.update(mouse_pos)
-        self.size_huge.update(mouse_pos)
-        for btn in self.map_buttons.values():
-            btn.update(mouse_pos)
-        self.start_btn.update(mouse_pos)
-        self.spectate_btn.update(mouse_pos)
-        self.back_btn.update(mouse_pos)
+        hover_idx = pg.Rect(mouse_pos, (1, 1)).collidelist(self.button_rects)
+        if hover_idx != self.hover_idx:
+            if self.hover_idx >= 0:
+                btn = self.buttons[self.hover_idx]
+                btn.current_color = btn.color
+                self.hover_changed.append(btn)
+            if hover_idx >= 0:
+                btn = self.buttons[hover_idx]
+                btn.current_color = btn.hover_color
+                self.hover_changed.append(btn)
+            self.hover_idx = hover_idx
     
     def draw(self, surface):
         """
-        Draws setup menu.
+        Draws setup menu, or only the buttons whose hover changed when no full redraw is pending.
         
         :param surface: Surface to draw on.
-        """
-        surface.fill(pg.Color(40, 40, 40))
-        
-        title = self.font_large.render("Skirmish Setup", True, pg.Color(0, 255, 200))
-        title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 40))
-        surface.blit(title, title_rect)
-        
-        mode_label = self.font_medium.render("Select Game Mode:", True, pg.Color(200, 200, 200))
-        surface.blit(mode_label, (50, 120))
-        self.mode_1v1.draw(surface, self.font_medium)
-        self.mode_2v2.draw(surface, self.font_medium)
-        self.mode_3v3.draw(surface, self.font_medium)
-        self.mode_4v4.draw(surface, self.font_medium)
-        self.mode_4ffa.draw(surface, self.font_medium)
-        
-        if self.game_mode:
-            mode_text = self.font_medium.render(f"Selected: {self.game_mode}", True, pg.Color(100, 255, 100))
-            surface.blit(mode_text, (SCREEN_WIDTH - 250, 160))
-        
-        size_label = self.font_medium.render("Select Size:", True, pg.Color(200, 200, 200))
-        surface.blit(size_label, (50, 190))
-        self.size_tiny.draw(surface, self.font_medium)
-        self.size_small.draw(surface, self.font_medium)
-        self.size_medium.draw(surface, self.font_medium)
-        self.size_large.draw(surface, self.font_medium)
-        self.size_huge.draw(surface, self.font_medium)
-        
-        if self.size_choice:
-            size_text = self.font_medium.render(f"Selected: {self.size_choice}", True, pg.Color(100, 255, 100))
-            surface.blit(size_text, (SCREEN_WIDTH - 250, 230))
-        
-        map_label = self.font_medium.render("Select Map:", True, pg.Color(200, 200, 200))
-        surface.blit(map_label, (50, 320))
-        for btn in self.map_buttons.values():
-            btn.draw(surface, self.font_medium)
-        
-        if self.map_choice:
-            map_text = self.font_medium.render(f"Selected: {self.map_choice}", True, pg.Color(100, 255, 100))
-            surface.blit(map_text, (SCREEN_WIDTH - 250, 390))
-        
-        self.start_btn.draw(surface, self.font_medium)
-        self.spectate_btn.draw(surface, self.font_medium)
-        self.back_btn.draw(surface, self.font_medium)
+        :return: Screen rects that changed, for pg.display.update.
+        """
+        if not self.dirty:
+            rects = redraw_buttons(surface, self.background, self.hover_changed, self.font_medium)
+            self.hover_changed = []
+            return rects
+        blits = [(self.background, (0, 0))]
+        blits += [(btn.face(self.font_medium), btn.rect) for btn in self.buttons]
+        blits += self.readout_blits
+        surface.blits(blits, doreturn=False)
+        self.hover_changed = []
+        return [surface.get_rect()]
 
 class VictoryScreen:
     """
@@ -3748,6 +4072,9 @@ class VictoryScreen:
         self.all_stats = all_stats
         self.player_team = player_team
         self.continue_btn = MenuButton(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 300, 200, 60, "Continue", pg.Color(50, 150, 50), pg.Color(100, 200, 100))
+        self.composed = None  # Everything but the Continue button, built on first draw
+        self.dirty = True  # Full redraw needed; cleared by GameManager after drawing
+        self.hover_changed = []  # Buttons whose hover color changed since the last draw
         
         # Table configuration
         self.table_x = 100
@@ -3761,7 +4088,44 @@ class VictoryScreen:
         self.header_color = pg.Color(100, 100, 100)
         self.row_color_even = pg.Color(40, 40, 40)
         self.row_color_odd = pg.Color(60, 60, 60)
-    
+
+        # Stats are frozen once the match ends, so resolve team colors and format every cell up front.
+        self.rows = []
+        for team_name, stats in sorted(all_stats.items(), key=lambda item: item[0]):  # Sort by team name
+            team_enum = self.get_team_enum(team_name)
+            team_color = team_to_color[team_enum] if team_enum else pg.Color(255, 255, 255)
+            values = [
+                team_name,
+                str(stats.get('units_created', 0)),
+                str(stats.get('units_destroyed', 0)),
+                str(stats.get('units_lost', 0)),
+                str(stats.get('buildings_constructed', 0)),
+                str(stats.get('buildings_destroyed', 0)),
+                str(stats.get('buildings_lost', 0)),
+                f"${stats.get('credits_earned', 0):,}"
+            ]
+            self.rows.append((team_color, values))
+
+        # Render header and cell text once; draw() submits the whole batch through a single Surface.blits call.
+        self.header_rects = []
+        self.text_blits = []
+        x_pos = self.table_x
+        for i, header in enumerate(["Player", "Produced", "Killed", "Casualties", "Built", "Raized", "Raized by", "Economy"]):
+            text_surf = render_text(self.font_medium, header, (255, 255, 255))
+            self.header_rects.append(pg.Rect(x_pos, self.table_y, self.col_widths[i], self.row_height))
+            text_rect = text_surf.get_rect(center=(x_pos + self.col_widths[i] // 2, self.table_y + self.row_height // 2))
+            # Clip to the cell's right edge, which the next header background used to overdraw
+            self.text_blits.append((text_surf, text_rect, pg.Rect(0, 0, x_pos + self.col_widths[i] - text_rect.x, text_rect.height)))
+            x_pos += self.col_widths[i]
+        for row_idx, (team_color, values) in enumerate(self.rows):
+            row_y = self.table_y + (row_idx + 1) * self.row_height
+            x_pos = self.table_x
+            for col_idx, value in enumerate(values):
+                rgb = tuple(team_color)[:3] if col_idx == 0 else (255, 255, 255)
+                text_surf = render_text(self.font_medium, value, rgb)
+                self.text_blits.append((text_surf, text_surf.get_rect(center=(x_pos + self.col_widths[col_idx] // 2, row_y + self.row_height // 2))))
+                x_pos += self.col_widths[col_idx]
+
     def get_team_enum(self, name):
         """
         Maps team name to enum.
@@ -3769,10 +4133,7 @@ class VictoryScreen:
         :param name: Team name string.
         :return: Team enum or None.
         """
-        for t, n in team_to_name.items():
-            if n == name:
-                return t
-        return None
+        return name_to_team.get(name)
     
     def handle_event(self, event):
         """
@@ -3792,14 +4153,14 @@ class VictoryScreen:
         
         :param mouse_pos: Mouse position.
         """
-        self.continue_btn.update(mouse_pos)
+        if self.continue_btn.update(mouse_pos):
+            self.hover_changed.append(self.continue_btn)
     
-    def draw(self, surface):
+    def _compose_static(self):
         """
-        Draws victory screen with stats table.
-        
-        :param surface: Surface to draw on.
+        Renders title, message and stats table once into self.composed.
         """
+        surface = pg.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
         surface.fill(pg.Color(20, 20, 20))
         
         if self.is_victory is None:
@@ -3841,47 +4202,36 @@ class VictoryScreen:
                 x_pos += width
             
             # Header row
-            headers = ["Player", "Produced", "Killed", "Casualties", "Built", "Raized", "Raized by", "Economy"]
-            x_pos = self.table_x
-            for i, header in enumerate(headers):
-                text_surf = self.font_medium.render(header, True, pg.Color("white"))
-                text_rect = text_surf.get_rect(center=(x_pos + self.col_widths[i] // 2, self.table_y + self.row_height // 2))
-                # Background for header
-                pg.draw.rect(surface, self.header_color, (x_pos, self.table_y, self.col_widths[i], self.row_height))
-                surface.blit(text_surf, text_rect)
-                x_pos += self.col_widths[i]
+            for rect in self.header_rects:
+                pg.draw.rect(surface, self.header_color, rect)
             
             # Data rows
-            sorted_stats = sorted(self.all_stats.items(), key=lambda item: item[0])  # Sort by team name
-            x_pos = self.table_x
-            for row_idx, (team_name, stats) in enumerate(sorted_stats):
+            for row_idx in range(len(self.rows)):
                 row_y = self.table_y + (row_idx + 1) * self.row_height
                 row_color = self.row_color_even if row_idx % 2 == 0 else self.row_color_odd
                 pg.draw.rect(surface, row_color, (self.table_x, row_y, self.table_width, self.row_height))
-                
-                team_enum = self.get_team_enum(team_name)
-                team_color = team_to_color[team_enum] if team_enum else pg.Color(255, 255, 255)
-                
-                values = [
-                    team_name,
-                    str(stats.get('units_created', 0)),
-                    str(stats.get('units_destroyed', 0)),
-                    str(stats.get('units_lost', 0)),
-                    str(stats.get('buildings_constructed', 0)),
-                    str(stats.get('buildings_destroyed', 0)),
-                    str(stats.get('buildings_lost', 0)),
-                    f"${stats.get('credits_earned', 0):,}"
-                ]
-                
-                for col_idx, value in enumerate(values):
-                    color = team_color if col_idx == 0 else pg.Color(255, 255, 255)
-                    text_surf = self.font_medium.render(value, True, color)
-                    text_rect = text_surf.get_rect(center=(x_pos + self.col_widths[col_idx] // 2, row_y + self.row_height // 2))
-                    surface.blit(text_surf, text_rect)
-                    x_pos += self.col_widths[col_idx]
-                x_pos = self.table_x  # Reset for next row
+            
+            # All header and cell text in one call
+            surface.blits(self.text_blits, doreturn=False)
+        
+        self.composed = to_display_format(surface, alpha=False)
+    
+    def draw(self, surface):
+        """
+        Draws victory screen with stats table, or only the Continue button when its hover changed.
         
-        self.continue_btn.draw(surface, self.font_medium)
+        :param surface: Surface to draw on.
+        :return: Screen rects that changed, for pg.display.update.
+        """
+        if self.composed is None:
+            self._compose_static()
+        if not self.dirty:
+            rects = redraw_buttons(surface, self.composed, self.hover_changed, self.font_medium)
+            self.hover_changed = []
+            return rects
+        surface.blits([(self.composed, (0, 0)), (self.continue_btn.face(self.font_medium), self.continue_btn.rect)], doreturn=False)
+        self.hover_changed = []
+        return [surface.get_rect()]
 
 # =============================================================================
 # Group: Game Orchestrator
@@ -3894,6 +4244,20 @@ class GameManager:
     
     Handles menu, setup, playing, victory/defeat states.
     """
+    # The only event types any screen reacts to; SDL drops everything else before it reaches the queue.
+    # Motion is left out: every screen only needs the latest cursor position, polled once per frame with pg.mouse.get_pos.
+    ALLOWED_EVENTS = [pg.QUIT, pg.KEYDOWN, pg.MOUSEBUTTONDOWN, pg.MOUSEBUTTONUP, pg.MOUSEWHEEL, pg.VIDEOEXPOSE]
+    # Subset the menu screens react to
+    MENU_EVENTS = [pg.QUIT, pg.MOUSEBUTTONDOWN, pg.VIDEOEXPOSE]
+    MENU_WAIT_MS = 16  # Longest a menu frame sleeps waiting for input; also how often hover is re-polled
+    # Attribute holding the screen shown in each non-playing state
+    MENU_SCREENS = {
+        GameState.MENU: "main_menu",
+        GameState.SKIRMISH_SETUP: "skirmish_setup",
+        GameState.VICTORY: "victory_screen",
+        GameState.DEFEAT: "victory_screen",
+    }
+    
     def __init__(self, screen, clock, font_large, font_medium):
         """
         Sets up screen, clock, fonts, initial menu state.
@@ -3916,6 +4280,24 @@ class GameManager:
         
         self.game_data = None
         self.running = True
+        self.menu_input = None  # (state, mouse pos) the menu hovers were last updated for
+        # Menus pace to the monitor's refresh rate where pygame can report it (pygame-ce); 60 otherwise
+        get_refresh_rate = getattr(pg.display, "get_current_refresh_rate", None)
+        self.menu_fps = (get_refresh_rate() if get_refresh_rate else 0) or 60
+        
+        pg.event.set_blocked(None)
+        pg.event.set_allowed(self.ALLOWED_EVENTS)
+        # run() dispatches on state through this table: menu screens share one frame function
+        self.state_handlers = {state: self._pump_menu for state in self.MENU_SCREENS}
+        self.state_handlers[GameState.PLAYING] = self.run_game
+        # In-game event dispatch: one dict lookup per event instead of an if/elif chain
+        self.event_handlers = {
+            pg.QUIT: self._handle_quit,
+            pg.MOUSEWHEEL: self._handle_mouse_wheel,
+            pg.MOUSEBUTTONDOWN: self._handle_mouse_down,
+            pg.MOUSEBUTTONUP: self._handle_mouse_up,
+            pg.KEYDOWN: self._handle_key_down,
+        }
     
     def initialize_game(self, game_mode, size_name, map_name, spectate=False):
         """
@@ -4024,6 +4406,7 @@ class GameManager:
                 alliances[team] = frozenset(player_side)
             else:
                 alliances[team] = frozenset(enemy_side)
+        alliance_masks = {team: team_mask(allies) for team, allies in alliances.items()}
         
         if not spectate:
             player_hq = hqs[Team.RED]
@@ -4043,8 +4426,8 @@ class GameManager:
             center_x = map_width / 2
             center_y = map_height / 2
             build_dir = math.atan2(center_y - pos[1], center_x - pos[0])
-            random.seed(team.value * 12345)  # Seed per team for consistent "personality" across runs
-            ai = AI(hqs[team], GameConsole(), build_dir=build_dir, allies=alliances[team])
+            rng = random.Random(team.value * 12345)  # Seeded per team for a consistent "personality" across runs
+            ai = AI(hqs[team], GameConsole(), build_dir=build_dir, allies=alliances[team], rng=rng)
             ais.append(ai)
         
         camera = Camera()
@@ -4061,6 +4444,7 @@ class GameManager:
         else:
             interface_rect = pg.Rect(0, 0, 0, 0)  
         
+        terrain_tiles = build_terrain_tiles(map_width, map_height, color)
         self.game_data = {
             "player_units": player_units,
             "ai_units": ai_units,
@@ -4075,6 +4459,8 @@ class GameManager:
             "player_team": player_team,
             "player_allies": player_allies,
             "alliances": alliances,
+            "alliance_masks": alliance_masks,
+            "player_allies_mask": team_mask(player_allies),
             "interface": interface,
             "console": GameConsole(),
             "fog_of_war": FogOfWar(map_width, map_height, spectator=spectate),
@@ -4092,265 +4478,361 @@ class GameManager:
             "interface_rect": interface_rect,
             "spectator": spectate,
             "teams": teams_list,
+            "unique_teams": list(dict.fromkeys(teams_list)),  # Iterated every frame, so deduplicated once here
+            "unit_hash": SpatialHash(200),  # Persistent grids, synced incrementally each frame
+            "building_hash": SpatialHash(200),
+            "terrain_tiles": terrain_tiles,
+            "frame": 0,  # Frames simulated so far; drives fixed-rate AI and fog updates
+            "terrain_surface": create_terrain_surface(map_width, map_height, terrain_tiles),
+            "mini_map_surface": to_display_format(pg.Surface((MINI_MAP_WIDTH, MINI_MAP_HEIGHT)), alpha=False),  # Re-rendered every MINI_MAP_TICK_FRAMES
+            "ground_cache": (None, None),  # ((view rect, zoom), scaled ground surface) from the last drawn frame
+            "drawn_scene": None,  # scene_state() of the frame currently on screen
+            "mini_map_next": 0,  # Sim frame at which the minimap is next re-rendered
         }
     
+    def _handle_quit(self, event):
+        """
+        Stops the game loop when the window is closed.
+        
+        :param event: Pygame event.
+        """
+        # Stops the game loop when the window is closed.
+        self.running = False
+    
+    def _handle_mouse_wheel(self, event):
+        """
+        Zooms the camera around the cursor when it is over the game view.
+        
+        :param event: Pygame event.
+        """
+        # Zooms the camera around the cursor when it is over the game view.
+        g = self.game_data
+        mouse_pos = pg.mouse.get_pos()
+        game_rect = pg.Rect(0, 0, g["camera"].width, g["camera"].height)
+        if game_rect.collidepoint(mouse_pos):
+            world_mouse = g["camera"].screen_to_world(mouse_pos)
+            g["camera"].update_zoom(event.y, world_mouse)
+    
+    def _handle_mouse_down(self, event):
+        """
+        Minimap jumps, interface clicks, building placement, selection start and right-click orders.
+        
+        :param event: Pygame event.
+        """
+        # Minimap jumps, interface clicks, building placement, selection start and right-click orders.
+        g = self.game_data
+        mouse_pos = event.pos
+        in_minimap = MINI_MAP_RECT.collidepoint(mouse_pos)
+        
+        if in_minimap and event.button == 1:
+            local_x = mouse_pos[0] - MINI_MAP_RECT.x
+            local_y = mouse_pos[1] - MINI_MAP_RECT.y
+            scale_x = g["map_width"] / MINI_MAP_WIDTH
+            scale_y = g["map_height"] / MINI_MAP_HEIGHT
+            world_x = local_x * scale_x
+            world_y = local_y * scale_y
+            g["camera"].rect.centerx = world_x
+            g["camera"].rect.centery = world_y
+            g["camera"].clamp()
+            if not g.get("spectator", False):
+                for unit in g["player_units"]:
+                    unit.selected = False
+                g["selected_units"].empty()
+                if g["selected_building"]:
+                    g["selected_building"].selected = False
+                g["selected_building"] = None
+                g["selecting"] = False
+                if g["interface"]:
+                    g["interface"].update_producer(g["player_hq"])
+            return
+        
+        if g.get("spectator", False):
+            return
+        
+        world_pos = g["camera"].screen_to_world(mouse_pos)
+        target_x, target_y = mouse_pos
+        # Hit-test entities in world space: one C-level collidelist instead of a screen rect per entity
+        world_click = pg.Rect(world_pos, (1, 1))
+        
+        if event.button == 1:
+            own_buildings = [b for b in g["global_buildings"] if b.team == g["player_team"]]
+            result = g["interface"].handle_click(mouse_pos, own_buildings)
+            if result:
+                if isinstance(result, tuple) and result[0] == 'sell':
+                    building_to_sell = result[1]
+                    if building_to_sell in g["global_buildings"]:
+                        g["global_buildings"].remove(building_to_sell)
+                        g["player_hq"].credits += building_to_sell.cost // 2
+                        if g["selected_building"] == building_to_sell:
+                            g["selected_building"] = None
+                            g["interface"].update_producer(g["player_hq"])
+                return
+            
+            if g["interface"].placing_cls is not None and not g["interface_rect"].collidepoint(mouse_pos):
+                snapped = snap_to_grid(world_pos)
+                buildings_list = list(g["global_buildings"])
+                cost = g["interface"].placing_cls.cost
+                if g["player_hq"].credits >= cost and is_valid_building_position(
+                    snapped, g["player_team"], g["interface"].placing_cls, buildings_list,
+                    g["map_width"], g["map_height"]
+                ):
+                    building = g["interface"].placing_cls(snapped, g["player_team"], hq=g["player_hq"])
+                    g["global_buildings"].add(building)
+                    g["player_hq"].credits -= cost
+                    g["interface"].placing_cls = None
+                else:
+                    g["interface"].placing_cls = None
+                return
+            
+            hit_idx = world_click.collidelist([b.rect for b in own_buildings])
+            clicked_building = own_buildings[hit_idx] if hit_idx >= 0 else None
+            if clicked_building:
+                if g["selected_building"] and g["selected_building"] != clicked_building:
+                    g["selected_building"].selected = False
+                clicked_building.selected = True
+                g["selected_building"] = clicked_building
+                for unit in g["player_units"]:
+                    unit.selected = False
+                g["selected_units"].empty()
+                g["interface"].update_producer(clicked_building)
+            else:
+                if g["selected_building"]:
+                    g["selected_building"].selected = False
+                g["selected_building"] = None
+                g["interface"].update_producer(g["player_hq"])
+                g["selecting"] = True
+                g["select_start"] = mouse_pos
+                g["select_rect"] = pg.Rect(target_x, target_y, 0, 0)
+        
+        elif event.button == 3:
+            if g["interface"].placing_cls is not None:
+                g["interface"].placing_cls = None
+            elif g["selected_building"] and hasattr(g["selected_building"], 'rally_point'):
+                g["selected_building"].rally_point = Vector2(world_pos)
+            elif g["selected_units"]:
+                # Check for clicked enemy
+                clicked_enemy = None
+                for group in (g["global_units"].sprites(), g["global_buildings"].sprites()):
+                    for i in world_click.collidelistall([e.rect for e in group]):
+                        if not group[i].team_bit & g["player_allies_mask"] and group[i].health > 0:
+                            clicked_enemy = group[i]
+                            break
+                    if clicked_enemy:
+                        break
+                if clicked_enemy:
+                    for unit in g["selected_units"]:
+                        unit.attack_target = clicked_enemy
+                        if clicked_enemy.is_building:
+                            chase_pos = unit.get_chase_position_for_building(clicked_enemy)
+                            unit.move_target = chase_pos if chase_pos is not None else None
+                        else:
+                            unit.move_target = clicked_enemy.position
+                else:
+                    # Normal move
+                    formation_positions = calculate_formation_positions(
+                        center=world_pos, target=world_pos, num_units=len(g["selected_units"])
+                    )
+                    for unit, pos in zip(g["selected_units"], formation_positions):
+                        unit.move_target = pos
+                        unit.attack_target = None  # Clear attack target for move order
+                        unit.formation_target = pos
+    
+    def _update_drag_selection(self, mouse_pos):
+        """
+        Stretches the selection rectangle to the cursor while dragging.
+        
+        :param mouse_pos: Mouse position polled this frame.
+        """
+        # Stretches the selection rectangle to the cursor while dragging.
+        g = self.game_data
+        if not g["selecting"]:
+            return
+        if g["select_start"]:
+            g["select_rect"] = pg.Rect(
+                min(g["select_start"][0], mouse_pos[0]),
+                min(g["select_start"][1], mouse_pos[1]),
+                abs(mouse_pos[0] - g["select_start"][0]),
+                abs(mouse_pos[1] - g["select_start"][1]),
+            )
+    
+    def _handle_mouse_up(self, event):
+        """
+        Finishes a drag selection, selecting the player units inside it.
+        
+        :param event: Pygame event.
+        """
+        # Finishes a drag selection, selecting the player units inside it.
+        g = self.game_data
+        if event.button != 1 or not g["selecting"]:
+            return
+        g["selecting"] = False
+        for unit in g["player_units"]:
+            unit.selected = False
+        g["selected_units"].empty()
+        
+        if g["selected_building"]:
+            g["selected_building"].selected = False
+        g["selected_building"] = None
+        g["interface"].update_producer(g["player_hq"])
+        
+        if g["select_start"]:
+            world_start = g["camera"].screen_to_world(g["select_start"])
+            world_end = g["camera"].screen_to_world(event.pos)
+            world_rect = pg.Rect(
+                min(world_start[0], world_end[0]),
+                min(world_start[1], world_end[1]),
+                abs(world_end[0] - world_start[0]),
+                abs(world_end[1] - world_start[1]),
+            )
+            for unit in g["player_units"]:
+                if world_rect.colliderect(unit.rect):
+                    unit.selected = True
+                    g["selected_units"].add(unit)
+    
+    def _handle_key_down(self, event):
+        """
+        ESC cancels building placement, otherwise returns to the main menu.
+        
+        :param event: Pygame event.
+        """
+        # ESC cancels building placement, otherwise returns to the main menu.
+        g = self.game_data
+        if event.key == pg.K_ESCAPE:
+            if g["interface"] and g["interface"].placing_cls is not None:
+                g["interface"].placing_cls = None
+            else:
+                self.state = GameState.MENU
+                self.main_menu.dirty = True
+                return
+    
+    def simulate_step(self):
+        """
+        Advances the game world by one fixed step: units, buildings, projectiles, collisions, combat, AI, fog.
+        """
+        # Advances the game world by one fixed step: units, buildings, projectiles, collisions, combat, AI, fog.
+        g = self.game_data
+        
+        # Snapshot each group once per step; Group.sprites() builds a new list on every call
+        unit_list = g["global_units"].sprites()
+        all_buildings = g["global_buildings"].sprites()
+        team_units = {team: ug.sprites() for team, ug in g["unit_groups"].items()}
+        building_list = [b for b in all_buildings if b.health > 0]
+        mobile_units = [u for u in unit_list if not u.is_building]
+        
+        # Unit updates are pure Python and serialized by the GIL, so a thread pool only adds overhead
+        for unit in mobile_units:
+            unit.update()
+        
+        # Enemy lists depend only on the alliance, so build them once per alliance instead of once per building
+        alive_units = [u for u in unit_list if u.health > 0]
+        building_enemies = {}
+        for building in building_list:
+            building_team = building.team
+            friendly_units_for_build = g["unit_groups"].get(building_team, pg.sprite.Group())
+            allies_mask = g["alliance_masks"][building_team]
+            enemies = building_enemies.get(allies_mask)
+            if enemies is None:
+                enemies = ([u for u in alive_units if not u.team_bit & allies_mask], [b for b in building_list if not b.team_bit & allies_mask])
+                building_enemies[allies_mask] = enemies
+            enemy_units_for_build, enemy_buildings_for_build = enemies
+            building.update(
+                particles=g["particles"],
+                friendly_units=friendly_units_for_build,
+                all_units=g["global_units"],
+                global_buildings=g["global_buildings"],
+                projectiles=g["projectiles"],
+                enemy_units=enemy_units_for_build,
+                enemy_buildings=enemy_buildings_for_build
+            )
+        
+        g["projectiles"].update()
+        g["particles"].update()
+        
+        unit_hash = g["unit_hash"]
+        unit_hash.sync(unit_list)
+        
+        building_hash = g["building_hash"]
+        building_hash.sync(building_list)
+        
+        handle_unit_collisions(unit_list, unit_hash)
+        handle_unit_building_collisions(unit_list, building_list, building_hash)
+        for unit in unit_list:
+            unit.rect.center = unit.position
+        
+        # Unified attacks for all teams; armed entities are bucketed by team in one pass
+        armed_by_team = {team: [] for team in g["unique_teams"]}
+        for entity in unit_list + building_list:
+            if hasattr(entity, 'weapons') and entity.weapons and entity.health > 0:
+                armed_by_team[entity.team].append(entity)
+        for team, armed_entities in armed_by_team.items():
+            handle_attacks(team, armed_entities, g["projectiles"], g["particles"], unit_hash, building_hash, g["alliance_masks"])
+        
+        handle_projectiles(g["projectiles"], unit_list, building_list, g["particles"], g, unit_hash, building_hash)
+        
+        # Cleanup dead entities
+        cleanup_dead_entities(g)
+        
+        # AIs think at a fixed rate, staggered so at most one of them ticks per frame.
+        # Enemy lists are shared as above: partition surviving units by team once, then merge per alliance.
+        g["frame"] += 1
+        due_ais = [ai for i, ai in enumerate(g["ais"]) if (g["frame"] - i) % AI_TICK_FRAMES == 0]
+        alive_by_team = {team: [u for u in units if u.health > 0] for team, units in team_units.items()} if due_ais else {}
+        ai_enemies = {}
+        for ai in due_ais:
+            their_team = ai.hq.team
+            friendly_units_list = alive_by_team[their_team]
+            friendly_buildings_list = [b for b in building_list if b.team == their_team]
+            allies_mask = g["alliance_masks"][their_team]
+            enemies = ai_enemies.get(allies_mask)
+            if enemies is None:
+                enemies = ([u for team, units in alive_by_team.items() if not team_to_bit[team] & allies_mask for u in units], [b for b in building_list if not b.team_bit & allies_mask])
+                ai_enemies[allies_mask] = enemies
+            enemy_units_list, enemy_buildings_list = enemies
+            ai.update(friendly_units_list, friendly_buildings_list, enemy_units_list, enemy_buildings_list, g["global_buildings"], g["map_width"], g["map_height"], AI_TICK_FRAMES)
+        
+        if (g["frame"] - 1) % FOG_TICK_FRAMES == 0:
+            if not g.get("spectator", False):
+                ally_units = [u for team in g["player_allies"] for u in team_units[team] if u.health > 0]
+                ally_buildings = [b for b in all_buildings if b.team_bit & g["player_allies_mask"]]
+                g["fog_of_war"].update_visibility(ally_units, ally_buildings, all_buildings)
+            else:
+                g["fog_of_war"].update_visibility([], [], all_buildings)
+    
     def run_game(self):
         """
         Main game loop: event handling, updates, rendering, win/loss checks.
         """
         # Main game loop: event handling, updates, rendering, win/loss checks.
         g = self.game_data
+        sim_lag = SIM_STEP_MS  # Milliseconds of game time owed to the simulation; starts with one step due
+        self.frame_deadline = pg.time.get_ticks()
         
         while self.running and self.state == GameState.PLAYING:
+            # Pump SDL exactly once per frame; key, mouse and queue reads below all see that snapshot
+            pg.event.pump()
             keys = pg.key.get_pressed()
-            for event in pg.event.get():
-                if event.type == pg.QUIT:
-                    self.running = False
-                elif event.type == pg.MOUSEWHEEL:
-                    mouse_pos = pg.mouse.get_pos()
-                    game_rect = pg.Rect(0, 0, g["camera"].width, g["camera"].height)
-                    if game_rect.collidepoint(mouse_pos):
-                        world_mouse = g["camera"].screen_to_world(mouse_pos)
-                        g["camera"].update_zoom(event.y, world_mouse)
-                elif event.type == pg.MOUSEBUTTONDOWN:
-                    mouse_pos = event.pos
-                    mini_x = SCREEN_WIDTH - MINI_MAP_WIDTH
-                    mini_y = SCREEN_HEIGHT - MINI_MAP_HEIGHT
-                    mini_rect = pg.Rect(mini_x, mini_y, MINI_MAP_WIDTH, MINI_MAP_HEIGHT)
-                    in_minimap = mini_rect.collidepoint(mouse_pos)
-                    
-                    if in_minimap and event.button == 1:
-                        local_x = mouse_pos[0] - mini_x
-                        local_y = mouse_pos[1] - mini_y
-                        scale_x = g["map_width"] / MINI_MAP_WIDTH
-                        scale_y = g["map_height"] / MINI_MAP_HEIGHT
-                        world_x = local_x * scale_x
-                        world_y = local_y * scale_y
-                        g["camera"].rect.centerx = world_x
-                        g["camera"].rect.centery = world_y
-                        g["camera"].clamp()
-                        if not g.get("spectator", False):
-                            for unit in g["player_units"]:
-                                unit.selected = False
-                            g["selected_units"].empty()
-                            if g["selected_building"]:
-                                g["selected_building"].selected = False
-                            g["selected_building"] = None
-                            g["selecting"] = False
-                            if g["interface"]:
-                                g["interface"].update_producer(g["player_hq"])
-                        continue
-                    
-                    if g.get("spectator", False):
-                        continue
-                    
-                    world_pos = g["camera"].screen_to_world(mouse_pos)
-                    target_x, target_y = mouse_pos
-                    
-                    if event.button == 1:
-                        own_buildings = [b for b in g["global_buildings"] if b.team == g["player_team"]]
-                        result = g["interface"].handle_click(mouse_pos, own_buildings)
-                        if result:
-                            if isinstance(result, tuple) and result[0] == 'sell':
-                                building_to_sell = result[1]
-                                if building_to_sell in g["global_buildings"]:
-                                    g["global_buildings"].remove(building_to_sell)
-                                    g["player_hq"].credits += UNIT_CLASSES[building_to_sell.unit_type]["cost"] // 2
-                                    if g["selected_building"] == building_to_sell:
-                                        g["selected_building"] = None
-                                        g["interface"].update_producer(g["player_hq"])
-                            continue
-                        
-                        if g["interface"].placing_cls is not None and not g["interface_rect"].collidepoint(mouse_pos):
-                            snapped = snap_to_grid(world_pos)
-                            buildings_list = list(g["global_buildings"])
-                            unit_type = g["interface"].placing_cls.__name__
-                            cost = UNIT_CLASSES[unit_type]["cost"]
-                            if g["player_hq"].credits >= cost and is_valid_building_position(
-                                snapped, g["player_team"], g["interface"].placing_cls, buildings_list,
-                                g["map_width"], g["map_height"]
-                            ):
-                                building = g["interface"].placing_cls(snapped, g["player_team"], hq=g["player_hq"])
-                                g["global_buildings"].add(building)
-                                g["player_hq"].credits -= cost
-                                g["interface"].placing_cls = None
-                            else:
-                                g["interface"].placing_cls = None
-                            continue
-                        
-                        clicked_building = next(
-                            (b for b in g["global_buildings"] if b.team == g["player_team"] and g["camera"].get_screen_rect(b.rect).collidepoint(target_x, target_y)),
-                            None,
-                        )
-                        if clicked_building:
-                            if g["selected_building"] and g["selected_building"] != clicked_building:
-                                g["selected_building"].selected = False
-                            clicked_building.selected = True
-                            g["selected_building"] = clicked_building
-                            for unit in g["player_units"]:
-                                unit.selected = False
-                            g["selected_units"].empty()
-                            g["interface"].update_producer(clicked_building)
-                        else:
-                            if g["selected_building"]:
-                                g["selected_building"].selected = False
-                            g["selected_building"] = None
-                            g["interface"].update_producer(g["player_hq"])
-                            g["selecting"] = True
-                            g["select_start"] = mouse_pos
-                            g["select_rect"] = pg.Rect(target_x, target_y, 0, 0)
-                    
-                    elif event.button == 3:
-                        if g["interface"].placing_cls is not None:
-                            g["interface"].placing_cls = None
-                        elif g["selected_building"] and hasattr(g["selected_building"], 'rally_point'):
-                            g["selected_building"].rally_point = Vector2(world_pos)
-                        elif g["selected_units"]:
-                            # Check for clicked enemy
-                            clicked_enemy = None
-                            unit_list = list(g["global_units"])
-                            building_list = [b for b in g["global_buildings"] if b.health > 0]
-                            for u in unit_list:
-                                screen_rect = g["camera"].get_screen_rect(u.rect)
-                                if screen_rect.collidepoint(mouse_pos) and u.team not in g["player_allies"] and u.health > 0:
-                                    clicked_enemy = u
-                                    break
-                            if not clicked_enemy:
-                                for b in building_list:
-                                    screen_rect = g["camera"].get_screen_rect(b.rect)
-                                    if screen_rect.collidepoint(mouse_pos) and b.team not in g["player_allies"] and b.health > 0:
-                                        clicked_enemy = b
-                                        break
-                            if clicked_enemy:
-                                for unit in g["selected_units"]:
-                                    unit.attack_target = clicked_enemy
-                                    if clicked_enemy.is_building:
-                                        chase_pos = unit.get_chase_position_for_building(clicked_enemy)
-                                        unit.move_target = chase_pos if chase_pos is not None else None
-                                    else:
-                                        unit.move_target = clicked_enemy.position
-                            else:
-                                # Normal move
-                                formation_positions = calculate_formation_positions(
-                                    center=world_pos, target=world_pos, num_units=len(g["selected_units"])
-                                )
-                                for unit, pos in zip(g["selected_units"], formation_positions):
-                                    unit.move_target = pos
-                                    unit.attack_target = None  # Clear attack target for move order
-                                    unit.formation_target = pos
-                
-                elif event.type == pg.MOUSEMOTION and g["selecting"]:
-                    current_pos = event.pos
-                    if g["select_start"]:
-                        g["select_rect"] = pg.Rect(
-                            min(g["select_start"][0], current_pos[0]),
-                            min(g["select_start"][1], current_pos[1]),
-                            abs(current_pos[0] - g["select_start"][0]),
-                            abs(current_pos[1] - g["select_start"][1]),
-                        )
-                
-                elif event.type == pg.MOUSEBUTTONUP and event.button == 1 and g["selecting"]:
-                    g["selecting"] = False
-                    for unit in g["player_units"]:
-                        unit.selected = False
-                    g["selected_units"].empty()
-                    
-                    if g["selected_building"]:
-                        g["selected_building"].selected = False
-                    g["selected_building"] = None
-                    g["interface"].update_producer(g["player_hq"])
-                    
-                    if g["select_start"]:
-                        world_start = g["camera"].screen_to_world(g["select_start"])
-                        world_end = g["camera"].screen_to_world(event.pos)
-                        world_rect = pg.Rect(
-                            min(world_start[0], world_end[0]),
-                            min(world_start[1], world_end[1]),
-                            abs(world_end[0] - world_start[0]),
-                            abs(world_end[1] - world_start[1]),
-                        )
-                        for unit in g["player_units"]:
-                            if world_rect.colliderect(unit.rect):
-                                unit.selected = True
-                                g["selected_units"].add(unit)
-                
-                elif event.type == pg.KEYDOWN:
-                    if event.key == pg.K_ESCAPE:
-                        if g["interface"] and g["interface"].placing_cls is not None:
-                            g["interface"].placing_cls = None
-                        else:
-                            self.state = GameState.MENU
-                            return
-            
-            g["camera"].update(g["selected_units"].sprites() if not g.get("spectator", False) else [], pg.mouse.get_pos(), g["interface_rect"], keys)
-            
-            unit_list = list(g["global_units"])
-            building_list = [b for b in g["global_buildings"] if b.health > 0]
-            
-            def update_unit(unit):
-                unit.update()
-            
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                futures = [executor.submit(update_unit, unit) for unit in [u for u in unit_list if not u.is_building]]
-                for future in futures:
-                    future.result()
-            
-            for building in building_list:
-                building_team = building.team
-                friendly_units_for_build = g["unit_groups"].get(building_team, pg.sprite.Group())
-                allies = g["alliances"][building_team]
-                enemy_units_for_build = [u for u in g["global_units"].sprites() if u.team not in allies and u.health > 0]
-                enemy_buildings_for_build = [b for b in g["global_buildings"].sprites() if b.team not in allies and b.health > 0]
-                building.update(
-                    particles=g["particles"],
-                    friendly_units=friendly_units_for_build,
-                    all_units=g["global_units"],
-                    global_buildings=g["global_buildings"],
-                    projectiles=g["projectiles"],
-                    enemy_units=enemy_units_for_build,
-                    enemy_buildings=enemy_buildings_for_build
-                )
-            
-            g["projectiles"].update()
-            g["particles"].update()
-            
-            unit_hash = SpatialHash(200)
-            for u in unit_list:
-                unit_hash.add(u)
-            
-            building_hash = SpatialHash(200)
-            for b in building_list:
-                building_hash.add(b)
-            
-            handle_unit_collisions(unit_list, unit_hash)
-            handle_unit_building_collisions(unit_list, building_list, building_hash)
-            for unit in unit_list:
-                unit.rect.center = unit.position
-            
-            # Unified attacks for all teams
-            unique_teams = set(g["teams"])
-            for team in unique_teams:
-                handle_attacks(team, unit_list, building_list, g["projectiles"], g["particles"], unit_hash, building_hash, g["alliances"])
-            
-            handle_projectiles(g["projectiles"], unit_list, building_list, g["particles"], g)
-            
-            # Cleanup dead entities
-            cleanup_dead_entities(g)
+            events = pg.event.get(pump=False)
+            for event in events:
+                handler = self.event_handlers.get(event.type)
+                if handler:
+                    handler(event)
+                    if self.state != GameState.PLAYING:
+                        return
             
-            for ai in g["ais"]:
-                their_team = ai.hq.team
-                friendly_units_list = g["unit_groups"][their_team].sprites()
-                friendly_buildings_list = [b for b in building_list if b.team == their_team]
-                enemy_units_list = [u for team, ug in g["unit_groups"].items() if team not in ai.allies for u in ug.sprites() if u.health > 0]
-                enemy_buildings_list = [b for b in building_list if b.team not in ai.allies]
-                ai.update(friendly_units_list, friendly_buildings_list, enemy_units_list, enemy_buildings_list, g["global_buildings"], g["map_width"], g["map_height"])
+            mouse_pos = pg.mouse.get_pos()  # Queried once and shared by the camera, the scene check and drawing
+            g["camera"].update(g["selected_units"].sprites() if not g.get("spectator", False) else [], mouse_pos, g["interface_rect"], keys)
+            self._update_drag_selection(mouse_pos)
             
-            if not g.get("spectator", False):
-                ally_units = [u for team in g["player_allies"] for u in g["unit_groups"][team].sprites()]
-                ally_buildings = [b for b in g["global_buildings"].sprites() if b.team in g["player_allies"]]
-                g["fog_of_war"].update_visibility(ally_units, ally_buildings, g["global_buildings"].sprites())
-            else:
-                g["fog_of_war"].update_visibility([], [], g["global_buildings"].sprites())
+            # Fixed timestep: simulate in SIM_STEP_MS steps to catch up with real time, then render once
+            steps = 0
+            # A step is due within SIM_STEP_SLACK_MS of a full SIM_STEP_MS; sim_lag keeps the remainder
+            # (possibly slightly negative), so the average rate still follows real time
+            while sim_lag >= SIM_STEP_MS - SIM_STEP_SLACK_MS and steps < MAX_SIM_STEPS:
+                self.simulate_step()
+                sim_lag -= SIM_STEP_MS
+                steps += 1
+            if sim_lag >= SIM_STEP_MS - SIM_STEP_SLACK_MS:
+                sim_lag = 0.0  # Too far behind to catch up; drop the backlog rather than spiral
             
             alive_hqs = [hq for hq in g["hqs"].values() if hq.health > 0]
             all_stats = {team_to_name[team]: hq.stats for team, hq in g["hqs"].items()}
@@ -4371,66 +4853,64 @@ class GameManager:
                 
                 self.victory_screen = VictoryScreen(self.font_large, self.font_medium, is_player_victory, all_stats, g.get("player_team"))
             
+            camera = g["camera"]
+            # Only entities in grid cells around the view can reach the screen
+            view_world = camera.rect.inflate(2 * DRAW_CULL_MARGIN, 2 * DRAW_CULL_MARGIN)
+            on_screen_buildings = g["building_hash"].query_rect(view_world)
+            on_screen_units = [u for u in g["unit_hash"].query_rect(view_world) if not u.is_building]
+            
+            # The minimap shows the whole map, so it runs on its own clock: due once MINI_MAP_TICK_FRAMES
+            # sim frames have passed since the last render, however many steps each render covered
+            mini_map_due = g["frame"] >= g["mini_map_next"]
+            if mini_map_due:
+                g["mini_map_next"] = g["frame"] + MINI_MAP_TICK_FRAMES
+                draw_allies_mini = team_mask(g["teams"]) if g.get("spectator", False) else g["player_allies_mask"]
+                render_mini_map(g["mini_map_surface"], g["fog_of_war"], g["map_width"], g["map_height"], g["terrain_tiles"], g["global_buildings"], g["global_units"], draw_allies_mini)
+            
+            # Leave the last frame on screen when nothing it shows has changed; only the minimap may still be behind
+            scene = None if events else scene_state(g, mouse_pos, on_screen_units, on_screen_buildings)
+            if scene is not None and scene == g["drawn_scene"]:
+                if mini_map_due:
+                    self._present([draw_mini_map(self.screen, camera, g["mini_map_surface"], g["map_width"], g["map_height"])])
+                sim_lag += self._pace_frame()
+                continue
+            g["drawn_scene"] = scene
+            
             self.screen.fill(pg.Color("black"))
             
-            map_color = g["map_color"]
-            base_r, base_g, base_b = map_color
-            zoom = g["camera"].zoom
-            tile_sw = TILE_SIZE * zoom
-            tile_sh = TILE_SIZE * zoom
-            start_tx = max(0, int(g["camera"].rect.x // TILE_SIZE))
-            start_ty = max(0, int(g["camera"].rect.y // TILE_SIZE))
-            end_tx = min(g["map_width"] // TILE_SIZE, start_tx + int(g["camera"].rect.width // TILE_SIZE + 2))
-            end_ty = min(g["map_height"] // TILE_SIZE, start_ty + int(g["camera"].rect.height // TILE_SIZE + 2))
-            for tx in range(start_tx, end_tx):
-                wx = tx * TILE_SIZE
-                sx = (wx - g["camera"].rect.x) * zoom
-                if sx < -tile_sw or sx > g["camera"].width:
-                    continue
-                for ty in range(start_ty, end_ty):
-                    wy = ty * TILE_SIZE
-                    sy = (wy - g["camera"].rect.y) * zoom
-                    if sy < -tile_sh or sy > g["camera"].height:
-                        continue
-                    var_r = ((tx * 17 + ty * 31) % 41) - 20
-                    var_g = ((tx * 23 + ty * 37) % 41) - 20
-                    var_b = ((tx * 29 + ty * 41) % 41) - 20
-                    tile_r = max(0, min(255, base_r + var_r))
-                    tile_g = max(0, min(255, base_g + var_g))
-                    tile_b = max(0, min(255, base_b + var_b))
-                    pg.draw.rect(self.screen, (tile_r, tile_g, tile_b), (sx, sy, tile_sw, tile_sh))
-                    crater_seed = (tx * 123 + ty * 456) % 100
-                    if crater_seed < 5:
-                        cx = sx + tile_sw / 2
-                        cy = sy + tile_sh / 2
-                        cr = tile_sw / 4
-                        dark_r = max(0, tile_r - 40)
-                        dark_g = max(0, tile_g - 40)
-                        dark_b = max(0, tile_b - 40)
-                        pg.draw.circle(self.screen, (dark_r, dark_g, dark_b), (int(cx), int(cy)), int(cr))
+            # Ground: blit the visible part of the pre-rendered terrain, scaled to the current zoom.
+            # The scaled view is kept until the camera moves or zooms, so a still camera costs one blit.
+            terrain = g["terrain_surface"]
+            view = camera.rect.clip(terrain.get_rect())
+            if view.width > 0 and view.height > 0:
+                dest = camera.world_to_screen(view.topleft)
+                ground_key = (tuple(view), camera.zoom)
+                if g["ground_cache"][0] != ground_key:
+                    visible_ground = terrain.subsurface(view)
+                    if camera.zoom != 1.0:
+                        visible_ground = pg.transform.scale(visible_ground, (round(view.width * camera.zoom), round(view.height * camera.zoom)))
+                    g["ground_cache"] = (ground_key, visible_ground)
+                self.screen.blit(g["ground_cache"][1], dest)
             
             draw_allies = set(g["teams"]) if g.get("spectator", False) else g["player_allies"]
             fog = g["fog_of_war"]
             if not g.get("spectator", False):
                 g["fog_of_war"].draw(self.screen, g["camera"])
-            mouse_pos = pg.mouse.get_pos() if g.get("interface") else None
-            for building in building_list:
+            hover_pos = mouse_pos if g.get("interface") else None
+            for building in on_screen_buildings:
                 visible = building.team in draw_allies or fog.is_visible(building.position) or building.is_seen
                 if building.health > 0 and visible:
-                    building.draw(self.screen, g["camera"], mouse_pos)
+                    building.draw(self.screen, g["camera"], hover_pos)
             
             if g["interface"] and not g.get("spectator", False):
                 if g["interface"].placing_cls is not None:
-                    mouse_pos = pg.mouse.get_pos()
                     ghost_pos = g["camera"].screen_to_world(mouse_pos)
                     snapped = snap_to_grid(ghost_pos)
-                    buildings_list = list(g["global_buildings"])
-                    unit_type = g["interface"].placing_cls.__name__
                     valid = is_valid_building_position(
-                        snapped, g["player_team"], g["interface"].placing_cls, buildings_list,
+                        snapped, g["player_team"], g["interface"].placing_cls, g["global_buildings"].sprites(),
                         g["map_width"], g["map_height"]
                     )
-                    width, height = UNIT_CLASSES[unit_type]["size"]
+                    width, height = g["interface"].placing_cls.size
                     half_w, half_h = width / 2, height / 2
                     temp_rect = pg.Rect(snapped[0] - half_w, snapped[1] - half_h, width, height)
                     screen_ghost = g["camera"].get_screen_rect(temp_rect)
@@ -4438,12 +4918,12 @@ class GameManager:
                     line_width = int(2 * g["camera"].zoom)
                     pg.draw.rect(self.screen, color, screen_ghost, line_width)
                 
-                for unit in [u for u in unit_list if not u.is_building]:
+                for unit in on_screen_units:
                     visible = unit.team in draw_allies or fog.is_visible(unit.position)
                     if unit.health > 0 and visible:
-                        unit.draw(self.screen, g["camera"], mouse_pos)
+                        unit.draw(self.screen, g["camera"], hover_pos)
             else:
-                for unit in [u for u in unit_list if not u.is_building]:
+                for unit in on_screen_units:
                     if unit.health > 0:
                         unit.draw(self.screen, g["camera"])
             
@@ -4459,11 +4939,107 @@ class GameManager:
             if not g.get("spectator", False) and g["selecting"] and g["select_rect"]:
                 pg.draw.rect(self.screen, (255, 255, 255), g["select_rect"], 2)
             
-            draw_allies_mini = set(g["teams"]) if g.get("spectator", False) else g["player_allies"]
-            mini_rect = draw_mini_map(self.screen, g["camera"], g["fog_of_war"], g["map_width"], g["map_height"], g["map_color"], g["global_buildings"], g["global_units"], draw_allies_mini)
+            draw_mini_map(self.screen, g["camera"], g["mini_map_surface"], g["map_width"], g["map_height"])
             
+            self._present()
+            sim_lag += self._pace_frame()
+    
+    def _present(self, dirty_rects=None):
+        """
+        Puts the frame on screen; every state presents through here.
+        
+        :param dirty_rects: Screen rects that changed, or None to flip the whole display. An empty list presents nothing.
+        """
+        if dirty_rects is None:
             pg.display.flip()
-            self.clock.tick(60)
+        elif dirty_rects:
+            pg.display.update(dirty_rects)
+    
+    def _pace_frame(self):
+        """
+        Waits until the next SIM_STEP_MS frame boundary and returns the game time the frame covers.
+        
+        :return: Milliseconds to add to the simulation lag: one step while keeping up, more after a stall.
+        """
+        # clock.tick(60) waits a truncated 16 ms and its readings jitter, so frames ran ahead of the
+        # 16.67 ms step and some had nothing to simulate while others took two. Frames are paced to a
+        # float deadline one step apart instead, and the lag advances by the deadline, not the jittery
+        # reading; a late wake-up is made up by a shorter wait next frame, so it still tracks real time.
+        previous = self.frame_deadline
+        self.frame_deadline += SIM_STEP_MS
+        now = pg.time.get_ticks()
+        if now < int(self.frame_deadline):
+            pg.time.wait(int(self.frame_deadline) - now)
+        elif now - self.frame_deadline > SIM_STEP_MS:
+            self.frame_deadline = now  # Fell a whole frame behind; the stall is owed as catch-up steps
+        self.clock.tick()  # Keeps get_fps() measuring the real frame rate
+        return self.frame_deadline - previous
+    
+    def _menu_events(self):
+        """
+        Sleeps until input arrives or MENU_WAIT_MS passes, then collects the events menu screens handle.
+        
+        :return: List of QUIT, MOUSEBUTTONDOWN and VIDEOEXPOSE events.
+        """
+        # Blocks in SDL's event wait instead of polling, so an idle menu uses next to no CPU
+        first = pg.event.wait(self.MENU_WAIT_MS)
+        events = pg.event.get(self.MENU_EVENTS, pump=False)  # The wait above already pumped this frame
+        pg.event.clear(pump=False)  # Drop the motion/key events menus ignore so they cannot pile up
+        if first.type in self.MENU_EVENTS:
+            events.insert(0, first)
+        return events
+    
+    def _apply_menu_result(self, result):
+        """
+        Applies a transition returned by a menu screen's handle_event.
+        
+        :param result: "skirmish_setup", "menu", "quit", "start_game", "spectate", or None.
+        """
+        if result == "skirmish_setup":
+            self.state = GameState.SKIRMISH_SETUP
+            self.skirmish_setup.dirty = True
+        elif result == "menu":
+            self.state = GameState.MENU
+            self.main_menu.dirty = True
+            self.skirmish_setup.reset()
+        elif result == "quit":
+            self.running = False
+        elif result in ("start_game", "spectate"):
+            setup = self.skirmish_setup
+            self.initialize_game(setup.game_mode, setup.size_choice, setup.map_choice, result == "spectate")
+            self.state = GameState.PLAYING
+    
+    def _pump_menu(self):
+        """
+        Runs one frame of the menu screen for the current state: hover update, redraw, input and pacing.
+        """
+        screen = getattr(self, self.MENU_SCREENS[self.state])
+        # Hovers only change when the cursor moves or a different screen is showing
+        mouse_pos = pg.mouse.get_pos()
+        if (self.state, mouse_pos) != self.menu_input:
+            self.menu_input = (self.state, mouse_pos)
+            screen.update(mouse_pos)
+        # Idle menus keep the last frame on screen; hover changes push only the affected button rects
+        if screen.dirty or screen.hover_changed:
+            self._present(screen.draw(self.screen))
+            screen.dirty = False
+        
+        events = self._menu_events()
+        for i, event in enumerate(events):
+            if event.type == pg.QUIT:
+                self.running = False
+            elif event.type == pg.VIDEOEXPOSE:
+                screen.dirty = True
+            result = screen.handle_event(event)
+            if result:
+                self._apply_menu_result(result)
+                # This screen is done; hand the rest of the frame's input to the next one
+                for pending in events[i + 1:]:
+                    pg.event.post(pending)
+                break
+        
+        # Menus are cheap, so spend the last few ms spinning for even frame pacing (SDL_Delay alone can overshoot)
+        self.clock.tick_busy_loop(self.menu_fps)
     
     def run(self):
         """
@@ -4471,70 +5047,22 @@ class GameManager:
         """
         # State machine loop: menu -> setup -> playing -> victory/defeat -> menu.
         while self.running:
-            if self.state == GameState.MENU:
-                self.main_menu.update(pg.mouse.get_pos())
-                self.main_menu.draw(self.screen)
-                
-                for event in pg.event.get():
-                    if event.type == pg.QUIT:
-                        self.running = False
-                    result = self.main_menu.handle_event(event)
-                    if result == "skirmish_setup":
-                        self.state = GameState.SKIRMISH_SETUP
-                    elif result == "quit":
-                        self.running = False
-                
-                pg.display.flip()
-                self.clock.tick(60)
-            
-            elif self.state == GameState.SKIRMISH_SETUP:
-                self.skirmish_setup.update(pg.mouse.get_pos())
-                self.skirmish_setup.draw(self.screen)
-                
-                for event in pg.event.get():
-                    if event.type == pg.QUIT:
-                        self.running = False
-                    result = self.skirmish_setup.handle_event(event)
-                    if result == "menu":
-                        self.state = GameState.MENU
-                        self.skirmish_setup = SkirmishSetup(self.font_large, self.font_medium)
-                    elif result and result[0] == "start_game":
-                        _, game_mode, size_choice, map_choice, spectate = result
-                        self.initialize_game(game_mode, size_choice, map_choice, spectate)
-                        self.state = GameState.PLAYING
-                
-                pg.display.flip()
-                self.clock.tick(60)
-            
-            elif self.state == GameState.PLAYING:
-                self.run_game()
-            
-            elif self.state in (GameState.VICTORY, GameState.DEFEAT):
-                self.victory_screen.update(pg.mouse.get_pos())
-                self.victory_screen.draw(self.screen)
-                
-                for event in pg.event.get():
-                    if event.type == pg.QUIT:
-                        self.running = False
-                    result = self.victory_screen.handle_event(event)
-                    if result == "menu":
-                        self.state = GameState.MENU
-                        self.skirmish_setup = SkirmishSetup(self.font_large, self.font_medium)
-                
-                pg.display.flip()
-                self.clock.tick(60)
+            self.state_handlers[self.state]()
         
         pg.quit()
 
 if __name__ == "__main__":
     # Entry point: initializes Pygame, creates manager, runs game.
-    pg.init()
-    screen = pg.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    # Only the subsystems the game uses; pg.init() would also start audio, joystick and the rest
+    pg.display.init()
+    pg.font.init()
+    # vsync needs the SCALED renderer path; without it flip() returns immediately and clock.tick paces alone
+    screen = pg.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pg.SCALED if VSYNC else 0, vsync=int(VSYNC))
     pg.display.set_caption("Paper Tigers")
     clock = pg.time.Clock()
     
-    font_large = pg.font.SysFont(None, 72)
-    font_medium = pg.font.SysFont(None, 28)
+    font_large = pg.font.Font(None, 72)
+    font_medium = pg.font.Font(None, 28)
     
     manager = GameManager(screen, clock, font_large, font_medium)
     manager.run()
@@ -5,11 +5,13 @@ import random
 import heapq
 from dataclasses import InitVar, dataclass, field as dataclass_field
 from enum import Enum
-from typing import TYPE_CHECKING, Any, ClassVar, Dict, Type, Set, List
+from typing import TYPE_CHECKING, Any, ClassVar, Dict, Type, Set, List, NamedTuple
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor
 import threading
+import time
 from collections import deque
+from functools import lru_cache
 import types
 
 import pygame as pg
@@ -25,7 +27,15 @@ MINI_MAP_WIDTH = 200
 MINI_MAP_HEIGHT = 150
 PAN_EDGE = 0
 PAN_SPEED = 10
+# Camera pan in units of the pan step, indexed by a 4-bit mask: up (W) = 1, left (A) = 2, down (S) = 4, right (D) = 8
+PAN_STEPS = ((2, 2), (1, -1), (-2, -2), (-1, 1))
+PAN_TABLE = tuple(
+    (sum(step[0] for bit, step in enumerate(PAN_STEPS) if mask >> bit & 1),
+     sum(step[1] for bit, step in enumerate(PAN_STEPS) if mask >> bit & 1))
+    for mask in range(16)
+)
 FITNESS_PANEL_HEIGHT = 280
+VSYNC = False
 
 class Team(Enum):
     RED = 1
@@ -68,6 +78,29 @@ team_to_name = {
     Team.GREY: "Grey",
 }
 
+name_to_team = {name: team for team, name in team_to_name.items()}
+
+class TeamPalette(NamedTuple):
+    side: tuple
+    highlight: tuple
+    barrel: tuple
+    turret_barrel: tuple
+    grey: tuple
+    tube: tuple
+
+# Shades of each team colour used by the unit models, worked out once instead of on every draw
+TEAM_PALETTES = {
+    team: TeamPalette(
+        side=tuple(max(0, c - 50) for c in color),
+        highlight=tuple(min(255, c + 30) for c in color),
+        barrel=tuple(min(255, c + 20) for c in color),
+        turret_barrel=tuple(min(255, c + 40) for c in color),
+        grey=tuple(int(c * 0.6) for c in color),
+        tube=tuple(int(c * 0.7) for c in color),
+    )
+    for team, color in team_to_color.items()
+}
+
 class GameState(Enum):
     MENU = 1
     SKIRMISH_SETUP = 2
@@ -383,10 +416,43 @@ UNIT_CLASSES = {
 }
 
 
+class UnitSpec(NamedTuple):
+    cost: int
+    hp: int
+    speed: float
+    attack_range: int
+    sight_range: int
+    size: tuple
+    air: bool
+    is_building: bool
+    height: float
+    half_w: float
+    half_h: float
+
+# Frozen per-type view of the fields every UNIT_CLASSES entry shares, read as attributes on the hot paths
+UNIT_SPECS = {
+    name: UnitSpec(cfg["cost"], cfg["hp"], cfg["speed"], cfg["attack_range"], cfg["sight_range"], cfg["size"],
+                   cfg["air"], cfg["is_building"], cfg["height"], cfg["size"][0] / 2, cfg["size"][1] / 2)
+    for name, cfg in UNIT_CLASSES.items()
+}
+
 PROJECTILE_LIFETIME = 1.0
 PARTICLES_PER_EXPLOSION = 3
+# Farthest a projectile's centre can be from the centre of something it hits: the largest hit radius
+# (60) plus half a projectile, with slack for the collision push after the hashes are built
+PROJECTILE_HIT_RADIUS = 100
+DRAW_CULL_PAD = 40
 PLASMA_BURN_PARTICLES = 0
 PLASMA_BURN_DURATION = 1.0
+PEBBLE_OUTER_LEVELS = range(140, 161)
+PEBBLE_INNER_LEVELS = range(100, 131)
+REVEAL_CACHE_SIZE = 4096
+HUMANOID_ANGLE_BINS = 32
+HUMANOID_SPRITE_REACH = 12
+HUMANOID_SPRITE_CACHE_SIZE = 1024
+SMOOTHSCALE_MIN_SIZE = 16
+# Footprint corner pairs (i, j) of a box's four walls; each wall is bottom i, bottom j, top j, top i
+BOX_WALLS = ((0, 1), (1, 2), (2, 3), (3, 0))
 
 def heuristic(a: tuple, b: tuple) -> float:
     return math.hypot(a[0] - b[0], a[1] - b[1])
@@ -446,6 +512,12 @@ def astar(start: Vector2, goal: Vector2, buildings: list, tile_size: int = TILE_
     return [start, goal]
 
 class TerrainFeature:
+    __slots__ = ('position', 'feature_type', 'rect', 'num_pebbles', 'selected_offsets', 'pebble_dx', 'pebble_dy',
+                 'pebble_width', 'pebble_height', 'pebble_outer', 'pebble_inner')
+    
+    # One scratch rect shared by every feature's draw, refilled with Rect.update instead of allocating per shape
+    scratch_rect = pg.Rect(0, 0, 0, 0)
+    
     def __init__(self, position: tuple, feature_type: str):
         self.position = Vector2(position)
         self.feature_type = feature_type
@@ -454,40 +526,44 @@ class TerrainFeature:
             self.num_pebbles = random.randint(2, 6)
             base_offsets = [(-6, -2), (-3, 0), (0, -4), (4, 1), (2, 5), (-1, 3), (5, -1)]
             self.selected_offsets = random.sample(base_offsets, min(self.num_pebbles, len(base_offsets)))
-            self.pebbles = []
-            for dx, dy in self.selected_offsets:
-                pebble_size = random.uniform(4, 8)
-                aspect_ratio = random.uniform(0.5, 1.5)
-                pebble_width = pebble_size
-                pebble_height = pebble_size * aspect_ratio
-                outer_color = (random.randint(140, 160), random.randint(140, 160), random.randint(140, 160))
-                inner_color = (random.randint(100, 130), random.randint(100, 130), random.randint(100, 130))
-                self.pebbles.append({
-                    'dx': dx, 'dy': dy, 'width': pebble_width, 'height': pebble_height,
-                    'outer': outer_color, 'inner': inner_color
-                })
+            # Every pebble's color channels in one choices() call each, instead of six randint calls per pebble
+            count = len(self.selected_offsets)
+            outer_channels = random.choices(PEBBLE_OUTER_LEVELS, k=3 * count)
+            inner_channels = random.choices(PEBBLE_INNER_LEVELS, k=3 * count)
+            # Parallel per-pebble lists, zipped together at draw time
+            self.pebble_dx = [dx for dx, _ in self.selected_offsets]
+            self.pebble_dy = [dy for _, dy in self.selected_offsets]
+            self.pebble_width = [4 + 4 * random.random() for _ in range(count)]
+            self.pebble_height = [width * (0.5 + random.random()) for width in self.pebble_width]
+            self.pebble_outer = [tuple(outer_channels[3 * i:3 * i + 3]) for i in range(count)]
+            self.pebble_inner = [tuple(inner_channels[3 * i:3 * i + 3]) for i in range(count)]
 
     def draw(self, surface: pg.Surface, camera: Camera):
         screen_pos = camera.world_to_iso(self.position, camera.zoom)
         zoom = camera.zoom
+        rect = self.scratch_rect
         if self.feature_type == "tree":
             trunk_width = int(8 * zoom)
             trunk_height = int(20 * zoom)
-            trunk_rect = pg.Rect(screen_pos[0] - trunk_width // 2, screen_pos[1], trunk_width, trunk_height)
-            pg.draw.rect(surface, (139, 69, 19), trunk_rect)
+            rect.update(screen_pos[0] - trunk_width // 2, screen_pos[1], trunk_width, trunk_height)
+            pg.draw.rect(surface, (139, 69, 19), rect)
             foliage_radius = int(25 * zoom)
             pg.draw.circle(surface, (0, 128, 0), (int(screen_pos[0]), int(screen_pos[1] - 10 * zoom)), foliage_radius)
             pg.draw.circle(surface, (34, 139, 34), (int(screen_pos[0] - 10 * zoom), int(screen_pos[1] - 5 * zoom)), int(15 * zoom))
             pg.draw.circle(surface, (34, 139, 34), (int(screen_pos[0] + 10 * zoom), int(screen_pos[1] - 5 * zoom)), int(15 * zoom))
         elif self.feature_type == "boulder":
             boulder_radius = int(25 * zoom)
-            pg.draw.ellipse(surface, (105, 105, 105), (screen_pos[0] - boulder_radius, screen_pos[1] - boulder_radius // 2, boulder_radius * 2, boulder_radius))
-            pg.draw.ellipse(surface, (70, 70, 70), (screen_pos[0] - boulder_radius // 2, screen_pos[1] - boulder_radius // 2, boulder_radius, boulder_radius // 2))
+            rect.update(screen_pos[0] - boulder_radius, screen_pos[1] - boulder_radius // 2, boulder_radius * 2, boulder_radius)
+            pg.draw.ellipse(surface, (105, 105, 105), rect)
+            rect.update(screen_pos[0] - boulder_radius // 2, screen_pos[1] - boulder_radius // 2, boulder_radius, boulder_radius // 2)
+            pg.draw.ellipse(surface, (70, 70, 70), rect)
         elif self.feature_type == "rock":
             rock_width = int(15 * zoom)
             rock_height = int(10 * zoom)
-            pg.draw.ellipse(surface, (128, 128, 128), (screen_pos[0] - rock_width // 2, screen_pos[1] - rock_height // 2, rock_width, rock_height))
-            pg.draw.ellipse(surface, (90, 90, 90), (screen_pos[0] - rock_width // 4, screen_pos[1] - rock_height // 4, rock_width // 2, rock_height // 2))
+            rect.update(screen_pos[0] - rock_width // 2, screen_pos[1] - rock_height // 2, rock_width, rock_height)
+            pg.draw.ellipse(surface, (128, 128, 128), rect)
+            rect.update(screen_pos[0] - rock_width // 4, screen_pos[1] - rock_height // 4, rock_width // 2, rock_height // 2)
+            pg.draw.ellipse(surface, (90, 90, 90), rect)
         elif self.feature_type == "bush":
             bush_radius = int(18 * zoom)
             pg.draw.circle(surface, (0, 100, 0), (int(screen_pos[0]), int(screen_pos[1])), bush_radius)
@@ -504,15 +580,18 @@ class TerrainFeature:
                          (screen_pos[0] + twig_length // 2 + 6 * zoom, screen_pos[1] + 4 * zoom), twig_width)
             pg.draw.circle(surface, (0, 100, 0), (int(screen_pos[0] + 3 * zoom), int(screen_pos[1] - 2 * zoom)), int(3 * zoom))
         elif self.feature_type == "pebbles":
-            for pebble in self.pebbles:
-                px = screen_pos[0] + pebble['dx'] * zoom
-                py = screen_pos[1] + pebble['dy'] * zoom
-                pebble_width = int(pebble['width'] * zoom)
-                pebble_height = int(pebble['height'] * zoom)
-                pg.draw.ellipse(surface, pebble['outer'], (px - pebble_width//2, py - pebble_height//2, pebble_width, pebble_height))
+            pebbles = zip(self.pebble_dx, self.pebble_dy, self.pebble_width, self.pebble_height, self.pebble_outer, self.pebble_inner)
+            for dx, dy, width, height, outer, inner in pebbles:
+                px = screen_pos[0] + dx * zoom
+                py = screen_pos[1] + dy * zoom
+                pebble_width = int(width * zoom)
+                pebble_height = int(height * zoom)
+                rect.update(px - pebble_width//2, py - pebble_height//2, pebble_width, pebble_height)
+                pg.draw.ellipse(surface, outer, rect)
                 inner_width = pebble_width // 2
                 inner_height = pebble_height // 2
-                pg.draw.ellipse(surface, pebble['inner'], (px - inner_width//2, py - inner_height//2, inner_width, inner_height))
+                rect.update(px - inner_width//2, py - inner_height//2, inner_width, inner_height)
+                pg.draw.ellipse(surface, inner, rect)
 
 def generate_terrain_features(map_name: str, map_width: int, map_height: int) -> List[TerrainFeature]:
     features = []
@@ -532,6 +611,10 @@ def generate_terrain_features(map_name: str, map_width: int, map_height: int) ->
     num_twigs = int(num_tiles * twig_density)
     num_pebbles = int(num_tiles * pebble_density)
     
+    # Features are 40x40, so only ones centred within 64 of a candidate (45 apart per axis when
+    # inflated) can collide with it; the hash hands back just those instead of every placed feature
+    placed = SpatialHash(cell_size=80)
+    
     def add_feature(ftype, count, cluster=False):
         for _ in range(count):
             attempts = 0
@@ -539,8 +622,11 @@ def generate_terrain_features(map_name: str, map_width: int, map_height: int) ->
                 x = random.randint(0, map_width)
                 y = random.randint(0, map_height)
                 new_rect = pg.Rect(x - 20, y - 20, 40, 40)
-                if all(not new_rect.colliderect(f.rect.inflate(10, 10) if f.feature_type == ftype else f.rect) for f in features):
-                    features.append(TerrainFeature((x, y), ftype))
+                nearby = placed.query(Vector2(x, y), 64)
+                if all(not new_rect.colliderect(f.rect.inflate(10, 10) if f.feature_type == ftype else f.rect) for f in nearby):
+                    feature = TerrainFeature((x, y), ftype)
+                    features.append(feature)
+                    placed.add(feature)
                     break
                 attempts += 1
     
@@ -566,42 +652,48 @@ def is_valid_building_position(
     building_range: int = 200,
     margin: int = 60,
 ) -> bool:
-    width, height = UNIT_CLASSES[new_building_cls.__name__]["size"]
-    half_w_n, half_h_n = width / 2, height / 2
+    new_spec = UNIT_SPECS[new_building_cls.__name__]
+    width, height = new_spec.size
+    half_w_n, half_h_n = new_spec.half_w, new_spec.half_h
     temp_rect = pg.Rect(position[0] - half_w_n, position[1] - half_h_n, width, height)
     if not (0 <= temp_rect.left and temp_rect.right <= map_width and
             0 <= temp_rect.top and temp_rect.bottom <= map_height):
         return False
     
-    proposed_center = position
+    px, py = position
+    building_range_sq = building_range * building_range
+    
+    alive = [b for b in buildings if b.health > 0]
+    # Overlap with any standing building rejects the spot; one collidelist pass in C
+    if temp_rect.collidelist([b.rect for b in alive]) >= 0:
+        return False
     
     has_nearby_friendly = False
-    for building in buildings:
-        if building.team == team and building.health > 0:
-            e_size = UNIT_CLASSES[building.unit_type]["size"]
-            half_w_e, half_h_e = e_size[0] / 2, e_size[1] / 2
-            min_dist = max(half_w_n + half_w_e, half_h_n + half_h_e) + margin
-            dist = math.hypot(proposed_center[0] - building.position.x, proposed_center[1] - building.position.y)
-            if dist < min_dist:
+    for building in alive:
+        if building.team == team:
+            spec = UNIT_SPECS[building.unit_type]
+            min_dist = max(half_w_n + spec.half_w, half_h_n + spec.half_h) + margin
+            dx = px - building.position.x
+            dy = py - building.position.y
+            dist_sq = dx * dx + dy * dy
+            if dist_sq < min_dist * min_dist:
                 return False
-            if dist <= building_range:
+            if dist_sq <= building_range_sq:
                 has_nearby_friendly = True
-        
-        if building.health > 0 and building.rect.colliderect(temp_rect):
-            return False
     
     return has_nearby_friendly or new_building_cls.__name__ == "Headquarters"
 
 def find_free_spawn_position(building_pos: tuple, target_pos: tuple, global_buildings, global_units, unit_size=(40, 40), map_width=MAP_WIDTH, map_height=MAP_HEIGHT):
+    # Everything a spawn can collide with is gathered once; each attempt is then a single collidelist scan
+    obstacles = [b.rect for b in global_buildings if b.health > 0]
+    obstacles.extend([u.rect for u in global_units if u.health > 0 and not u.air])
     for _ in range(20):
         offset_x = random.uniform(-60, 60)
         offset_y = random.uniform(-60, 60)
         pos_x = max(0, min(target_pos[0] + offset_x, map_width))
         pos_y = max(0, min(target_pos[1] + offset_y, map_height))
         unit_rect = pg.Rect(pos_x - unit_size[0]/2, pos_y - unit_size[1]/2, unit_size[0], unit_size[1])
-        overlaps_building = any(b.rect.colliderect(unit_rect) for b in global_buildings if b.health > 0)
-        overlaps_unit = any(u.rect.colliderect(unit_rect) for u in global_units if u.health > 0 and not u.air)
-        if not overlaps_building and not overlaps_unit:
+        if unit_rect.collidelist(obstacles) < 0:
             return (pos_x, pos_y)
     return (max(0, min(target_pos[0], map_width)), max(0, min(target_pos[1], map_height)))
 
@@ -617,21 +709,25 @@ def calculate_formation_positions(
     positions = []
     if formation_type == 'line':
         # Grid-like for rallies/defense
-        cols = max(1, int(math.sqrt(num_units)))
+        cols = max(1, math.isqrt(num_units))
         rows = (num_units + cols - 1) // cols  # Ceiling div
+        # Column and row coordinates are shared by every slot in them; work them out once
+        col_xs = [center[0] + (col - cols / 2) * spacing for col in range(cols)]
+        row_ys = [center[1] + (row - rows / 2) * spacing for row in range(rows)]
+        jitter = spacing * 0.1
+        uniform = random.uniform
         for i in range(num_units):
-            row, col = i // cols, i % cols
-            x = center[0] + (col - cols / 2) * spacing
-            y = center[1] + (row - rows / 2) * spacing
+            row, col = divmod(i, cols)
             # Jitter for natural spread
-            x += random.uniform(-spacing*0.1, spacing*0.1)
-            y += random.uniform(-spacing*0.1, spacing*0.1)
+            x = col_xs[col] + uniform(-jitter, jitter)
+            y = row_ys[row] + uniform(-jitter, jitter)
             positions.append((x, y))
     elif formation_type == 'v':
         # Wedge toward target for attacks
         apex = Vector2(target)
         base = Vector2(center)
-        dir_to_target = (apex - base).normalize() if (apex - base).length() > 0 else Vector2(1, 0)
+        to_target = apex - base
+        dir_to_target = to_target.normalize() if to_target.length_squared() > 0 else Vector2(1, 0)
         perp = dir_to_target.rotate_rad(math.pi / 2)
         half = (num_units - 1) / 2
         for i in range(num_units):
@@ -667,6 +763,8 @@ def get_starting_positions(map_width: int, map_height: int, num_players: int):
 
     return selected_positions
 
+NEIGHBOR_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 0), (0, 1), (1, -1), (1, 0), (1, 1))
+
 class SpatialHash:
     def __init__(self, cell_size: int = 200):
         self.cell_size = cell_size
@@ -677,23 +775,23 @@ class SpatialHash:
 
     def add(self, obj):
         key = self.get_key(obj.position)
-        if key not in self.grid:
-            self.grid[key] = []
-        self.grid[key].append(obj)
+        bucket = self.grid.get(key)
+        if bucket is None:
+            self.grid[key] = [obj]
+        else:
+            bucket.append(obj)
 
     def query(self, pos: Vector2, radius: float) -> list:
         cx = int(pos.x // self.cell_size)
         cy = int(pos.y // self.cell_size)
-        keys = set()
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                keys.add((cx + dx, cy + dy))
+        grid = self.grid
+        radius_sq = radius * radius
         nearby = []
-        for k in keys:
-            if k in self.grid:
-                for o in self.grid[k]:
-                    if o.distance_to(pos) <= radius:
-                        nearby.append(o)
+        for dx, dy in NEIGHBOR_OFFSETS:
+            bucket = grid.get((cx + dx, cy + dy))
+            if bucket:
+                # Squared distances on the Vector2s directly: no per-object method call or sqrt
+                nearby.extend([o for o in bucket if o.position.distance_squared_to(pos) <= radius_sq])
         return nearby
 
 def absolute_world_to_iso(world_pos: tuple, zoom: float) -> tuple[float, float]:
@@ -711,6 +809,8 @@ class Camera:
         self.zoom = 1.0
         self.rect = pg.Rect(0, 0, self.width, self.height)
         self.target_rect = pg.Rect(self.rect)
+        self.tile_grid_key = None
+        self.tile_grid = None
         self.update_view_size()
     
     def update_view_size(self):
@@ -718,20 +818,25 @@ class Camera:
         view_h = self.height / self.zoom
         self.rect.size = (view_w, view_h)
         self.target_rect.size = (view_w, view_h)
+        # Iso transform factors for the current zoom, so the hot paths multiply instead of divide
+        self._z2 = self.zoom * 0.5
+        self._z4 = self.zoom * 0.25
+        self._inv_z = 1.0 / self.zoom
+        # World offset from the view origin to the point under the screen centre
+        sc_x, sc_y = self.width / 2, self.height / 2
+        self._center_dx = (sc_x + 2 * sc_y) * self._inv_z
+        self._center_dy = (2 * sc_y - sc_x) * self._inv_z
     
     def snap_to_point(self, world_point: tuple[float, float]):
-        sc_x, sc_y = self.width / 2, self.height / 2
-        dx_sc = (sc_x + 2 * sc_y) / self.zoom
-        dy_sc = (2 * sc_y - sc_x) / self.zoom
-        self.rect.x = world_point[0] - dx_sc
-        self.rect.y = world_point[1] - dy_sc
+        self.rect.x = world_point[0] - self._center_dx
+        self.rect.y = world_point[1] - self._center_dy
     
     def update_zoom(self, delta, mouse_screen_pos=None):
         if mouse_screen_pos is None:
             mouse_screen_pos = (self.width / 2, self.height / 2)
         sx, sy = mouse_screen_pos
-        old_dx = (sx + 2 * sy) / self.zoom
-        old_dy = (2 * sy - sx) / self.zoom
+        old_dx = (sx + 2 * sy) * self._inv_z
+        old_dy = (2 * sy - sx) * self._inv_z
         old_world_x = self.rect.x + old_dx
         old_world_y = self.rect.y + old_dy
         old_zoom = self.zoom
@@ -740,8 +845,8 @@ class Camera:
         else:
             self.zoom = max(self.zoom / 1.1, 0.5)
         self.update_view_size()
-        new_dx = (sx + 2 * sy) / self.zoom
-        new_dy = (2 * sy - sx) / self.zoom
+        new_dx = (sx + 2 * sy) * self._inv_z
+        new_dy = (2 * sy - sx) * self._inv_z
         self.rect.x = old_world_x - new_dx
         self.rect.y = old_world_y - new_dy
         self.target_rect.x = self.rect.x
@@ -751,6 +856,8 @@ class Camera:
     def world_to_iso(self, world_pos: tuple, zoom: float) -> tuple[float, float]:
         dx = world_pos[0] - self.rect.x
         dy = world_pos[1] - self.rect.y
+        if zoom == self.zoom:
+            return ((dx - dy) * self._z2, (dx + dy) * self._z4)
         iso_x = (dx - dy) * (zoom / 2)
         iso_y = (dx + dy) * (zoom / 4)
         return (iso_x, iso_y)
@@ -758,19 +865,53 @@ class Camera:
     def world_to_iso_3d(self, world_x: float, world_y: float, world_z: float, zoom: float) -> tuple[float, float]:
         dx = world_x - self.rect.x
         dy = world_y - self.rect.y
+        if zoom == self.zoom:
+            z2 = self._z2
+            return ((dx - dy) * z2, (dx + dy) * self._z4 - world_z * z2)
         iso_x = (dx - dy) * (zoom / 2)
         iso_y = (dx + dy) * (zoom / 4) - world_z * (zoom / 2)
         return (iso_x, iso_y)
     
+    def world_to_iso_batch(self, world_points: list, zoom: float) -> list:
+        # Same result as world_to_iso per point, with the camera origin and zoom factors looked up once
+        x0, y0 = self.rect.x, self.rect.y
+        half, quarter = (self._z2, self._z4) if zoom == self.zoom else (zoom / 2, zoom / 4)
+        return [((x - x0 - (y - y0)) * half, (x - x0 + (y - y0)) * quarter) for x, y in world_points]
+    
+    def world_to_iso_3d_batch(self, world_points: list, zoom: float) -> list:
+        # Same result as world_to_iso_3d per (x, y, z) point, with the camera origin and zoom factors looked up once
+        x0, y0 = self.rect.x, self.rect.y
+        half, quarter = (self._z2, self._z4) if zoom == self.zoom else (zoom / 2, zoom / 4)
+        return [((x - x0 - (y - y0)) * half, (x - x0 + (y - y0)) * quarter - z * half) for x, y, z in world_points]
+    
+    def iso_tile_grid(self, start_tx: int, end_tx: int, start_ty: int, end_ty: int, tile_size: int, zoom: float) -> tuple[list, int]:
+        # Screen positions of every tile corner in the block, in one batch; corner (tx, ty) is at
+        # index (tx - start_tx) * stride + (ty - start_ty). The ground and the fog ask for the same
+        # block each frame, and a still camera asks for it again next frame, so the last grid is kept
+        key = (start_tx, end_tx, start_ty, end_ty, tile_size, zoom, self.rect.x, self.rect.y)
+        if key == self.tile_grid_key:
+            return self.tile_grid
+        stride = end_ty - start_ty + 1
+        corners = [(tx * tile_size, ty * tile_size) for tx in range(start_tx, end_tx + 1) for ty in range(start_ty, end_ty + 1)]
+        self.tile_grid_key = key
+        self.tile_grid = (self.world_to_iso_batch(corners, zoom), stride)
+        return self.tile_grid
+    
     def screen_to_world(self, screen_pos: tuple) -> tuple[float, float]:
         iso_x, iso_y = screen_pos
-        dx = (iso_x + 2 * iso_y) / self.zoom
-        dy = (2 * iso_y - iso_x) / self.zoom
+        inv_z = self._inv_z
+        dx = (iso_x + 2 * iso_y) * inv_z
+        dy = (2 * iso_y - iso_x) * inv_z
         return (
             self.rect.x + dx,
             self.rect.y + dy
         )
     
+    def is_on_screen(self, world_pos: tuple, margin: float) -> bool:
+        # Whether anything drawn within margin screen pixels of world_pos can land in the view
+        iso_x, iso_y = self.world_to_iso(world_pos, self.zoom)
+        return -margin <= iso_x <= self.width + margin and -margin <= iso_y <= self.height + margin
+    
     def get_screen_rect(self, world_rect: pg.Rect) -> pg.Rect:
         corners = [
             (world_rect.left, world_rect.top),
@@ -778,7 +919,7 @@ class Camera:
             (world_rect.right, world_rect.bottom),
             (world_rect.left, world_rect.bottom),
         ]
-        iso_corners = [self.world_to_iso(corner, self.zoom) for corner in corners]
+        iso_corners = self.world_to_iso_batch(corners, self.zoom)
         xs = [p[0] for p in iso_corners]
         ys = [p[1] for p in iso_corners]
         return pg.Rect(min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
@@ -796,53 +937,32 @@ class Camera:
         if keys is None:
             keys = pg.key.get_pressed()
         
-        pressed_pan = keys[pg.K_w] or keys[pg.K_a] or keys[pg.K_s] or keys[pg.K_d]
+        key_mask = keys[pg.K_w] | keys[pg.K_a] << 1 | keys[pg.K_s] << 2 | keys[pg.K_d] << 3
+        pressed_pan = key_mask != 0
         
         mx, my = mouse_pos
-        pan_delta = PAN_SPEED / self.zoom
-        
-        if mx < PAN_EDGE:
-            self.rect.x += pan_delta
-            self.rect.y -= pan_delta
-        if mx > SCREEN_WIDTH - PAN_EDGE and self.rect.right < self.map_width:
-            self.rect.x -= pan_delta
-            self.rect.y += pan_delta
-        if my < PAN_EDGE:
-            self.rect.x += 2 * pan_delta
-            self.rect.y += 2 * pan_delta
-        if my > SCREEN_HEIGHT - PAN_EDGE and self.rect.bottom < self.map_height:
-            self.rect.x -= 2 * pan_delta
-            self.rect.y -= 2 * pan_delta
-        
-        if keys[pg.K_w]:
-            self.rect.x += 2 * pan_delta
-            self.rect.y += 2 * pan_delta
-        if keys[pg.K_s]:
-            self.rect.x -= 2 * pan_delta
-            self.rect.y -= 2 * pan_delta
-        if keys[pg.K_a]:
-            self.rect.x += pan_delta
-            self.rect.y -= pan_delta
-        if keys[pg.K_d]:
-            self.rect.x -= pan_delta
-            self.rect.y += pan_delta
+        edge_mask = ((my < PAN_EDGE)
+                     | (mx < PAN_EDGE) << 1
+                     | (my > SCREEN_HEIGHT - PAN_EDGE and self.rect.bottom < self.map_height) << 2
+                     | (mx > SCREEN_WIDTH - PAN_EDGE and self.rect.right < self.map_width) << 3)
+        if key_mask or edge_mask:
+            # Edge and key pans add up, as both can be active at once
+            key_x, key_y = PAN_TABLE[key_mask]
+            edge_x, edge_y = PAN_TABLE[edge_mask]
+            pan_delta = PAN_SPEED * self._inv_z
+            self.rect.x += (key_x + edge_x) * pan_delta
+            self.rect.y += (key_y + edge_y) * pan_delta
         
         if interface_rect.collidepoint(mx, my):
             self.clamp()
             return
         
         if selected_units and not pressed_pan:
-            avg_x = sum(u.position[0] for u in selected_units) / len(selected_units)
-            avg_y = sum(u.position[1] for u in selected_units) / len(selected_units)
-            target_point = (avg_x, avg_y)
-            self.target_rect.x = target_point[0] - (self.width / 0.1)
-            self.target_rect.y = target_point[1] - (self.height / 0.1)
-            self.snap_to_point(target_point)
-            self.target_rect.x = self.rect.x
-            self.target_rect.y = self.rect.y
-            lerp_alpha = 0.1
-            self.rect.x = self.rect.x + (self.target_rect.x - self.rect.x) * lerp_alpha
-            self.rect.y = self.rect.y + (self.target_rect.y - self.rect.y) * lerp_alpha
+            # One Vector2 sum covers both axes in a single pass over the selection
+            group_center = sum([u.position for u in selected_units], Vector2()) / len(selected_units)
+            # Follow snaps straight onto the group; the target is the snapped view, so there is nothing left to ease
+            self.snap_to_point(group_center)
+            self.target_rect.topleft = self.rect.topleft
         
         self.clamp()
     
@@ -859,38 +979,84 @@ class FogOfWar:
         num_tiles_y = map_height // tile_size
         self.explored = [[False] * num_tiles_y for _ in range(num_tiles_x)]
         self.visible = [[False] * num_tiles_y for _ in range(num_tiles_x)]
+        self.visible_spans = []  # (tx, first_ty, count) runs set visible since the last reset
+        self.overlay = None
+        self.overlay_rect = None  # part of the overlay the last draw wrote to
+        self.reveal_cache = {}
+        self.unit_positions = {}  # where each ally unit revealed from in the last update
         if spectator:
             self.explored = [[True] * num_tiles_y for _ in range(num_tiles_x)]
             self.visible = [[True] * num_tiles_y for _ in range(num_tiles_x)]
+            self.visible_spans = [(tx, 0, num_tiles_y) for tx in range(num_tiles_x)]
     
-    def reveal(self, center: tuple, radius: int):
+    def reveal(self, center: tuple, radius: int, cache: bool = True):
+        # Buildings and idle units reveal the same circle every update, so its column runs are
+        # cached by exact centre and radius and only written back. A moving unit would never
+        # hit its entry again, so callers pass cache=False for those and nothing is stored
         cx, cy = center
-        tile_x, tile_y = int(cx // self.tile_size), int(cy // self.tile_size)
-        radius_tiles = radius // self.tile_size
-        for ty in range(max(0, tile_y - radius_tiles), min(len(self.explored[0]), tile_y + radius_tiles + 1)):
-            for tx in range(max(0, tile_x - radius_tiles), min(len(self.explored), tile_x + radius_tiles + 1)):
-                tile_center_x = tx * self.tile_size + self.tile_size // 2
-                tile_center_y = ty * self.tile_size + self.tile_size // 2
-                if math.sqrt((cx - tile_center_x)**2 + (cy - tile_center_y)**2) <= radius:
-                    self.explored[tx][ty] = True
-                    self.visible[tx][ty] = True
+        key = (cx, cy, radius)
+        spans = self.reveal_cache.get(key)
+        if spans is None:
+            spans = self.circle_spans(cx, cy, radius)
+            if cache:
+                if len(self.reveal_cache) >= REVEAL_CACHE_SIZE:
+                    self.reveal_cache.clear()
+                self.reveal_cache[key] = spans
+        explored = self.explored
+        visible = self.visible
+        for tx, first_ty, count in spans:
+            run = [True] * count
+            explored[tx][first_ty:first_ty + count] = run
+            visible[tx][first_ty:first_ty + count] = run
+        self.visible_spans.extend(spans)
+    
+    def circle_spans(self, cx: float, cy: float, radius: int) -> list:
+        # Each column of the circle is one contiguous run of tiles: (tx, first_ty, count)
+        tile_size = self.tile_size
+        half_tile = tile_size // 2
+        tile_x, tile_y = int(cx // tile_size), int(cy // tile_size)
+        radius_tiles = radius // tile_size
+        min_ty = max(0, tile_y - radius_tiles)
+        max_ty = min(len(self.explored[0]), tile_y + radius_tiles + 1) - 1
+        spans = []
+        for tx in range(max(0, tile_x - radius_tiles), min(len(self.explored), tile_x + radius_tiles + 1)):
+            dx = cx - (tx * tile_size + half_tile)
+            reach_sq = radius * radius - dx * dx
+            if reach_sq < 0:
+                continue
+            reach = math.sqrt(reach_sq)
+            first_ty = max(min_ty, math.ceil((cy - reach - half_tile) / tile_size))
+            last_ty = min(max_ty, math.floor((cy + reach - half_tile) / tile_size))
+            if first_ty > last_ty:
+                continue
+            spans.append((tx, first_ty, last_ty - first_ty + 1))
+        return spans
     
     def update_visibility(self, ally_units, ally_buildings, global_buildings):
         if not ally_units and not ally_buildings:
             return
-        num_tiles_x = len(self.visible)
-        num_tiles_y = len(self.visible[0])
-        self.visible = [[False] * num_tiles_y for _ in range(num_tiles_x)]
+        visible = self.visible
+        num_tiles_x = len(visible)
+        num_tiles_y = len(visible[0])
+        # Clear only the runs the last update revealed instead of rebuilding the whole grid
+        for tx, first_ty, count in self.visible_spans:
+            visible[tx][first_ty:first_ty + count] = [False] * count
+        self.visible_spans = []
+        last_positions = self.unit_positions
+        self.unit_positions = positions = {}
         for unit in ally_units:
-            self.reveal(unit.position, unit.sight_range)
+            pos = (unit.position.x, unit.position.y)
+            positions[unit] = pos
+            self.reveal(pos, unit.sight_range, last_positions.get(unit) == pos)
         for building in ally_buildings:
             if building.health > 0:
                 self.reveal(building.position, building.sight_range)
+        tile_size = self.tile_size
         for building in global_buildings:
-            if building.health > 0:
-                tx, ty = int(building.position[0] // self.tile_size), int(building.position[1] // self.tile_size)
+            if building.health > 0 and not building.is_seen:
+                tx, ty = int(building.position[0] // tile_size), int(building.position[1] // tile_size)
                 if 0 <= tx < num_tiles_x and 0 <= ty < num_tiles_y:
-                    building.is_seen = building.is_seen or self.visible[tx][ty]
+                    building.is_seen = visible[tx][ty]
     
     def is_visible(self, pos: tuple) -> bool:
         tx, ty = int(pos[0] // self.tile_size), int(pos[1] // self.tile_size)
@@ -911,62 +1077,110 @@ class FogOfWar:
         end_tx = min(len(self.visible), int(max_wx // self.tile_size) + 2)
         end_ty = min(len(self.visible[0]), int(max_wy // self.tile_size) + 2)
         zoom = camera.zoom
-        fog_overlay = pg.Surface((int(camera.width), int(camera.height)), pg.SRCALPHA)
-        fog_overlay.fill((0, 0, 0, 0))
+        overlay_size = (int(camera.width), int(camera.height))
+        if self.overlay is None or self.overlay.get_size() != overlay_size:
+            self.overlay = pg.Surface(overlay_size, pg.SRCALPHA)
+            self.overlay_rect = None
+        fog_overlay = self.overlay
+        if self.overlay_rect is not None:
+            fog_overlay.fill((0, 0, 0, 0), self.overlay_rect)
+        # Unexplored fog is opaque, so it is drawn straight onto the frame; only the translucent
+        # explored fog goes through the overlay, and only the area it covers is cleared and blended
+        old_clip = surface.get_clip()
+        surface.set_clip((0, 0) + overlay_size)
+        dirty = []
+        corners, stride = camera.iso_tile_grid(start_tx, end_tx, start_ty, end_ty, self.tile_size, zoom)
+        # Consecutive fogged tiles of a column with the same alpha form one parallelogram, drawn as a single polygon
         for tx in range(start_tx, end_tx):
-            wx = tx * self.tile_size
-            for ty in range(start_ty, end_ty):
-                wy = ty * self.tile_size
-                if not self.visible[tx][ty]:
-                    alpha = 255 if not self.explored[tx][ty] else 100
-                    color = (0, 0, 0, alpha)
-                    c1 = (wx, wy)
-                    c2 = (wx + self.tile_size, wy)
-                    c3 = (wx + self.tile_size, wy + self.tile_size)
-                    c4 = (wx, wy + self.tile_size)
-                    iso1 = camera.world_to_iso(c1, zoom)
-                    iso2 = camera.world_to_iso(c2, zoom)
-                    iso3 = camera.world_to_iso(c3, zoom)
-                    iso4 = camera.world_to_iso(c4, zoom)
-                    pg.draw.polygon(fog_overlay, color, [iso1, iso2, iso3, iso4])
-        surface.blit(fog_overlay, (0, 0))
+            visible_col = self.visible[tx]
+            explored_col = self.explored[tx]
+            base = (tx - start_tx) * stride - start_ty
+            ty = start_ty
+            while ty < end_ty:
+                if visible_col[ty]:
+                    ty += 1
+                    continue
+                explored = explored_col[ty]
+                run_end = ty + 1
+                while run_end < end_ty and not visible_col[run_end] and explored_col[run_end] == explored:
+                    run_end += 1
+                k0 = base + ty
+                k1 = base + run_end
+                quad = [corners[k0], corners[k0 + stride], corners[k1 + stride], corners[k1]]
+                if explored:
+                    dirty.append(pg.draw.polygon(fog_overlay, (0, 0, 0, 100), quad))
+                else:
+                    pg.draw.polygon(surface, (0, 0, 0), quad)
+                ty = run_end
+        surface.set_clip(old_clip)
+        self.overlay_rect = dirty[0].unionall(dirty[1:]) if dirty else None
+        if self.overlay_rect is not None:
+            surface.blit(fog_overlay, self.overlay_rect.topleft, self.overlay_rect)
+
+@lru_cache(maxsize=None)
+def particle_image(color: tuple, size: int) -> pg.Surface:
+    image = pg.Surface((size, size), pg.SRCALPHA)
+    pg.draw.circle(image, color, (size // 2, size // 2), size // 2)
+    return image
+
+@lru_cache(maxsize=1024)
+def transformed_sprite(image: pg.Surface, size: tuple, degrees: float = 0.0) -> pg.Surface:
+    # Sprites are shared per look and a projectile keeps its heading, so the same scale and rotation
+    # come back every frame until the zoom changes; resample once per combination
+    # Filtering is lost on a few-pixel sprite, so only larger ones pay for smoothscale
+    scaler = pg.transform.smoothscale if max(size) > SMOOTHSCALE_MIN_SIZE else pg.transform.scale
+    scaled = scaler(image, size)
+    return pg.transform.rotate(scaled, degrees) if degrees else scaled
+
+@lru_cache(maxsize=4096)
+def faded_sprite(image: pg.Surface, size: tuple, alpha: int) -> pg.Surface:
+    # Batched blits can't change a shared surface's alpha in between, so each fade level is its own copy
+    faded = transformed_sprite(image, size).copy()
+    faded.set_alpha(alpha)
+    return faded
 
 class Particle(pg.sprite.Sprite):
     def __init__(self, pos: tuple, vx: float, vy: float, size: int, color: pg.Color, lifetime: int):
         super().__init__()
         self.position = Vector2(pos)
-        self.vx = vx
-        self.vy = vy
+        self.velocity = Vector2(vx, vy)
         self.size = size
         self.color = color
         self.lifetime = lifetime * 10
         self.age = 0
-        self.image = pg.Surface((size, size), pg.SRCALPHA)
-        pg.draw.circle(self.image, color, (size // 2, size // 2), size // 2)
+        # The image is shared between particles of a colour and size, so fading is kept per particle
+        self.alpha = 255
+        self.image = particle_image(tuple(color), size)
         self.rect = self.image.get_rect(center=self.position)
     
     def update(self):
-        self.position.x += self.vx
-        self.position.y += self.vy
+        self.position += self.velocity
         self.age += 1
-        alpha = int(255 * (1 - self.age / self.lifetime))
-        self.image.set_alpha(alpha)
-        self.rect.center = self.position
         if self.age >= self.lifetime:
+            # Dead particles are never drawn again, so skip the alpha and rect refresh
             self.kill()
+            return
+        self.alpha = int(255 * (1 - self.age / self.lifetime))
+        self.rect.center = self.position
     
-    def draw(self, surface: pg.Surface, camera: Camera):
+    def blit_args(self, camera: Camera) -> tuple | None:
+        # (image, position) to blit this particle with, or None when nothing would show
         screen_rect = camera.get_screen_rect(self.rect)
         if not screen_rect.colliderect((0, 0, camera.width, camera.height)):
-            return
+            return None
         screen_pos = camera.world_to_iso(self.position, camera.zoom)
         scaled_size = (int(self.image.get_width() * camera.zoom), int(self.image.get_height() * camera.zoom))
         if scaled_size[0] > 0 and scaled_size[1] > 0:
-            scaled_image = pg.transform.smoothscale(self.image, scaled_size)
+            scaled_image = faded_sprite(self.image, scaled_size, self.alpha)
             offset_x = scaled_size[0] / 2
             offset_y = scaled_size[1] / 2
-            blit_pos = (screen_pos[0] - offset_x, screen_pos[1] - offset_y)
-            surface.blit(scaled_image, blit_pos)
+            return scaled_image, (screen_pos[0] - offset_x, screen_pos[1] - offset_y)
+        return None
+
+    def draw(self, surface: pg.Surface, camera: Camera):
+        args = self.blit_args(camera)
+        if args is not None:
+            surface.blit(*args)
 
 class PlasmaBurnParticle(Particle):
     def __init__(self, pos: tuple, entity, color: pg.Color, lifetime: int):
@@ -976,15 +1190,15 @@ class PlasmaBurnParticle(Particle):
         self.initial_lifetime = lifetime * 30
 
     def update(self):
-        body_angle = getattr(self.entity, 'body_angle', 0)
-        rotated_offset = self.offset.rotate_rad(-body_angle)
-        self.position = self.entity.position + rotated_offset
         self.age += 1
-        alpha = int(255 * (1 - self.age / self.initial_lifetime))
-        self.image.set_alpha(alpha)
-        self.rect.center = self.position
-        if self.age >= self.initial_lifetime:
+        # Burn marks live in the shared particle group, so they go out with their entity
+        if self.age >= self.initial_lifetime or self.entity.health <= 0:
             self.kill()
+            return
+        body_angle = getattr(self.entity, 'body_angle', 0)
+        self.position = self.entity.position + self.offset.rotate_rad(-body_angle)
+        self.alpha = int(255 * (1 - self.age / self.initial_lifetime))
+        self.rect.center = self.position
 
 def create_explosion(position: tuple, particles: pg.sprite.Group, team: Team, count: int = PARTICLES_PER_EXPLOSION):
     color = team_to_color[team]
@@ -995,6 +1209,45 @@ def create_explosion(position: tuple, particles: pg.sprite.Group, team: Team, co
         lifetime = random.randint(1, 3)
         particles.add(Particle(position, vx, vy, size, color, lifetime))
 
+def draw_particles(surface: pg.Surface, camera: Camera, particles: pg.sprite.Group, entity_visible):
+    # One blits call for the whole group instead of a blit per particle. Plasma burns sit on their
+    # entity, so they are only shown where the entity itself would be, never through the fog
+    batch = []
+    for particle in particles:
+        if isinstance(particle, PlasmaBurnParticle) and not entity_visible(particle.entity):
+            continue
+        args = particle.blit_args(camera)
+        if args is not None:
+            batch.append(args)
+    surface.blits(batch, False)
+
+@lru_cache(maxsize=None)
+def projectile_sprite(team: Team, length: int, width: int) -> pg.Surface:
+    # Tail-to-head alpha ramp; every projectile of a team and weapon shape shares the one surface
+    image = pg.Surface((length, width), pg.SRCALPHA)
+    color = team_to_color[team]
+    for i in range(length):
+        alpha = int(255 * (i / length))
+        pg.draw.line(image, (color.r, color.g, color.b, alpha), (i, 0), (i, width), 1)
+    return image
+
+@lru_cache(maxsize=1024)
+def trail_styles(team: Team, num_segments: int, width: float, zoom: float) -> tuple:
+    # (color, width) of each trail segment, oldest first, fading in towards the head
+    c = team_to_color[team]
+    styles = []
+    for i in range(num_segments):
+        age_factor = i / max(1, num_segments - 1)
+        intensity = 0.3 + 0.7 * age_factor
+        trail_color = (
+            int(c.r * intensity),
+            int(c.g * intensity),
+            int(c.b * intensity)
+        )
+        trail_width = max(1, int(width * zoom * (0.2 + 0.3 * age_factor)))
+        styles.append((trail_color, trail_width))
+    return tuple(styles)
+
 class Projectile(pg.sprite.Sprite):
     def __init__(self, pos: tuple, direction: Vector2, damage: int, team: Team, weapon: Dict[str, Any]):
         super().__init__()
@@ -1003,22 +1256,19 @@ class Projectile(pg.sprite.Sprite):
         self.damage = damage
         self.team = team
         self.speed = weapon["projectile_speed"]
+        self.velocity = self.direction * self.speed
         self.lifetime = PROJECTILE_LIFETIME * 30
         self.age = 0
         self.length = weapon["projectile_length"]
         self.width = weapon["projectile_width"]
         self.angle = math.atan2(self.direction.y, self.direction.x)
-        self.image = pg.Surface((self.length, self.width), pg.SRCALPHA)
-        color = team_to_color[team]
-        for i in range(self.length):
-            alpha = int(255 * (i / self.length))
-            pg.draw.line(self.image, (color.r, color.g, color.b, alpha), (i, 0), (i, self.width), 1)
+        self.image = projectile_sprite(team, self.length, self.width)
         self.rect = self.image.get_rect(center=self.position)
-        self.trail = deque(maxlen=5)
+        self.trail = deque(maxlen=5)  # recent (x, y) positions, oldest first
     
     def update(self):
-        self.trail.append(self.position.copy())
-        self.position += self.direction * self.speed
+        self.trail.append((self.position.x, self.position.y))
+        self.position += self.velocity
         self.age += 1
         self.rect.center = self.position
         if self.age >= self.lifetime:
@@ -1030,34 +1280,22 @@ class Projectile(pg.sprite.Sprite):
             return
         screen_pos = camera.world_to_iso(self.position, camera.zoom)
         if len(self.trail) > 1:
-            trail_positions = [camera.world_to_iso(pos, camera.zoom) for pos in self.trail]
-            num_segments = len(trail_positions) - 1
-            for i in range(num_segments):
-                p1 = trail_positions[i]
-                p2 = trail_positions[i + 1]
-                age_factor = i / max(1, num_segments - 1)
-                c = pg.Color(team_to_color[self.team])
-                intensity = 0.3 + 0.7 * age_factor
-                trail_color = (
-                    int(c.r * intensity),
-                    int(c.g * intensity),
-                    int(c.b * intensity)
-                )
-                trail_width = max(1, int(self.width * camera.zoom * (0.2 + 0.3 * age_factor)))
-                pg.draw.line(surface, trail_color, p1, p2, trail_width)
+            trail_positions = camera.world_to_iso_batch(self.trail, camera.zoom)
+            styles = trail_styles(self.team, len(trail_positions) - 1, self.width, camera.zoom)
+            for i, (trail_color, trail_width) in enumerate(styles):
+                pg.draw.line(surface, trail_color, trail_positions[i], trail_positions[i + 1], trail_width)
         scaled_length = int(self.length * camera.zoom)
         scaled_width = int(self.width * camera.zoom)
         if scaled_length > 0 and scaled_width > 0:
-            scaled_image = pg.transform.smoothscale(self.image, (scaled_length, scaled_width))
-            rotated_image = pg.transform.rotate(scaled_image, -math.degrees(self.angle))
+            rotated_image = transformed_sprite(self.image, (scaled_length, scaled_width), -math.degrees(self.angle))
             rot_rect = rotated_image.get_rect(center=screen_pos)
             surface.blit(rotated_image, rot_rect.topleft)
 
 def check_collision(entity, projectile):
     proj_rect = pg.Rect(projectile.position.x - projectile.length/2, projectile.position.y - projectile.width/2, projectile.length, projectile.width)
     if hasattr(entity, 'radius'):
-        dist = entity.distance_to(projectile.position)
-        return dist < (entity.radius + max(projectile.length, projectile.width) / 2)
+        reach = entity.radius + max(projectile.length, projectile.width) / 2
+        return entity.position.distance_squared_to(projectile.position) < reach * reach
     else:
         return entity.rect.colliderect(proj_rect)
 
@@ -1073,7 +1311,6 @@ class GameObject(pg.sprite.Sprite, ABC):
         self.selected = False
         self.is_seen = False
         self.body_angle = 0
-        self.plasma_burn_particles: list[PlasmaBurnParticle] = []
         self.map_width = MAP_WIDTH
         self.map_height = MAP_HEIGHT
         self.image = pg.Surface((32, 32))
@@ -1121,9 +1358,9 @@ class GameObject(pg.sprite.Sprite, ABC):
         self.under_attack = True
         self.under_attack_timer = 120
         if self.health < self.max_health * 0.7 and random.random() < 0.3:
-            color = team_to_color[self.team]
+            color = self.team_color
             for _ in range(PLASMA_BURN_PARTICLES):
-                self.plasma_burn_particles.append(PlasmaBurnParticle(self.position, self, color, PLASMA_BURN_DURATION))
+                particles.add(PlasmaBurnParticle(self.position, self, color, PLASMA_BURN_DURATION))
         return self.health <= 0
 
     @abstractmethod
@@ -1131,9 +1368,13 @@ class GameObject(pg.sprite.Sprite, ABC):
         pass
 
 class Unit(GameObject):
+    # Pre-drawn infantry figures shared by every soldier, keyed by (unit_type, team, angle_bin, zoom)
+    humanoid_sprites = {}
+
     def __init__(self, position: tuple, team: Team, unit_type: str, hq=None):
         super().__init__(position, team)
         self.team_color = team_to_color[team]
+        self.palette = TEAM_PALETTES[team]
         self.hq = hq
         stats = UNIT_CLASSES[unit_type]
         self.stats = stats.copy()
@@ -1158,6 +1399,9 @@ class Unit(GameObject):
         self.random_offset_angle = random.uniform(-0.5, 0.5)
         self.turret_angle = 0
         self.body_angle = 0
+        # (cos, sin) of each angle, refreshed only when the unit actually rotates
+        self.body_heading = (1.0, 0.0)
+        self.turret_heading = (1.0, 0.0)
         self.target_body_angle = 0.0
         self.target_turret_angle = 0.0
         self.hull_rotation_speed = stats.get("hull_rotation_speed", float('inf'))
@@ -1199,18 +1443,12 @@ class Unit(GameObject):
         tfr = (pos.x + w / 2, pos.y - d / 2, top_z)
         tbr = (pos.x + w / 2, pos.y + d / 2, top_z)
         tbl = (pos.x - w / 2, pos.y + d / 2, top_z)
-        p_bfl = camera.world_to_iso_3d(*bfl, zoom)
-        p_bfr = camera.world_to_iso_3d(*bfr, zoom)
-        p_bbr = camera.world_to_iso_3d(*bbr, zoom)
-        p_bbl = camera.world_to_iso_3d(*bbl, zoom)
-        p_tfl = camera.world_to_iso_3d(*tfl, zoom)
-        p_tfr = camera.world_to_iso_3d(*tfr, zoom)
-        p_tbr = camera.world_to_iso_3d(*tbr, zoom)
-        p_tbl = camera.world_to_iso_3d(*tbl, zoom)
+        p_bfl, p_bfr, p_bbr, p_bbl, p_tfl, p_tfr, p_tbr, p_tbl = camera.world_to_iso_3d_batch(
+            (bfl, bfr, bbr, bbl, tfl, tfr, tbr, tbl), zoom)
         base_points = [p_bfl, p_bfr, p_bbr, p_bbl]
         front_points = [p_bfl, p_bfr, p_tfr, p_tfl]
         pg.draw.polygon(surface, self.team_color, front_points)
-        side_color = tuple(max(0, c - 50) for c in self.team_color)
+        side_color = self.palette.side
         pg.draw.polygon(surface, side_color, [p_bfr, p_bbr, p_tbr, p_tfr])
         pg.draw.polygon(surface, side_color, [p_bbr, p_bbl, p_tbl, p_tbr])
         pg.draw.polygon(surface, side_color, [p_bbl, p_bfl, p_tfl, p_tbl])
@@ -1218,57 +1456,79 @@ class Unit(GameObject):
         roof_points = [p_tfl, p_tfr, p_tbr, p_tbl]
         pg.draw.polygon(surface, roof_color, roof_points)
         outline_color = pg.Color(0, 0, 0)
-        all_edges = [
-            [p_bfl, p_bfr, p_bbr, p_bbl, p_bfl],
-            [p_tfl, p_tfr, p_tbr, p_tbl, p_tfl],
-            [p_bfl, p_tfl],
-            [p_bfr, p_tfr],
-            [p_bbr, p_tbr],
-            [p_bbl, p_tbl],
-        ]
-        for edge in all_edges:
-            if len(edge) > 2:
-                for i in range(len(edge) - 1):
-                    pg.draw.line(surface, outline_color, edge[i], edge[i + 1], int(2 * zoom))
-            else:
-                pg.draw.line(surface, outline_color, edge[0], edge[1], int(2 * zoom))
+        line_width = int(2 * zoom)
+        # Closed polylines rasterise exactly like their segments drawn one by one, in one call per face
+        pg.draw.lines(surface, outline_color, True, base_points, line_width)
+        pg.draw.lines(surface, outline_color, True, roof_points, line_width)
+        for bottom, top in zip(base_points, roof_points):
+            pg.draw.line(surface, outline_color, bottom, top, line_width)
         if self.selected:
             pg.draw.polygon(surface, (255, 255, 0), base_points, int(2 * zoom))
         self.draw_health_bar(surface, camera, mouse_pos)
-        for particle in self.plasma_burn_particles:
-            particle.draw(surface, camera)
 
     def draw_humanoid(self, surface: pg.Surface, camera: Camera, mouse_pos: tuple = None):
         if self.health <= 0:
             return
         zoom = camera.zoom
-        pos = self.position
-        angle = self.body_angle
-        cos_a = math.cos(angle)
-        sin_a = math.sin(angle)
-        team_color = self.team_color
-        side_color = tuple(max(0, c - 50) for c in team_color)
-        highlight_color = tuple(min(255, c + 30) for c in team_color)  
-        outline_color = pg.Color(0, 0, 0)
         shadow_color = pg.Color(50, 50, 50, 100)  
     
         shadow_offset = (2 * zoom, 2 * zoom)
-        base_screen = camera.world_to_iso(pos, zoom)
+        base_screen = camera.world_to_iso(self.position, zoom)
         shadow_r = int(4 * zoom)
         pg.draw.ellipse(surface, shadow_color, (
             int(base_screen[0] + shadow_offset[0] - shadow_r),
             int(base_screen[1] + shadow_offset[1] - shadow_r // 2),
             shadow_r * 2, shadow_r
         ))
+
+        # The figure only depends on type, team, facing and zoom, so each combination is drawn once and blitted
+        angle_bin = round(self.body_angle * HUMANOID_ANGLE_BINS / math.tau) % HUMANOID_ANGLE_BINS
+        key = (self.unit_type, self.team, angle_bin, zoom)
+        sprite = self.humanoid_sprites.get(key)
+        if sprite is None:
+            if len(self.humanoid_sprites) >= HUMANOID_SPRITE_CACHE_SIZE:
+                self.humanoid_sprites.clear()
+            sprite = self.humanoid_sprites[key] = self.render_humanoid(angle_bin, zoom)
+        half = sprite.get_width() // 2
+        surface.blit(sprite, (int(base_screen[0]) - half, int(base_screen[1]) - half))
+    
+        if self.selected:
+            select_r = int(10 * zoom)
+            pulse_alpha = int(128 + 127 * math.sin(time.perf_counter() * 10))
+            pulse_color = (*[255, 255, 0], pulse_alpha)
+            select_surf = pg.Surface((select_r * 2, select_r * 2), pg.SRCALPHA)
+            pg.draw.circle(select_surf, pulse_color, (select_r, select_r), select_r, int(3 * zoom))
+            surface.blit(select_surf, (int(base_screen[0] - select_r), int(base_screen[1] - select_r)))
+    
+        self.draw_health_bar(surface, camera, mouse_pos)
+
+    def render_humanoid(self, angle_bin: int, zoom: float) -> pg.Surface:
+        angle = angle_bin * math.tau / HUMANOID_ANGLE_BINS
+        half = int(HUMANOID_SPRITE_REACH * zoom) + 2
+        sprite = pg.Surface((half * 2, half * 2), pg.SRCALPHA)
+        # A camera at the world origin, so the figure can be drawn around whichever point lands on the sprite centre
+        camera = Camera()
+        camera.zoom = zoom
+        camera.update_view_size()
+        origin = Vector2(camera.screen_to_world((half, half)))
+        self.draw_humanoid_figure(sprite, camera, origin, (math.cos(angle), math.sin(angle)), zoom)
+        return sprite
+
+    def draw_humanoid_figure(self, surface: pg.Surface, camera: Camera, pos: Vector2, heading: tuple, zoom: float):
+        cos_a, sin_a = heading
+        team_color = self.team_color
+        side_color = self.palette.side
+        highlight_color = self.palette.highlight
+        outline_color = pg.Color(0, 0, 0)
     
         torso_w = 1.1  
         torso_d = 0.7
         torso_h = 2.8
         torso_base_z = 2.0
-        self.draw_rotated_box(surface, camera, torso_w * 0.9, torso_d * 0.9, torso_h * 0.3, angle, torso_base_z + torso_h * 0.7,
-                              highlight_color, side_color, highlight_color, outline_color, zoom, False)
-        self.draw_rotated_box(surface, camera, torso_w, torso_d, torso_h, angle, torso_base_z, team_color, side_color,
-                              team_color, outline_color, zoom, False)
+        self.draw_rotated_box(surface, camera, torso_w * 0.9, torso_d * 0.9, torso_h * 0.3, heading, torso_base_z + torso_h * 0.7,
+                              highlight_color, side_color, highlight_color, outline_color, zoom, False, origin=pos)
+        self.draw_rotated_box(surface, camera, torso_w, torso_d, torso_h, heading, torso_base_z, team_color, side_color,
+                              team_color, outline_color, zoom, False, origin=pos)
     
         head_base_z = torso_base_z + torso_h
         head_offset_x = 0.0 * cos_a - 0.0 * sin_a
@@ -1391,7 +1651,7 @@ class Unit(GameObject):
             p_rifle_start = camera.world_to_iso_3d(rifle_start_x, rifle_start_y, weapon_z, zoom)
             p_rifle_end = camera.world_to_iso_3d(rifle_end_x, rifle_end_y, weapon_z, zoom)
             
-            team_grey = tuple(int(c * 0.6) for c in team_color)  
+            team_grey = self.palette.grey
             barrel_color = (team_grey)  
             stock_color = (139, 69, 19)  
             highlight_color = (200, 200, 200)  
@@ -1427,7 +1687,7 @@ class Unit(GameObject):
             p_rocket_start = camera.world_to_iso_3d(rocket_start_x, rocket_start_y, weapon_z, zoom)
             p_rocket_end = camera.world_to_iso_3d(rocket_end_x, rocket_end_y, weapon_z, zoom)
             
-            tube_color = tuple(int(c * 0.7) for c in team_color)  
+            tube_color = self.palette.tube
             warhead_color = (200, 50, 50)  
             pg.draw.line(surface, tube_color, p_rocket_start, p_rocket_end, rocket_width)
             pg.draw.line(surface, outline_color, p_rocket_start, p_rocket_end, 2)
@@ -1452,83 +1712,44 @@ class Unit(GameObject):
                 fin_end_x = p_rocket_end[0] + fin_length * math.cos(fin_angle)
                 fin_end_y = p_rocket_end[1] + fin_length * math.sin(fin_angle)
                 pg.draw.line(surface, (120, 120, 120), p_rocket_end, (fin_end_x, fin_end_y), 1)
-        
-        if self.selected:
-            select_r = int(10 * zoom)
-            pulse_alpha = int(128 + 127 * math.sin(pg.time.get_ticks() * 0.01))  
-            pulse_color = (*[255, 255, 0], pulse_alpha)
-            select_surf = pg.Surface((select_r * 2, select_r * 2), pg.SRCALPHA)
-            pg.draw.circle(select_surf, pulse_color, (select_r, select_r), select_r, int(3 * zoom))
-            surface.blit(select_surf, (int(base_screen[0] - select_r), int(base_screen[1] - select_r)))
-    
-        self.draw_health_bar(surface, camera, mouse_pos)
-        for particle in self.plasma_burn_particles:
-            particle.draw(surface, camera)
 
-    def draw_rotated_box(self, surface: pg.Surface, camera: Camera, w: float, d: float, h: float, angle: float, base_z: float, team_color, side_color, roof_color, outline_color: pg.Color, zoom: float, is_turret: bool = False, p_bottom: list = None):
-        cos = math.cos(angle)
-        sin = math.sin(angle)
-
-        def rotate_rel(points, cos, sin):
-            return [(x * cos - y * sin, x * sin + y * cos, z) for x, y, z in points]
-
-        rel_bottom = [
-            (-w / 2, -d / 2, 0),
-            (w / 2, -d / 2, 0),
-            (w / 2, d / 2, 0),
-            (-w / 2, d / 2, 0),
-        ]
-        rel_top = [(x, y, h) for x, y, _ in rel_bottom]
-        rot_bottom = rotate_rel(rel_bottom, cos, sin)
-        rot_top = rotate_rel(rel_top, cos, sin)
-        full_bottom = [(self.position.x + rx, self.position.y + ry, base_z + rz) for rx, ry, rz in rot_bottom]
-        full_top = [(self.position.x + rx, self.position.y + ry, base_z + rz) for rx, ry, rz in rot_top]
-        p_bottom_local = [camera.world_to_iso_3d(*pt, zoom) for pt in full_bottom]
-        p_top = [camera.world_to_iso_3d(*pt, zoom) for pt in full_top]
+    def draw_rotated_box(self, surface: pg.Surface, camera: Camera, w: float, d: float, h: float, heading: tuple, base_z: float, team_color, side_color, roof_color, outline_color: pg.Color, zoom: float, is_turret: bool = False, p_bottom: list = None, origin: Vector2 = None):
+        cos, sin = heading
+        px, py = self.position if origin is None else origin
+        half_w, half_d = w / 2, d / 2
+        # Top and bottom faces share the rotated footprint and differ only in z, so rotate the 4 corners once
+        footprint = [(px + (x * cos - y * sin), py + (x * sin + y * cos))
+                     for x, y in ((-half_w, -half_d), (half_w, -half_d), (half_w, half_d), (-half_w, half_d))]
+        top_z = base_z + h
+        projected = camera.world_to_iso_3d_batch([(x, y, base_z) for x, y in footprint] + [(x, y, top_z) for x, y in footprint], zoom)
+        p_bottom_local = projected[:4]
+        p_top = projected[4:]
         if p_bottom is not None:
             p_bottom[:] = p_bottom_local
 
-        wall_indices = [
-            [0, 1, 1, 0],
-            [1, 2, 2, 1],
-            [2, 3, 3, 2],
-            [3, 0, 0, 3],
-        ]
-        avg_ys = []
-        for widx in wall_indices:
-            ys = [
-                full_bottom[widx[0]][1],
-                full_bottom[widx[1]][1],
-                full_top[widx[2]][1],
-                full_top[widx[3]][1],
-            ]
-            avg_ys.append(sum(ys) / 4)
-        front_idx = avg_ys.index(min(avg_ys))
-
-        for i, widx in enumerate(wall_indices):
-            points = [
-                p_bottom_local[widx[0]],
-                p_bottom_local[widx[1]],
-                p_top[widx[2]],
-                p_top[widx[3]],
-            ]
-            color = team_color if i == front_idx else side_color
-            pg.draw.polygon(surface, color, points)
+        # Mean world y of each wall's four corners (two bottom, two top above them)
+        ys = [y for _, y in footprint]
+        y0, y1, y2, y3 = [(ys[i] + ys[j] + ys[j] + ys[i]) / 4 for i, j in BOX_WALLS]
+        # Front wall is the one with the smallest mean y: a two-round knockout over the pairs,
+        # with ties going to the lower index just like list.index(min(...))
+        first_pair = y0 <= y1
+        second_pair = y2 <= y3
+        if (y0 if first_pair else y1) <= (y2 if second_pair else y3):
+            front_idx = 0 if first_pair else 1
+        else:
+            front_idx = 2 if second_pair else 3
+
+        for wall, (i, j) in enumerate(BOX_WALLS):
+            color = team_color if wall == front_idx else side_color
+            pg.draw.polygon(surface, color, (p_bottom_local[i], p_bottom_local[j], p_top[j], p_top[i]))
 
         pg.draw.polygon(surface, roof_color, p_top)
 
-        all_points = p_bottom_local + p_top
-        bottom_edge = [0, 1, 2, 3, 0]
-        top_edge = [4, 5, 6, 7, 4]
-        verticals = [[0, 4], [1, 5], [2, 6], [3, 7]]
-        all_edges = [bottom_edge, top_edge] + verticals
         line_width = int(1 * zoom) if is_turret else int(2 * zoom)
-        for edge in all_edges:
-            if len(edge) > 2:
-                for j in range(len(edge) - 1):
-                    pg.draw.line(surface, outline_color, all_points[edge[j]], all_points[edge[j + 1]], line_width)
-            else:
-                pg.draw.line(surface, outline_color, all_points[edge[0]], all_points[edge[1]], line_width)
+        pg.draw.lines(surface, outline_color, True, p_bottom_local, line_width)
+        pg.draw.lines(surface, outline_color, True, p_top, line_width)
+        for bottom, top in zip(p_bottom_local, p_top):
+            pg.draw.line(surface, outline_color, bottom, top, line_width)
 
     def draw_vehicle(self, surface: pg.Surface, camera: Camera, mouse_pos: tuple = None):
         if self.health <= 0:
@@ -1538,18 +1759,18 @@ class Unit(GameObject):
         h = self.height
         pos = self.position
         base_z = self.fly_height if self.air else 0
-        side_color = tuple(max(0, c - 50) for c in self.team_color)
+        side_color = self.palette.side
         roof_color = pg.Color(100, 100, 100)
         outline_color = pg.Color(0, 0, 0)
         p_bottom = []
-        self.draw_rotated_box(surface, camera, w, d, h, self.body_angle, base_z, self.team_color, side_color, roof_color, outline_color, zoom, False, p_bottom)
+        self.draw_rotated_box(surface, camera, w, d, h, self.body_heading, base_z, self.team_color, side_color, roof_color, outline_color, zoom, False, p_bottom)
         if self.selected:
             pg.draw.polygon(surface, (255, 255, 0), p_bottom, int(2 * zoom))
         turret_w = self.stats["turret_width"]
         turret_d = self.stats["turret_depth"]
         turret_h = self.stats["turret_height"]
         turret_base_z = base_z + h
-        self.draw_rotated_box(surface, camera, turret_w, turret_d, turret_h, self.turret_angle, turret_base_z, self.team_color, side_color, roof_color, outline_color, zoom, True)
+        self.draw_rotated_box(surface, camera, turret_w, turret_d, turret_h, self.turret_heading, turret_base_z, self.team_color, side_color, roof_color, outline_color, zoom, True)
         if self.unit_type in ["Tank", "HeavyTank", "TankDestroyer"]:
             barrel_length = self.stats["barrel_length"]
             barrel_width = self.stats["barrel_width"]
@@ -1557,8 +1778,7 @@ class Unit(GameObject):
             turret_center_x = pos.x + self.stats["turret_offset_x"]
             turret_center_y = pos.y + self.stats["turret_offset_y"]
             turret_center_z = turret_base_z + turret_h / 2
-            cos_t = math.cos(self.turret_angle)
-            sin_t = math.sin(self.turret_angle)
+            cos_t, sin_t = self.turret_heading
             front_offset = turret_d / 2
             barrel_start_x = turret_center_x + front_offset * cos_t
             barrel_start_y = turret_center_y + front_offset * sin_t
@@ -1572,19 +1792,11 @@ class Unit(GameObject):
             b2 = (barrel_start_x + (barrel_width / 2) * perp_cos, barrel_start_y + (barrel_width / 2) * perp_sin, barrel_start_z - barrel_height / 2)
             b3 = (barrel_end_x + (barrel_width / 2) * perp_cos, barrel_end_y + (barrel_width / 2) * perp_sin, barrel_end_z - barrel_height / 2)
             b4 = (barrel_end_x - (barrel_width / 2) * perp_cos, barrel_end_y - (barrel_width / 2) * perp_sin, barrel_end_z - barrel_height / 2)
-            p_b1 = camera.world_to_iso_3d(*b1, zoom)
-            p_b2 = camera.world_to_iso_3d(*b2, zoom)
-            p_b3 = camera.world_to_iso_3d(*b3, zoom)
-            p_b4 = camera.world_to_iso_3d(*b4, zoom)
-            barrel_color = tuple(min(255, c + 20) for c in self.team_color)
+            p_b1, p_b2, p_b3, p_b4 = camera.world_to_iso_3d_batch((b1, b2, b3, b4), zoom)
+            barrel_color = self.palette.barrel
             pg.draw.polygon(surface, barrel_color, [p_b1, p_b2, p_b3, p_b4])
-            pg.draw.line(surface, outline_color, p_b1, p_b2, int(1 * zoom))
-            pg.draw.line(surface, outline_color, p_b2, p_b3, int(1 * zoom))
-            pg.draw.line(surface, outline_color, p_b3, p_b4, int(1 * zoom))
-            pg.draw.line(surface, outline_color, p_b4, p_b1, int(1 * zoom))
+            pg.draw.lines(surface, outline_color, True, [p_b1, p_b2, p_b3, p_b4], int(1 * zoom))
         self.draw_health_bar(surface, camera, mouse_pos)
-        for particle in self.plasma_burn_particles:
-            particle.draw(surface, camera)
     
     def _closest_point_on_rect(self, rect: pg.Rect, pos: tuple) -> tuple[float, float]:
         return (
@@ -1593,35 +1805,39 @@ class Unit(GameObject):
         )
     
     def get_chase_position_for_building(self, target_building) -> Vector2 | None:
-        closest = self._closest_point_on_rect(target_building.rect, self.position)
-        dir_to_closest = Vector2(closest) - self.position
-        dist_to_closest = dir_to_closest.length()
-        if dist_to_closest <= self.attack_range:
+        # Plain float math throughout; only the returned position is built as a Vector2
+        rect = target_building.rect
+        px, py = self.position
+        cx, cy = self._closest_point_on_rect(rect, (px, py))
+        dx, dy = cx - px, cy - py
+        dist_to_closest = math.hypot(dx, dy)
+        attack_range = self.attack_range
+        if dist_to_closest <= attack_range:
             return None
         if dist_to_closest == 0:
             return None
-        dir_unit = dir_to_closest.normalize()
+        ux, uy = dx / dist_to_closest, dy / dist_to_closest
         
-        target_pos = Vector2(closest) - dir_unit * self.attack_range
-        
-        perp_dir = dir_unit.rotate_rad(math.pi / 2)
-        max_spread = min(15, self.attack_range * 0.15)  
+        max_spread = min(15, attack_range * 0.15)  
         spread_dist = random.uniform(-max_spread, max_spread)
-        target_pos += perp_dir * spread_dist
+        # Back off by the attack range along (ux, uy), then spread along its perpendicular (-uy, ux)
+        tx = cx - ux * attack_range - uy * spread_dist
+        ty = cy - uy * attack_range + ux * spread_dist
         
-        new_closest = self._closest_point_on_rect(target_building.rect, target_pos)
-        new_dist = Vector2(new_closest).distance_to(target_pos)
-        if new_dist > self.attack_range:
-            overage = new_dist - self.attack_range
-            adjust_dir = (Vector2(new_closest) - target_pos).normalize()
-            target_pos += adjust_dir * overage * 0.5  
+        new_cx, new_cy = self._closest_point_on_rect(rect, (tx, ty))
+        adjust_x, adjust_y = new_cx - tx, new_cy - ty
+        new_dist = math.hypot(adjust_x, adjust_y)
+        if new_dist > attack_range:
+            step = (new_dist - attack_range) * 0.5 / new_dist
+            tx += adjust_x * step
+            ty += adjust_y * step
         
-        target_pos.x = max(0, min(target_pos.x, self.map_width))
-        target_pos.y = max(0, min(target_pos.y, self.map_height))
-        return target_pos
+        return Vector2(max(0, min(tx, self.map_width)), max(0, min(ty, self.map_height)))
     
     def _setup_drawing(self, unit_type: str):
         self.height = self.stats.get("height", 0)
+        # World-space bound on how far the model reaches from its position on screen, used to cull off-screen draws
+        self.draw_reach = max(self.size) + self.height + self.fly_height
         
         if unit_type in ["Infantry", "Grenadier", "RocketSoldier", "Marksman"]:
             self.draw = self.draw_humanoid
@@ -1704,18 +1920,14 @@ class Unit(GameObject):
                     self.path = []
                     self.move_target = None
             if self.attack_target and self.attack_target.health > 0:
+                # Buildings are aimed at their nearest edge point; the offset gives both range and facing
                 if self.attack_target.is_building:
                     closest = self._closest_point_on_rect(self.attack_target.rect, self.position)
-                    dir_to_closest = Vector2(closest) - self.position
-                    dist = dir_to_closest.length()
-                else:
-                    dist = self.distance_to(self.attack_target.position)
-                if self.attack_target.is_building:
-                    closest_enemy = self._closest_point_on_rect(self.attack_target.rect, self.position)
-                    dir_to_enemy = Vector2(closest_enemy) - self.position
+                    dir_to_enemy = Vector2(closest) - self.position
                 else:
-                    dir_to_enemy = Vector2(self.attack_target.position) - self.position
-                if dir_to_enemy.length() > 0:
+                    dir_to_enemy = self.attack_target.position - self.position
+                dist = dir_to_enemy.length()
+                if dist > 0:
                     dir_to_enemy = dir_to_enemy.normalize()
                 self.target_turret_angle = math.atan2(dir_to_enemy.y, dir_to_enemy.x)
                 
@@ -1761,6 +1973,8 @@ class Unit(GameObject):
             self.body_angle += rot_step
         elif angle_diff < 0:
             self.body_angle -= rot_step
+        if rot_step:
+            self.body_heading = (math.cos(self.body_angle), math.sin(self.body_angle))
         
         angle_diff = (self.target_turret_angle - self.turret_angle + math.pi) % (2 * math.pi) - math.pi
         rot_step = min(self.turret_rotation_speed, abs(angle_diff))
@@ -1768,10 +1982,10 @@ class Unit(GameObject):
             self.turret_angle += rot_step
         elif angle_diff < 0:
             self.turret_angle -= rot_step
+        if rot_step:
+            self.turret_heading = (math.cos(self.turret_angle), math.sin(self.turret_angle))
         
         self.rect.center = self.position
-        
-        self.plasma_burn_particles = [p for p in self.plasma_burn_particles if p.alive()]
     
     def get_attack_range(self) -> float:
         return self.attack_range
@@ -1886,7 +2100,7 @@ class Headquarters(Unit):
                 building.parent_hq = self
             all_buildings.add(building)
             self.stats['buildings_constructed'] += 1
-            self.credits -= UNIT_CLASSES[unit_type]["cost"]
+            self.credits -= UNIT_SPECS[unit_type].cost
             self.pending_building = None
 
 class PowerPlant(Unit):
@@ -1901,17 +2115,16 @@ class PowerPlant(Unit):
         h = self.height
         pos = self.position
         base_z = 0
-        side_color = tuple(max(0, c - 50) for c in self.team_color)
+        side_color = self.palette.side
         outline_color = pg.Color(0, 0, 0)
         p_bottom = []
 
-        cos = math.cos(self.body_angle)
-        sin = math.sin(self.body_angle)
+        cos, sin = self.body_heading
 
         main_w = w * 1.2
         main_d = d * 1.2
         main_h = h * 0.5
-        self.draw_rotated_box(surface, camera, main_w, main_d, main_h, self.body_angle, base_z, self.team_color, side_color, self.team_color, outline_color, zoom, False, p_bottom)
+        self.draw_rotated_box(surface, camera, main_w, main_d, main_h, self.body_heading, base_z, self.team_color, side_color, self.team_color, outline_color, zoom, False, p_bottom)
 
         for offset in [-w * 0.3, w * 0.3]:
             stack_x = pos.x + offset * cos
@@ -1927,14 +2140,12 @@ class PowerPlant(Unit):
         tower_d = d * 0.8
         tower_h = h * 0.7
         tower_base_z = base_z
-        self.draw_rotated_box(surface, camera, tower_w, tower_d, tower_h, self.body_angle, tower_base_z, pg.Color(150, 150, 150), side_color, pg.Color(150, 150, 150), outline_color, zoom, False)
+        self.draw_rotated_box(surface, camera, tower_w, tower_d, tower_h, self.body_heading, tower_base_z, pg.Color(150, 150, 150), side_color, pg.Color(150, 150, 150), outline_color, zoom, False)
 
         if self.selected:
             pg.draw.polygon(surface, (255, 255, 0), p_bottom, int(2 * zoom))
 
         self.draw_health_bar(surface, camera, mouse_pos)
-        for particle in self.plasma_burn_particles:
-            particle.draw(surface, camera)
 
 
 class Refinery(Unit):
@@ -1950,17 +2161,16 @@ class Refinery(Unit):
         h = self.height
         pos = self.position
         base_z = 0
-        side_color = tuple(max(0, c - 50) for c in self.team_color)
+        side_color = self.palette.side
         outline_color = pg.Color(0, 0, 0)
         p_bottom = []
 
-        cos = math.cos(self.body_angle)
-        sin = math.sin(self.body_angle)
+        cos, sin = self.body_heading
 
         main_w = w * 1.0
         main_d = d * 1.0
         main_h = h * 0.4
-        self.draw_rotated_box(surface, camera, main_w, main_d, main_h, self.body_angle, base_z, self.team_color, side_color, self.team_color, outline_color, zoom, False, p_bottom)
+        self.draw_rotated_box(surface, camera, main_w, main_d, main_h, self.body_heading, base_z, self.team_color, side_color, self.team_color, outline_color, zoom, False, p_bottom)
 
         for i, offset in enumerate([-w * 0.4, 0, w * 0.4]):
             tank_x = pos.x + offset * cos
@@ -2006,8 +2216,6 @@ class Refinery(Unit):
             pg.draw.polygon(surface, (255, 255, 0), p_bottom, int(2 * zoom))
 
         self.draw_health_bar(surface, camera, mouse_pos)
-        for particle in self.plasma_burn_particles:
-            particle.draw(surface, camera)
 
 
 class Turret(Unit):
@@ -2022,35 +2230,33 @@ class Turret(Unit):
         h = self.height
         pos = self.position
         base_z = 0
-        side_color = tuple(max(0, c - 50) for c in self.team_color)
+        side_color = self.palette.side
         outline_color = pg.Color(0, 0, 0)
         p_bottom = []
 
-        cos = math.cos(self.body_angle)
-        sin = math.sin(self.body_angle)
+        cos, sin = self.body_heading
 
         base_w = w * 1.0
         base_d = d * 1.0
         base_h = h * 0.4
-        self.draw_rotated_box(surface, camera, base_w, base_d, base_h, self.body_angle, base_z, self.team_color, side_color, self.team_color, outline_color, zoom, False, p_bottom)
+        self.draw_rotated_box(surface, camera, base_w, base_d, base_h, self.body_heading, base_z, self.team_color, side_color, self.team_color, outline_color, zoom, False, p_bottom)
 
         mount_w = w * 0.6
         mount_d = d * 0.6
         mount_h = h * 0.2
         mount_base_z = base_z + base_h
-        self.draw_rotated_box(surface, camera, mount_w, mount_d, mount_h, self.turret_angle, mount_base_z, self.team_color, side_color, pg.Color(120, 120, 120), outline_color, zoom, True)
+        self.draw_rotated_box(surface, camera, mount_w, mount_d, mount_h, self.turret_heading, mount_base_z, self.team_color, side_color, pg.Color(120, 120, 120), outline_color, zoom, True)
 
         barrel_length = w * 1.5
         barrel_base_z = mount_base_z + mount_h / 2
-        cos_t = math.cos(self.turret_angle)
-        sin_t = math.sin(self.turret_angle)
+        cos_t, sin_t = self.turret_heading
         barrel_start_x = pos.x + (d * 0.2) * cos_t
         barrel_start_y = pos.y + (d * 0.2) * sin_t
         barrel_end_x = barrel_start_x + barrel_length * cos_t
         barrel_end_y = barrel_start_y + barrel_length * sin_t
         p_barrel_start = camera.world_to_iso_3d(barrel_start_x, barrel_start_y, barrel_base_z, zoom)
         p_barrel_end = camera.world_to_iso_3d(barrel_end_x, barrel_end_y, barrel_base_z, zoom)
-        barrel_color = tuple(min(255, c + 40) for c in self.team_color)
+        barrel_color = self.palette.turret_barrel
         pg.draw.line(surface, barrel_color, p_barrel_start, p_barrel_end, int(4 * zoom))
         pg.draw.circle(surface, pg.Color(100, 100, 100), (int(p_barrel_end[0]), int(p_barrel_end[1])), int(2 * zoom))
 
@@ -2064,8 +2270,6 @@ class Turret(Unit):
             pg.draw.polygon(surface, (255, 255, 0), p_bottom, int(2 * zoom))
 
         self.draw_health_bar(surface, camera, mouse_pos)
-        for particle in self.plasma_burn_particles:
-            particle.draw(surface, camera)
 
 
 class Barracks(Unit):
@@ -2081,17 +2285,16 @@ class Barracks(Unit):
         h = self.height
         pos = self.position
         base_z = 0
-        side_color = tuple(max(0, c - 50) for c in self.team_color)
+        side_color = self.palette.side
         outline_color = pg.Color(0, 0, 0)
         p_bottom = []
 
-        cos = math.cos(self.body_angle)
-        sin = math.sin(self.body_angle)
+        cos, sin = self.body_heading
 
         main_w = w * 1.4
         main_d = d * 0.8
         main_h = h * 0.6
-        self.draw_rotated_box(surface, camera, main_w, main_d, main_h, self.body_angle, base_z, self.team_color, side_color, self.team_color, outline_color, zoom, False, p_bottom)
+        self.draw_rotated_box(surface, camera, main_w, main_d, main_h, self.body_heading, base_z, self.team_color, side_color, self.team_color, outline_color, zoom, False, p_bottom)
 
         roof_h = h * 0.2
         roof_base_z = base_z + main_h
@@ -2145,8 +2348,6 @@ class Barracks(Unit):
             pg.draw.polygon(surface, (255, 255, 0), p_bottom, int(2 * zoom))
 
         self.draw_health_bar(surface, camera, mouse_pos)
-        for particle in self.plasma_burn_particles:
-            particle.draw(surface, camera)
 
 
 class WarFactory(Unit):
@@ -2162,23 +2363,22 @@ class WarFactory(Unit):
         h = self.height
         pos = self.position
         base_z = 0
-        side_color = tuple(max(0, c - 50) for c in self.team_color)
+        side_color = self.palette.side
         outline_color = pg.Color(0, 0, 0)
         p_bottom = []
 
-        cos = math.cos(self.body_angle)
-        sin = math.sin(self.body_angle)
+        cos, sin = self.body_heading
 
         main_w = w * 1.3
         main_d = d * 1.2
         main_h = h * 0.5
-        self.draw_rotated_box(surface, camera, main_w, main_d, main_h, self.body_angle, base_z, self.team_color, side_color, self.team_color, outline_color, zoom, False, p_bottom)
+        self.draw_rotated_box(surface, camera, main_w, main_d, main_h, self.body_heading, base_z, self.team_color, side_color, self.team_color, outline_color, zoom, False, p_bottom)
 
         for off in [-1, 1]:
             attach_x = pos.x + off * (main_w * 0.3) * cos
             attach_y = pos.y + off * (main_w * 0.3) * sin
             attach_base = (attach_x, attach_y, base_z + main_h * 0.2)
-            self.draw_rotated_box(surface, camera, w * 0.4, d * 0.6, h * 0.3, self.body_angle, attach_base[2], pg.Color(90, 90, 90), side_color, pg.Color(90, 90, 90), outline_color, zoom, False)
+            self.draw_rotated_box(surface, camera, w * 0.4, d * 0.6, h * 0.3, self.body_heading, attach_base[2], pg.Color(90, 90, 90), side_color, pg.Color(90, 90, 90), outline_color, zoom, False)
 
         for off in [-w * 0.2, w * 0.2]:
             stack_x = pos.x + off * cos
@@ -2226,8 +2426,6 @@ class WarFactory(Unit):
             pg.draw.polygon(surface, (255, 255, 0), p_bottom, int(2 * zoom))
 
         self.draw_health_bar(surface, camera, mouse_pos)
-        for particle in self.plasma_burn_particles:
-            particle.draw(surface, camera)
 
 
 class Hangar(Unit):
@@ -2243,17 +2441,16 @@ class Hangar(Unit):
         h = self.height
         pos = self.position
         base_z = 0
-        side_color = tuple(max(0, c - 50) for c in self.team_color)
+        side_color = self.palette.side
         outline_color = pg.Color(0, 0, 0)
         p_bottom = []
 
-        cos = math.cos(self.body_angle)
-        sin = math.sin(self.body_angle)
+        cos, sin = self.body_heading
 
         hangar_w = w * 1.6
         hangar_d = d * 1.4
         hangar_h = h * 0.3
-        self.draw_rotated_box(surface, camera, hangar_w, hangar_d, hangar_h, self.body_angle, base_z, self.team_color, side_color, self.team_color, outline_color, zoom, False, p_bottom)
+        self.draw_rotated_box(surface, camera, hangar_w, hangar_d, hangar_h, self.body_heading, base_z, self.team_color, side_color, self.team_color, outline_color, zoom, False, p_bottom)
 
         roof_h = h * 0.4
         roof_base_z = base_z + hangar_h
@@ -2294,7 +2491,7 @@ class Hangar(Unit):
         tower_x = pos.x + w * 0.7 * cos
         tower_y = pos.y + w * 0.7 * sin
         tower_base = (tower_x, tower_y, base_z)
-        self.draw_rotated_box(surface, camera, w * 0.3, d * 0.3, h * 0.6, self.body_angle, tower_base[2], pg.Color(100, 80, 60), side_color, pg.Color(100, 80, 60), outline_color, zoom, False)
+        self.draw_rotated_box(surface, camera, w * 0.3, d * 0.3, h * 0.6, self.body_heading, tower_base[2], pg.Color(100, 80, 60), side_color, pg.Color(100, 80, 60), outline_color, zoom, False)
 
         apron_center = camera.world_to_iso_3d(pos.x, pos.y, base_z + hangar_h * 0.5, zoom)
         pg.draw.circle(surface, pg.Color(255, 255, 255, 80), (int(apron_center[0]), int(apron_center[1])), int(w * 0.8 * zoom), 3)
@@ -2303,8 +2500,6 @@ class Hangar(Unit):
             pg.draw.polygon(surface, (255, 255, 0), p_bottom, int(2 * zoom))
 
         self.draw_health_bar(surface, camera, mouse_pos)
-        for particle in self.plasma_burn_particles:
-            particle.draw(surface, camera)
 
 class GameConsole:
     def __init__(self):
@@ -2592,7 +2787,8 @@ class AI:
         map_area = map_width * map_height
         scale = math.sqrt(map_area / default_area)
         hq_pos = self.hq.position
-        half_w, half_h = UNIT_CLASSES[building_cls.__name__]["size"][0] / 2, UNIT_CLASSES[building_cls.__name__]["size"][1] / 2
+        spec = UNIT_SPECS[building_cls.__name__]
+        half_w, half_h = spec.half_w, spec.half_h
         max_attempts = 2000
         attempts = 0
 
@@ -2660,7 +2856,7 @@ class AI:
                     else:
                         unit_type = random.choices(list(self.production_priorities.keys()), weights=list(self.production_priorities.values()))[0]
                     
-                    cost = UNIT_CLASSES[unit_type]["cost"]
+                    cost = UNIT_SPECS[unit_type].cost
                     if self.hq.credits >= cost:
                         # Queue batch
                         for _ in range(batch_size):
@@ -2676,7 +2872,7 @@ class AI:
                 self.warfactory_index += 1
                 if len(war_factory.production_queue) < max_queue_heavy:
                     heavy_unit = random.choice(["Tank", "HeavyTank", "TankDestroyer", "MachineGunVehicle", "RocketArtillery"])
-                    cost = UNIT_CLASSES[heavy_unit]["cost"]
+                    cost = UNIT_SPECS[heavy_unit].cost
                     if self.hq.credits >= cost and num_units < target_units * 0.7:
                         # Queue single heavy (avoid blob heavies)
                         war_factory.production_queue.append({'unit_type': heavy_unit, 'repeat': False})
@@ -2687,10 +2883,10 @@ class AI:
                 self.hangar_index += 1
                 if len(hangar.production_queue) < max_queue_heavy and random.random() < 0.2:  
                     hangar.production_queue.append({'unit_type': "AttackHelicopter", 'repeat': False})
-                    self.hq.credits -= UNIT_CLASSES["AttackHelicopter"]["cost"]
+                    self.hq.credits -= UNIT_SPECS["AttackHelicopter"].cost
 
     def build_defenses(self, all_buildings, map_width, map_height):
-        if self.threat_level > 0.2 and self.turret_count < self.defense_target and self.hq.credits >= UNIT_CLASSES["Turret"]["cost"]:
+        if self.threat_level > 0.2 and self.turret_count < self.defense_target and self.hq.credits >= UNIT_SPECS["Turret"].cost:
             pos = self.find_build_position(Turret, all_buildings, map_width, map_height, prefer_near_hq=True)
             if pos:
                 self.hq.place_building(pos, Turret, all_buildings)
@@ -2858,7 +3054,7 @@ class AI:
                 cls = Turret
             
             if cls:
-                cost = UNIT_CLASSES[cls.__name__]["cost"]
+                cost = UNIT_SPECS[cls.__name__].cost
                 if self.hq.credits >= cost:
                     
                     prefer_near = random.random() > 0.2 or self.total_buildings < 10
@@ -3002,7 +3198,7 @@ class ProductionInterface:
             self.surface.blit(text_surf, text_rect)
         
         for item, rect in self.item_rects.items():
-            cost = UNIT_CLASSES[item]["cost"]
+            cost = UNIT_SPECS[item].cost
             label = self.unit_button_labels[item]
             can_produce = self.hq.credits >= cost
             color = self.ACTION_ALLOWED_COLOR if can_produce else self.ACTION_BLOCKED_COLOR
@@ -3068,7 +3264,7 @@ class ProductionInterface:
         
         for item, rect in self.item_rects.items():
             if rect.collidepoint(local_pos):
-                cost = UNIT_CLASSES[item]["cost"]
+                cost = UNIT_SPECS[item].cost
                 if self.hq.credits >= cost:
                     if isinstance(self.producer, Headquarters):
                         self.placing_cls = self.str_to_building_class[item]
@@ -3149,14 +3345,14 @@ def draw_mini_map(screen: pg.Surface, camera: Camera, fog_of_war: FogOfWar, map_
             iso_pos = absolute_world_to_iso(building.position, mini_zoom)
             draw_pos = (iso_pos[0] + draw_offset_x, iso_pos[1] + draw_offset_y)
             size = 3
-            color = team_to_color[building.team]
+            color = building.team_color
             pg.draw.rect(mini_map, color, (draw_pos[0] - size, draw_pos[1] - size, size * 2, size * 2))
     
     for unit in all_units:
         if unit.health > 0 and (unit.team in player_allies or fog_of_war.is_visible(unit.position)):
             iso_pos = absolute_world_to_iso(unit.position, mini_zoom)
             draw_pos = (iso_pos[0] + draw_offset_x, iso_pos[1] + draw_offset_y)
-            color = team_to_color[unit.team]
+            color = unit.team_color
             pg.draw.circle(mini_map, color, (int(draw_pos[0]), int(draw_pos[1])), 1)
     
     cam_world_tl = (camera.rect.x, camera.rect.y)
@@ -3320,36 +3516,36 @@ def handle_attacks(team: Team, all_units: list, all_buildings: list, projectiles
                     else:
                         entity.move_target = closest_target.position
 
-def handle_projectiles(projectiles, all_units, all_buildings, particles, g):
+def handle_projectiles(projectiles, all_units, all_buildings, particles, g, unit_hash: SpatialHash, building_hash: SpatialHash):
+    # Only entities near a projectile can be hit; when several overlap it, the first in unit-then-building
+    # list order takes the hit, as with a full scan
+    scan_order = {e: i for i, e in enumerate(all_units + all_buildings)}
     for projectile in list(projectiles):
         proj_allies = g["alliances"][projectile.team]
-        enemy_units = [u for u in all_units if u.team not in proj_allies and u.health > 0]
-        enemy_buildings = [b for b in all_buildings if b.team not in proj_allies and b.health > 0]
+        pos = projectile.position
+        nearby = unit_hash.query(pos, PROJECTILE_HIT_RADIUS) + building_hash.query(pos, PROJECTILE_HIT_RADIUS)
+        hits = [e for e in nearby if e.team not in proj_allies and e.health > 0 and check_collision(e, projectile)]
         
-        hit = False
-        for e in enemy_units + enemy_buildings:
-            if check_collision(e, projectile):
-                if e.take_damage(projectile.damage, particles):
-                    create_explosion(e.position, particles, e.team)
-                    attacker_hq = g["hqs"][projectile.team]
-                    if hasattr(e, 'hq') and e.hq:
-                        if e.is_building:
-                            e.hq.stats['buildings_lost'] += 1
-                            attacker_hq.stats['buildings_destroyed'] += 1
-                        else:
-                            e.hq.stats['units_lost'] += 1
-                            attacker_hq.stats['units_destroyed'] += 1
-                    if e in all_units:
-                        all_units.remove(e)
-                        if isinstance(e, Unit):
-                            for team, ug in g["unit_groups"].items():
-                                if e in ug:
-                                    ug.remove(e)
-                    elif e in all_buildings:
-                        all_buildings.remove(e)
-                hit = True
-                break
-        if hit:
+        if hits:
+            e = min(hits, key=scan_order.__getitem__)
+            if e.take_damage(projectile.damage, particles):
+                create_explosion(e.position, particles, e.team)
+                attacker_hq = g["hqs"][projectile.team]
+                if hasattr(e, 'hq') and e.hq:
+                    if e.is_building:
+                        e.hq.stats['buildings_lost'] += 1
+                        attacker_hq.stats['buildings_destroyed'] += 1
+                    else:
+                        e.hq.stats['units_lost'] += 1
+                        attacker_hq.stats['units_destroyed'] += 1
+                if e in all_units:
+                    all_units.remove(e)
+                    if isinstance(e, Unit):
+                        for team, ug in g["unit_groups"].items():
+                            if e in ug:
+                                ug.remove(e)
+                elif e in all_buildings:
+                    all_buildings.remove(e)
             projectile.kill()
 
 def cleanup_dead_entities(g):
@@ -3358,59 +3554,84 @@ def cleanup_dead_entities(g):
         dead = [obj for obj in group if hasattr(obj, 'health') and obj.health <= 0]
         for d in dead:
             group.remove(d)
-            if hasattr(d, 'plasma_burn_particles'):
-                for p in d.plasma_burn_particles:
-                    if hasattr(p, 'kill'):
-                        p.kill()
-                d.plasma_burn_particles = []
     
     for group_name in ["global_buildings"]:
         group = g[group_name]
         dead = [obj for obj in group if hasattr(obj, 'health') and obj.health <= 0]
         for d in dead:
             group.remove(d)
-            if hasattr(d, 'plasma_burn_particles'):
-                for p in d.plasma_burn_particles:
-                    if hasattr(p, 'kill'):
-                        p.kill()
-                d.plasma_burn_particles = []
     
     for team, ug in g["unit_groups"].items():
         dead = [u for u in ug if hasattr(u, 'health') and u.health <= 0]
         for d in dead:
             ug.remove(d)
-            if hasattr(d, 'plasma_burn_particles'):
-                for p in d.plasma_burn_particles:
-                    if hasattr(p, 'kill'):
-                        p.kill()
-                d.plasma_burn_particles = []
+
+def to_display_format(surface: pg.Surface, alpha: bool = True) -> pg.Surface:
+    if pg.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
+BUTTON_FACE_KEY = (255, 0, 255)
+
+@lru_cache(maxsize=512)
+def render_text(font: pg.font.Font, text: str, rgb: tuple) -> pg.Surface:
+    return to_display_format(font.render(text, True, rgb))
 
 class MenuButton:
+    __slots__ = ('rect', 'text', 'color', 'hover_color', 'current_color', 'faces')
+    
     def __init__(self, x, y, width, height, text, color, hover_color):
         self.rect = pg.Rect(x, y, width, height)
         self.text = text
         self.color = color
         self.hover_color = hover_color
         self.current_color = color
+        self.faces = None
     
     def update(self, mouse_pos):
-        self.current_color = self.hover_color if self.rect.collidepoint(mouse_pos) else self.color
+        new_color = self.hover_color if self.rect.collidepoint(mouse_pos) else self.color
+        changed = new_color is not self.current_color
+        self.current_color = new_color
+        return changed
+    
+    def _render_face(self, color, font):
+        face = pg.Surface(self.rect.size)
+        face.fill(BUTTON_FACE_KEY)
+        face.set_colorkey(BUTTON_FACE_KEY)
+        pg.draw.rect(face, color, face.get_rect(), border_radius=10)
+        text_surf = render_text(font, self.text, (255, 255, 255))
+        face.blit(text_surf, text_surf.get_rect(center=face.get_rect().center))
+        return to_display_format(face, alpha=False)
+    
+    def face(self, font):
+        if self.faces is None or self.faces[0] is not font:
+            self.faces = (font, self._render_face(self.color, font), self._render_face(self.hover_color, font))
+        return self.faces[2] if self.current_color is self.hover_color else self.faces[1]
     
     def draw(self, surface, font):
-        pg.draw.rect(surface, self.current_color, self.rect, border_radius=10)
-        text_surf = font.render(self.text, True, pg.Color("white"))
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        surface.blit(text_surf, text_rect)
+        surface.blit(self.face(font), self.rect)
     
     def is_clicked(self, mouse_pos):
         return self.rect.collidepoint(mouse_pos)
 
+def redraw_buttons(surface, background, buttons, font):
+    rects = [btn.rect for btn in buttons]
+    surface.blits([(background, rect, rect) for rect in rects] + [(btn.face(font), btn.rect) for btn in buttons], doreturn=False)
+    return rects
+
 class MainMenu:
     def __init__(self, font_large, font_medium):
         self.font_large = font_large
         self.font_medium = font_medium
         self.skirmish_btn = MenuButton(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 - 60, 200, 60, "Single Player", pg.Color(50, 150, 50), pg.Color(100, 200, 100))
         self.quit_btn = MenuButton(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 40, 200, 60, "Quit", pg.Color(150, 50, 50), pg.Color(200, 100, 100))
+        self.background = pg.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.background.fill(pg.Color(40, 40, 40))
+        title = render_text(self.font_large, "RTS GAME", (0, 255, 200))
+        self.background.blit(title, title.get_rect(center=(SCREEN_WIDTH // 2, 100)))
+        self.background = to_display_format(self.background, alpha=False)
+        self.dirty = True
+        self.hover_changed = []
     
     def handle_event(self, event):
         if event.type == pg.MOUSEBUTTONDOWN:
@@ -3421,81 +3642,112 @@ class MainMenu:
         return None
     
     def update(self, mouse_pos):
-        self.skirmish_btn.update(mouse_pos)
-        self.quit_btn.update(mouse_pos)
+        if self.skirmish_btn.update(mouse_pos):
+            self.hover_changed.append(self.skirmish_btn)
+        if self.quit_btn.update(mouse_pos):
+            self.hover_changed.append(self.quit_btn)
     
     def draw(self, surface):
-        surface.fill(pg.Color(40, 40, 40))
-        title = self.font_large.render("RTS GAME", True, pg.Color(0, 255, 200))
-        title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 100))
-        surface.blit(title, title_rect)
-        self.skirmish_btn.draw(surface, self.font_medium)
-        self.quit_btn.draw(surface, self.font_medium)
+        if not self.dirty:
+            rects = redraw_buttons(surface, self.background, self.hover_changed, self.font_medium)
+            self.hover_changed = []
+            return rects
+        surface.blits([
+            (self.background, (0, 0)),
+            (self.skirmish_btn.face(self.font_medium), self.skirmish_btn.rect),
+            (self.quit_btn.face(self.font_medium), self.quit_btn.rect),
+        ], doreturn=False)
+        self.hover_changed = []
+        return [surface.get_rect()]
 
 class SkirmishSetup:
+    MODES = (("1v1", "1v1", -300), ("2v2", "2v2", -200), ("3v3", "3v3", -100), ("4v4", "4v4", 0), ("4FFA", "4ffa", 100))
+    SIZES = (("Tiny", "tiny", 200), ("Small", "small", 350), ("Medium", "medium", 500), ("Large", "large", 650), ("Huge", "huge", 800))
+    
     def __init__(self, font_large, font_medium):
         self.font_large = font_large
         self.font_medium = font_medium
         self.game_mode = None
         self.size_choice = None
         self.map_choice = None
+        self.dirty = True
+        self.hover_changed = []
         
-        self.mode_1v1 = MenuButton(SCREEN_WIDTH // 2 - 300, 150, 80, 50, "1v1", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.mode_2v2 = MenuButton(SCREEN_WIDTH // 2 - 200, 150, 80, 50, "2v2", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.mode_3v3 = MenuButton(SCREEN_WIDTH // 2 - 100, 150, 80, 50, "3v3", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.mode_4v4 = MenuButton(SCREEN_WIDTH // 2, 150, 80, 50, "4v4", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.mode_4ffa = MenuButton(SCREEN_WIDTH // 2 + 100, 150, 80, 50, "4FFA", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
+        self.mode_names = [value for _, value, _ in self.MODES]
+        self.mode_buttons = [MenuButton(SCREEN_WIDTH // 2 + dx, 150, 80, 50, label, pg.Color(50, 100, 150), pg.Color(100, 150, 200)) for label, _, dx in self.MODES]
+        self.mode_rects = [btn.rect for btn in self.mode_buttons]
         
-        self.size_tiny = MenuButton(200, 220, 120, 50, "Tiny", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.size_small = MenuButton(350, 220, 120, 50, "Small", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.size_medium = MenuButton(500, 220, 120, 50, "Medium", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.size_large = MenuButton(650, 220, 120, 50, "Large", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
-        self.size_huge = MenuButton(800, 220, 120, 50, "Huge", pg.Color(50, 100, 150), pg.Color(100, 150, 200))
+        self.size_names = [value for _, value, _ in self.SIZES]
+        self.size_buttons = [MenuButton(x, 220, 120, 50, label, pg.Color(50, 100, 150), pg.Color(100, 150, 200)) for label, _, x in self.SIZES]
+        self.size_rects = [btn.rect for btn in self.size_buttons]
         
-        self.map_buttons = {}
-        map_list = list(MAPS.keys())
-        for i, map_name in enumerate(map_list):
+        self.map_names = list(MAPS.keys())
+        self.map_buttons = []
+        for i, map_name in enumerate(self.map_names):
             x = 100 + (i % 2) * 300
             y = 350 + (i // 2) * 80
-            self.map_buttons[map_name] = MenuButton(x, y, 200, 60, map_name, pg.Color(100, 100, 100), pg.Color(150, 150, 150))
+            self.map_buttons.append(MenuButton(x, y, 200, 60, map_name, pg.Color(100, 100, 100), pg.Color(150, 150, 150)))
+        self.map_rects = [btn.rect for btn in self.map_buttons]
         
         self.start_btn = MenuButton(SCREEN_WIDTH // 2 - 80, SCREEN_HEIGHT - 100, 160, 50, "Start Game", pg.Color(50, 150, 50), pg.Color(100, 200, 100))
         self.spectate_btn = MenuButton(SCREEN_WIDTH // 2 + 100, SCREEN_HEIGHT - 100, 160, 50, "Spectate", pg.Color(100, 50, 150), pg.Color(150, 100, 200))
         self.back_btn = MenuButton(20, SCREEN_HEIGHT - 70, 120, 50, "Back", pg.Color(150, 100, 50), pg.Color(200, 150, 100))
+        
+        self.buttons = [*self.mode_buttons, *self.size_buttons, *self.map_buttons, self.start_btn, self.spectate_btn, self.back_btn]
+        self.button_rects = [btn.rect for btn in self.buttons]
+        self.hover_idx = -1
+
+        self.background = pg.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.background.fill(pg.Color(40, 40, 40))
+        title = render_text(self.font_large, "Skirmish Setup", (0, 255, 200))
+        label_blits = [(title, title.get_rect(center=(SCREEN_WIDTH // 2, 40)))]
+        for label, pos in (("Select Game Mode:", (50, 120)), ("Select Size:", (50, 190)), ("Select Map:", (50, 320))):
+            label_blits.append((render_text(self.font_medium, label, (200, 200, 200)), pos))
+        self.background.blits(label_blits, doreturn=False)
+        self.background = to_display_format(self.background, alpha=False)
+        self.readout_blits = []
+    
+    def reset(self):
+        self.game_mode = None
+        self.size_choice = None
+        self.map_choice = None
+        self.readout_blits = []
+        for btn in self.buttons:
+            btn.current_color = btn.color
+        self.hover_idx = -1
+        self.hover_changed = []
+        self.dirty = True
+    
+    def _update_readouts(self):
+        self.readout_blits = []
+        for choice, y in ((self.game_mode, 160), (self.size_choice, 230), (self.map_choice, 390)):
+            if choice:
+                self.readout_blits.append((render_text(self.font_medium, f"Selected: {choice}", (100, 255, 100)), (SCREEN_WIDTH - 250, y)))
     
     def handle_event(self, event):
         if event.type == pg.MOUSEBUTTONDOWN:
-            if self.mode_1v1.is_clicked(event.pos):
-                self.game_mode = "1v1"
-            elif self.mode_2v2.is_clicked(event.pos):
-                self.game_mode = "2v2"
-            elif self.mode_3v3.is_clicked(event.pos):
-                self.game_mode = "3v3"
-            elif self.mode_4v4.is_clicked(event.pos):
-                self.game_mode = "4v4"
-            elif self.mode_4ffa.is_clicked(event.pos):
-                self.game_mode = "4ffa"
+            self.dirty = True
+            click_rect = pg.Rect(event.pos, (1, 1))
+            mode_idx = click_rect.collidelist(self.mode_rects)
+            if mode_idx >= 0:
+                self.game_mode = self.mode_names[mode_idx]
             
-            if self.size_tiny.is_clicked(event.pos):
-                self.size_choice = "tiny"
-            elif self.size_small.is_clicked(event.pos):
-                self.size_choice = "small"
-            elif self.size_medium.is_clicked(event.pos):
-                self.size_choice = "medium"
-            elif self.size_large.is_clicked(event.pos):
-                self.size_choice = "large"
-            elif self.size_huge.is_clicked(event.pos):
-                self.size_choice = "huge"
+            size_idx = click_rect.collidelist(self.size_rects)
+            if size_idx >= 0:
+                self.size_choice = self.size_names[size_idx]
             
-            for map_name, btn in self.map_buttons.items():
-                if btn.is_clicked(event.pos):
-                    self.map_choice = map_name
+            map_idx = click_rect.collidelist(self.map_rects)
+            if map_idx >= 0:
+                self.map_choice = self.map_names[map_idx]
+            
+            if mode_idx >= 0 or size_idx >= 0 or map_idx >= 0:
+                self._update_readouts()
             
             if self.start_btn.is_clicked(event.pos) and self.game_mode and self.size_choice and self.map_choice:
-                return ("start_game", self.game_mode, self.size_choice, self.map_choice, False)
+                return "start_game"
             
             if self.spectate_btn.is_clicked(event.pos) and self.game_mode and self.size_choice and self.map_choice:
-                return ("start_game", self.game_mode, self.size_choice, self.map_choice, True)
+                return "spectate"
             
             if self.back_btn.is_clicked(event.pos):
                 return "menu"
@@ -3503,65 +3755,29 @@ class SkirmishSetup:
         return None
     
     def update(self, mouse_pos):
-        self.mode_1v1.update(mouse_pos)
-        self.mode_2v2.update(mouse_pos)
-        self.mode_3v3.update(mouse_pos)
-        self.mode_4v4.update(mouse_pos)
-        self.mode_4ffa.update(mouse_pos)
-        self.size_tiny.update(mouse_pos)
-        self.size_small.update(mouse_pos)
-        self.size_medium.update(mouse_pos)
-        self.size_large.update(mouse_pos)
-        self.size_huge.update(mouse_pos)
-        for btn in self.map_buttons.values():
-            btn.update(mouse_pos)
-        self.start_btn.update(mouse_pos)
-        self.spectate_btn.update(mouse_pos)
-        self.back_btn.update(mouse_pos)
+        hover_idx = pg.Rect(mouse_pos, (1, 1)).collidelist(self.button_rects)
+        if hover_idx != self.hover_idx:
+            if self.hover_idx >= 0:
+                btn = self.buttons[self.hover_idx]
+                btn.current_color = btn.color
+                self.hover_changed.append(btn)
+            if hover_idx >= 0:
+                btn = self.buttons[hover_idx]
+                btn.current_color = btn.hover_color
+                self.hover_changed.append(btn)
+            self.hover_idx = hover_idx
     
     def draw(self, surface):
-        surface.fill(pg.Color(40, 40, 40))
-        
-        title = self.font_large.render("Skirmish Setup", True, pg.Color(0, 255, 200))
-        title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 40))
-        surface.blit(title, title_rect)
-        
-        mode_label = self.font_medium.render("Select Game Mode:", True, pg.Color(200, 200, 200))
-        surface.blit(mode_label, (50, 120))
-        self.mode_1v1.draw(surface, self.font_medium)
-        self.mode_2v2.draw(surface, self.font_medium)
-        self.mode_3v3.draw(surface, self.font_medium)
-        self.mode_4v4.draw(surface, self.font_medium)
-        self.mode_4ffa.draw(surface, self.font_medium)
-        
-        if self.game_mode:
-            mode_text = self.font_medium.render(f"Selected: {self.game_mode}", True, pg.Color(100, 255, 100))
-            surface.blit(mode_text, (SCREEN_WIDTH - 250, 160))
-        
-        size_label = self.font_medium.render("Select Size:", True, pg.Color(200, 200, 200))
-        surface.blit(size_label, (50, 190))
-        self.size_tiny.draw(surface, self.font_medium)
-        self.size_small.draw(surface, self.font_medium)
-        self.size_medium.draw(surface, self.font_medium)
-        self.size_large.draw(surface, self.font_medium)
-        self.size_huge.draw(surface, self.font_medium)
-        
-        if self.size_choice:
-            size_text = self.font_medium.render(f"Selected: {self.size_choice}", True, pg.Color(100, 255, 100))
-            surface.blit(size_text, (SCREEN_WIDTH - 250, 230))
-        
-        map_label = self.font_medium.render("Select Map:", True, pg.Color(200, 200, 200))
-        surface.blit(map_label, (50, 320))
-        for btn in self.map_buttons.values():
-            btn.draw(surface, self.font_medium)
-        
-        if self.map_choice:
-            map_text = self.font_medium.render(f"Selected: {self.map_choice}", True, pg.Color(100, 255, 100))
-            surface.blit(map_text, (SCREEN_WIDTH - 250, 390))
-        
-        self.start_btn.draw(surface, self.font_medium)
-        self.spectate_btn.draw(surface, self.font_medium)
-        self.back_btn.draw(surface, self.font_medium)
+        if not self.dirty:
+            rects = redraw_buttons(surface, self.background, self.hover_changed, self.font_medium)
+            self.hover_changed = []
+            return rects
+        blits = [(self.background, (0, 0))]
+        blits += [(btn.face(self.font_medium), btn.rect) for btn in self.buttons]
+        blits += self.readout_blits
+        surface.blits(blits, doreturn=False)
+        self.hover_changed = []
+        return [surface.get_rect()]
 
 class VictoryScreen:
     def __init__(self, font_large, font_medium, is_victory: bool | None, all_stats: dict, player_team=None):
@@ -3571,6 +3787,9 @@ class VictoryScreen:
         self.all_stats = all_stats
         self.player_team = player_team
         self.continue_btn = MenuButton(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 300, 200, 60, "Continue", pg.Color(50, 150, 50), pg.Color(100, 200, 100))
+        self.composed = None
+        self.dirty = True
+        self.hover_changed = []
         
         self.table_x = 100
         self.table_y = 250
@@ -3583,12 +3802,43 @@ class VictoryScreen:
         self.header_color = pg.Color(100, 100, 100)
         self.row_color_even = pg.Color(40, 40, 40)
         self.row_color_odd = pg.Color(60, 60, 60)
-    
+
+        self.rows = []
+        for team_name, stats in sorted(all_stats.items(), key=lambda item: item[0]):
+            team_enum = self.get_team_enum(team_name)
+            team_color = team_to_color[team_enum] if team_enum else pg.Color(255, 255, 255)
+            values = [
+                team_name,
+                str(stats.get('units_created', 0)),
+                str(stats.get('units_destroyed', 0)),
+                str(stats.get('units_lost', 0)),
+                str(stats.get('buildings_constructed', 0)),
+                str(stats.get('buildings_destroyed', 0)),
+                str(stats.get('buildings_lost', 0)),
+                f"${stats.get('credits_earned', 0):,}"
+            ]
+            self.rows.append((team_color, values))
+
+        self.header_rects = []
+        self.text_blits = []
+        x_pos = self.table_x
+        for i, header in enumerate(["Player", "Produced", "Killed", "Casualties", "Built", "Raized", "Raized by", "Economy"]):
+            text_surf = render_text(self.font_medium, header, (255, 255, 255))
+            self.header_rects.append(pg.Rect(x_pos, self.table_y, self.col_widths[i], self.row_height))
+            text_rect = text_surf.get_rect(center=(x_pos + self.col_widths[i] // 2, self.table_y + self.row_height // 2))
+            self.text_blits.append((text_surf, text_rect, pg.Rect(0, 0, x_pos + self.col_widths[i] - text_rect.x, text_rect.height)))
+            x_pos += self.col_widths[i]
+        for row_idx, (team_color, values) in enumerate(self.rows):
+            row_y = self.table_y + (row_idx + 1) * self.row_height
+            x_pos = self.table_x
+            for col_idx, value in enumerate(values):
+                rgb = tuple(team_color)[:3] if col_idx == 0 else (255, 255, 255)
+                text_surf = render_text(self.font_medium, value, rgb)
+                self.text_blits.append((text_surf, text_surf.get_rect(center=(x_pos + self.col_widths[col_idx] // 2, row_y + self.row_height // 2))))
+                x_pos += self.col_widths[col_idx]
+
     def get_team_enum(self, name):
-        for t, n in team_to_name.items():
-            if n == name:
-                return t
-        return None
+        return name_to_team.get(name)
     
     def handle_event(self, event):
         if event.type == pg.MOUSEBUTTONDOWN:
@@ -3597,9 +3847,11 @@ class VictoryScreen:
         return None
     
     def update(self, mouse_pos):
-        self.continue_btn.update(mouse_pos)
+        if self.continue_btn.update(mouse_pos):
+            self.hover_changed.append(self.continue_btn)
     
-    def draw(self, surface):
+    def _compose_static(self):
+        surface = pg.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
         surface.fill(pg.Color(20, 20, 20))
         
         if self.is_victory is None:
@@ -3637,47 +3889,40 @@ class VictoryScreen:
                 pg.draw.line(surface, self.line_color, (x_pos, self.table_y), (x_pos, self.table_y + self.table_height), 2)
                 x_pos += width
             
-            headers = ["Player", "Produced", "Killed", "Casualties", "Built", "Raized", "Raized by", "Economy"]
-            x_pos = self.table_x
-            for i, header in enumerate(headers):
-                text_surf = self.font_medium.render(header, True, pg.Color("white"))
-                text_rect = text_surf.get_rect(center=(x_pos + self.col_widths[i] // 2, self.table_y + self.row_height // 2))
-                pg.draw.rect(surface, self.header_color, (x_pos, self.table_y, self.col_widths[i], self.row_height))
-                surface.blit(text_surf, text_rect)
-                x_pos += self.col_widths[i]
+            for rect in self.header_rects:
+                pg.draw.rect(surface, self.header_color, rect)
             
-            sorted_stats = sorted(self.all_stats.items(), key=lambda item: item[0])
-            x_pos = self.table_x
-            for row_idx, (team_name, stats) in enumerate(sorted_stats):
+            for row_idx in range(len(self.rows)):
                 row_y = self.table_y + (row_idx + 1) * self.row_height
                 row_color = self.row_color_even if row_idx % 2 == 0 else self.row_color_odd
                 pg.draw.rect(surface, row_color, (self.table_x, row_y, self.table_width, self.row_height))
-                
-                team_enum = self.get_team_enum(team_name)
-                team_color = team_to_color[team_enum] if team_enum else pg.Color(255, 255, 255)
-                
-                values = [
-                    team_name,
-                    str(stats.get('units_created', 0)),
-                    str(stats.get('units_destroyed', 0)),
-                    str(stats.get('units_lost', 0)),
-                    str(stats.get('buildings_constructed', 0)),
-                    str(stats.get('buildings_destroyed', 0)),
-                    str(stats.get('buildings_lost', 0)),
-                    f"${stats.get('credits_earned', 0):,}"
-                ]
-                
-                for col_idx, value in enumerate(values):
-                    color = team_color if col_idx == 0 else pg.Color(255, 255, 255)
-                    text_surf = self.font_medium.render(value, True, color)
-                    text_rect = text_surf.get_rect(center=(x_pos + self.col_widths[col_idx] // 2, row_y + self.row_height // 2))
-                    surface.blit(text_surf, text_rect)
-                    x_pos += self.col_widths[col_idx]
-                x_pos = self.table_x
+            
+            surface.blits(self.text_blits, doreturn=False)
         
-        self.continue_btn.draw(surface, self.font_medium)
+        self.composed = to_display_format(surface, alpha=False)
+    
+    def draw(self, surface):
+        if self.composed is None:
+            self._compose_static()
+        if not self.dirty:
+            rects = redraw_buttons(surface, self.composed, self.hover_changed, self.font_medium)
+            self.hover_changed = []
+            return rects
+        surface.blits([(self.composed, (0, 0)), (self.continue_btn.face(self.font_medium), self.continue_btn.rect)], doreturn=False)
+        self.hover_changed = []
+        return [surface.get_rect()]
 
 class GameManager:
+    ALLOWED_EVENTS = [pg.QUIT, pg.KEYDOWN, pg.MOUSEBUTTONDOWN, pg.MOUSEBUTTONUP, pg.MOUSEWHEEL, pg.VIDEOEXPOSE]
+    MENU_EVENTS = [pg.QUIT, pg.MOUSEBUTTONDOWN, pg.VIDEOEXPOSE]
+    MENU_WAIT_MS = 16
+    MENU_SCREENS = {
+        GameState.MENU: "main_menu",
+        GameState.SKIRMISH_SETUP: "skirmish_setup",
+        GameState.VICTORY: "victory_screen",
+        GameState.DEFEAT: "victory_screen",
+    }
+    
     def __init__(self, screen, clock, font_large, font_medium):
         self.screen = screen
         self.clock = clock
@@ -3691,6 +3936,14 @@ class GameManager:
         
         self.game_data = None
         self.running = True
+        self.menu_input = None
+        get_refresh_rate = getattr(pg.display, "get_current_refresh_rate", None)
+        self.menu_fps = (get_refresh_rate() if get_refresh_rate else 0) or 60
+        
+        pg.event.set_blocked(None)
+        pg.event.set_allowed(self.ALLOWED_EVENTS)
+        self.state_handlers = {state: self._pump_menu for state in self.MENU_SCREENS}
+        self.state_handlers[GameState.PLAYING] = self.run_game
     
     def initialize_game(self, game_mode, size_name, map_name, spectate=False):
         map_data = MAPS[map_name]
@@ -3883,8 +4136,9 @@ class GameManager:
         g = self.game_data
         
         while self.running and self.state == GameState.PLAYING:
+            pg.event.pump()
             keys = pg.key.get_pressed()
-            for event in pg.event.get():
+            for event in pg.event.get(pump=False):
                 if event.type == pg.QUIT:
                     self.running = False
                 elif event.type == pg.MOUSEWHEEL:
@@ -3936,7 +4190,7 @@ class GameManager:
                                 building_to_sell = result[1]
                                 if building_to_sell in g["global_buildings"]:
                                     g["global_buildings"].remove(building_to_sell)
-                                    g["player_hq"].credits += UNIT_CLASSES[building_to_sell.unit_type]["cost"] // 2
+                                    g["player_hq"].credits += UNIT_SPECS[building_to_sell.unit_type].cost // 2
                                     if g["selected_building"] == building_to_sell:
                                         g["selected_building"] = None
                                         g["interface"].update_producer(g["player_hq"])
@@ -3946,7 +4200,7 @@ class GameManager:
                             snapped = snap_to_grid(world_pos)
                             buildings_list = list(g["global_buildings"])
                             unit_type = g["interface"].placing_cls.__name__
-                            cost = UNIT_CLASSES[unit_type]["cost"]
+                            cost = UNIT_SPECS[unit_type].cost
                             if g["player_hq"].credits >= cost and is_valid_building_position(
                                 snapped, g["player_team"], g["interface"].placing_cls, buildings_list,
                                 g["map_width"], g["map_height"]
@@ -4023,16 +4277,6 @@ class GameManager:
                                     unit.attack_target = None
                                     unit.formation_target = pos
                 
-                elif event.type == pg.MOUSEMOTION and g["selecting"]:
-                    current_pos = event.pos
-                    if g["select_start"]:
-                        g["select_rect"] = pg.Rect(
-                            min(g["select_start"][0], current_pos[0]),
-                            min(g["select_start"][1], current_pos[1]),
-                            abs(current_pos[0] - g["select_start"][0]),
-                            abs(current_pos[1] - g["select_start"][1]),
-                        )
-                
                 elif event.type == pg.MOUSEBUTTONUP and event.button == 1 and g["selecting"]:
                     g["selecting"] = False
                     for unit in g["player_units"]:
@@ -4064,9 +4308,18 @@ class GameManager:
                             g["interface"].placing_cls = None
                         else:
                             self.state = GameState.MENU
+                            self.main_menu.dirty = True
                             return
             
-            g["camera"].update(g["selected_units"].sprites() if not g.get("spectator", False) else [], pg.mouse.get_pos(), g["interface_rect"], keys)
+            mouse_pos = pg.mouse.get_pos()
+            g["camera"].update(g["selected_units"].sprites() if not g.get("spectator", False) else [], mouse_pos, g["interface_rect"], keys)
+            if g["selecting"] and g["select_start"]:
+                g["select_rect"] = pg.Rect(
+                    min(g["select_start"][0], mouse_pos[0]),
+                    min(g["select_start"][1], mouse_pos[1]),
+                    abs(mouse_pos[0] - g["select_start"][0]),
+                    abs(mouse_pos[1] - g["select_start"][1]),
+                )
             
             unit_list = list(g["global_units"])
             building_list = [b for b in g["global_buildings"] if b.health > 0]
@@ -4116,7 +4369,7 @@ class GameManager:
             for team in unique_teams:
                 handle_attacks(team, unit_list, building_list, g["projectiles"], g["particles"], unit_hash, building_hash, g["alliances"])
             
-            handle_projectiles(g["projectiles"], unit_list, building_list, g["particles"], g)
+            handle_projectiles(g["projectiles"], unit_list, building_list, g["particles"], g, unit_hash, building_hash)
             
             cleanup_dead_entities(g)
 
@@ -4132,7 +4385,9 @@ class GameManager:
                             min_dist = float('inf')
                             nearest_team = None
                             for team, pos in alive_hqs_pos.items():
-                                dist = math.hypot(tile_x - pos.x, tile_y - pos.y)
+                                dx = tile_x - pos.x
+                                dy = tile_y - pos.y
+                                dist = dx * dx + dy * dy  # squared: only the nearest HQ matters
                                 if dist < min_dist:
                                     min_dist = dist
                                     nearest_team = team
@@ -4210,22 +4465,14 @@ class GameManager:
             start_ty = max(0, int(min_wy // TILE_SIZE))
             end_tx = min(num_tx, int(max_wx // TILE_SIZE) + 2)
             end_ty = min(num_ty, int(max_wy // TILE_SIZE) + 2)
+            corners, stride = g["camera"].iso_tile_grid(start_tx, end_tx, start_ty, end_ty, TILE_SIZE, zoom)
             for tx in range(start_tx, end_tx):
-                wx = tx * TILE_SIZE
                 for ty in range(start_ty, end_ty):
-                    wy = ty * TILE_SIZE
                     tile_r = base_r
                     tile_g = base_g
                     tile_b = base_b
-                    c1 = (wx, wy)
-                    c2 = (wx + TILE_SIZE, wy)
-                    c3 = (wx + TILE_SIZE, wy + TILE_SIZE)
-                    c4 = (wx, wy + TILE_SIZE)
-                    iso1 = g["camera"].world_to_iso(c1, zoom)
-                    iso2 = g["camera"].world_to_iso(c2, zoom)
-                    iso3 = g["camera"].world_to_iso(c3, zoom)
-                    iso4 = g["camera"].world_to_iso(c4, zoom)
-                    pg.draw.polygon(self.screen, (tile_r, tile_g, tile_b), [iso1, iso2, iso3, iso4])
+                    k = (tx - start_tx) * stride + (ty - start_ty)
+                    pg.draw.polygon(self.screen, (tile_r, tile_g, tile_b), [corners[k], corners[k + stride], corners[k + stride + 1], corners[k + 1]])
             
             for feature in g["terrain_features"]:
                 if g["fog_of_war"].is_visible(feature.position):
@@ -4235,15 +4482,18 @@ class GameManager:
             fog = g["fog_of_war"]
             if not g.get("spectator", False):
                 g["fog_of_war"].draw(self.screen, g["camera"])
-            mouse_pos = pg.mouse.get_pos() if g.get("interface") else None
+            hover_pos = mouse_pos if g.get("interface") else None
+            camera = g["camera"]
+            # Skip the 3D corner math for anything that cannot reach the view; the fixed pad covers
+            # the health bar, which is not scaled with zoom
+            on_screen = lambda obj: camera.is_on_screen(obj.position, obj.draw_reach * zoom + DRAW_CULL_PAD)
             for building in building_list:
                 visible = building.team in draw_allies or fog.is_visible(building.position) or building.is_seen
-                if building.health > 0 and visible:
-                    building.draw(self.screen, g["camera"], mouse_pos)
+                if building.health > 0 and visible and on_screen(building):
+                    building.draw(self.screen, g["camera"], hover_pos)
             
             if g["interface"] and not g.get("spectator", False):
                 if g["interface"].placing_cls is not None:
-                    mouse_pos = pg.mouse.get_pos()
                     ghost_pos = g["camera"].screen_to_world(mouse_pos)
                     snapped = snap_to_grid(ghost_pos)
                     buildings_list = list(g["global_buildings"])
@@ -4252,7 +4502,7 @@ class GameManager:
                         snapped, g["player_team"], g["interface"].placing_cls, buildings_list,
                         g["map_width"], g["map_height"]
                     )
-                    width, height = UNIT_CLASSES[unit_type]["size"]
+                    width, height = UNIT_SPECS[unit_type].size
                     half_w, half_h = width / 2, height / 2
                     temp_rect = pg.Rect(snapped[0] - half_w, snapped[1] - half_h, width, height)
                     screen_ghost = g["camera"].get_screen_rect(temp_rect)
@@ -4262,18 +4512,18 @@ class GameManager:
                 
                 for unit in [u for u in unit_list if not u.is_building]:
                     visible = unit.team in draw_allies or fog.is_visible(unit.position)
-                    if unit.health > 0 and visible:
-                        unit.draw(self.screen, g["camera"], mouse_pos)
+                    if unit.health > 0 and visible and on_screen(unit):
+                        unit.draw(self.screen, g["camera"], hover_pos)
             else:
                 for unit in [u for u in unit_list if not u.is_building]:
-                    if unit.health > 0:
+                    if unit.health > 0 and on_screen(unit):
                         unit.draw(self.screen, g["camera"])
             
             for projectile in g["projectiles"]:
                 projectile.draw(self.screen, g["camera"])
             
-            for particle in g["particles"]:
-                particle.draw(self.screen, g["camera"])
+            entity_visible = lambda entity: entity.team in draw_allies or fog.is_visible(entity.position) or (entity.is_building and entity.is_seen)
+            draw_particles(self.screen, g["camera"], g["particles"], entity_visible)
             
             if g["interface"] and not g.get("spectator", False):
                 g["interface"].draw(self.screen, [b for b in g["global_buildings"] if b.team == g["player_team"]], g["global_buildings"])
@@ -4286,75 +4536,79 @@ class GameManager:
             
             draw_fitness_panel(self.screen, g)
             
-            pg.display.flip()
+            self._present()
             self.clock.tick(60)
     
+    def _present(self, dirty_rects=None):
+        if dirty_rects is None:
+            pg.display.flip()
+        elif dirty_rects:
+            pg.display.update(dirty_rects)
+    
+    def _menu_events(self):
+        first = pg.event.wait(self.MENU_WAIT_MS)
+        events = pg.event.get(self.MENU_EVENTS, pump=False)
+        pg.event.clear(pump=False)
+        if first.type in self.MENU_EVENTS:
+            events.insert(0, first)
+        return events
+    
+    def _apply_menu_result(self, result):
+        if result == "skirmish_setup":
+            self.state = GameState.SKIRMISH_SETUP
+            self.skirmish_setup.dirty = True
+        elif result == "menu":
+            self.state = GameState.MENU
+            self.main_menu.dirty = True
+            self.skirmish_setup.reset()
+        elif result == "quit":
+            self.running = False
+        elif result in ("start_game", "spectate"):
+            setup = self.skirmish_setup
+            self.initialize_game(setup.game_mode, setup.size_choice, setup.map_choice, result == "spectate")
+            self.state = GameState.PLAYING
+    
+    def _pump_menu(self):
+        screen = getattr(self, self.MENU_SCREENS[self.state])
+        mouse_pos = pg.mouse.get_pos()
+        if (self.state, mouse_pos) != self.menu_input:
+            self.menu_input = (self.state, mouse_pos)
+            screen.update(mouse_pos)
+        if screen.dirty or screen.hover_changed:
+            self._present(screen.draw(self.screen))
+            screen.dirty = False
+        
+        events = self._menu_events()
+        for i, event in enumerate(events):
+            if event.type == pg.QUIT:
+                self.running = False
+            elif event.type == pg.VIDEOEXPOSE:
+                screen.dirty = True
+            result = screen.handle_event(event)
+            if result:
+                self._apply_menu_result(result)
+                for pending in events[i + 1:]:
+                    pg.event.post(pending)
+                break
+        
+        self.clock.tick_busy_loop(self.menu_fps)
+    
     def run(self):
         while self.running:
-            if self.state == GameState.MENU:
-                self.main_menu.update(pg.mouse.get_pos())
-                self.main_menu.draw(self.screen)
-                
-                for event in pg.event.get():
-                    if event.type == pg.QUIT:
-                        self.running = False
-                    result = self.main_menu.handle_event(event)
-                    if result == "skirmish_setup":
-                        self.state = GameState.SKIRMISH_SETUP
-                    elif result == "quit":
-                        self.running = False
-                
-                pg.display.flip()
-                self.clock.tick(60)
-            
-            elif self.state == GameState.SKIRMISH_SETUP:
-                self.skirmish_setup.update(pg.mouse.get_pos())
-                self.skirmish_setup.draw(self.screen)
-                
-                for event in pg.event.get():
-                    if event.type == pg.QUIT:
-                        self.running = False
-                    result = self.skirmish_setup.handle_event(event)
-                    if result == "menu":
-                        self.state = GameState.MENU
-                        self.skirmish_setup = SkirmishSetup(self.font_large, self.font_medium)
-                    elif result and result[0] == "start_game":
-                        _, game_mode, size_choice, map_choice, spectate = result
-                        self.initialize_game(game_mode, size_choice, map_choice, spectate)
-                        self.state = GameState.PLAYING
-                
-                pg.display.flip()
-                self.clock.tick(60)
-            
-            elif self.state == GameState.PLAYING:
-                self.run_game()
-            
-            elif self.state in (GameState.VICTORY, GameState.DEFEAT):
-                self.victory_screen.update(pg.mouse.get_pos())
-                self.victory_screen.draw(self.screen)
-                
-                for event in pg.event.get():
-                    if event.type == pg.QUIT:
-                        self.running = False
-                    result = self.victory_screen.handle_event(event)
-                    if result == "menu":
-                        self.state = GameState.MENU
-                        self.skirmish_setup = SkirmishSetup(self.font_large, self.font_medium)
-                
-                pg.display.flip()
-                self.clock.tick(60)
+            self.state_handlers[self.state]()
         
         pg.quit()
 
 if __name__ == "__main__":
-    pg.init()
+    pg.display.init()
+    pg.font.init()
     pg.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
-    screen = pg.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    screen = pg.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pg.SCALED if VSYNC else 0, vsync=int(VSYNC))
     pg.display.set_caption("Paper Tigers")
     clock = pg.time.Clock()
     
-    font_large = pg.font.SysFont(None, 72)
-    font_medium = pg.font.SysFont(None, 28)
+    font_large = pg.font.Font(None, 72)
+    font_medium = pg.font.Font(None, 28)
     
     manager = GameManager(screen, clock, font_large, font_medium)
     manager.run()